@@ -0,0 +1 @@
+"""Reproducible benchmarks for the HiPEAC MCP tools."""
@@ -0,0 +1,340 @@
+"""Benchmark ``search_members`` against a seeded SQLite stand-in database.
+
+The production tables are created in a local SQLite file and filled with a
+synthetic, seeded member directory at each requested size. Every filter
+scenario is then timed against the database and against the in-memory
+snapshot, recording latency percentiles, the number of SQL queries and
+the peak memory allocated by one call. Results are written as JSON so they
+can be compared between commits::
+
+    python -m benchmarks.search_members --output results.json
+    python -m benchmarks.search_members --sizes 1000 --runs 20
+
+``DATABASE_URL`` defaults to a file in the temporary directory and must use
+the ``sqlite`` scheme, as the tables are dropped and recreated.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'hipeac-mcp-benchmark.db')}")
+
+from hipeac_mcp.db import setup_django  # noqa: E402
+
+
+setup_django()
+
+from django.contrib.contenttypes.models import ContentType  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.backends.signals import connection_created  # noqa: E402
+from django.test import override_settings  # noqa: E402
+
+from hipeac_mcp.cache import metadata_cache, search_results  # noqa: E402
+from hipeac_mcp.directory import engine  # noqa: E402
+from hipeac_mcp.models import (  # noqa: E402
+    Institution,
+    Membership,
+    Metadata,
+    RelApplicationArea,
+    RelInstitution,
+    RelTopic,
+    User,
+)
+from hipeac_mcp.tools.members import search_members  # noqa: E402
+
+
+SIZES = [1_000, 10_000, 100_000]
+RUNS = 50
+SEED = 42
+
+TOPIC_IDS = range(1, 101)
+APPLICATION_AREA_IDS = range(101, 131)
+INSTITUTION_TYPE_IDS = range(131, 137)
+COUNTRIES = ["BE", "DE", "ES", "FR", "GB", "GR", "IT", "NL", "PT", "SE", "CH", "PL", "AT", "DK", "FI", "IE"]
+MEMBERSHIP_TYPES = ["member", "associated_member", "affiliated_member", "affiliated_phd"]
+FIRST_NAMES = ["Ana", "Hans", "Jane", "Marco", "Sofia", "Lars", "Eva", "Jean", "Nikos", "Pablo", "Anna", "Piotr"]
+LAST_NAMES = [
+    "García", "Müller", "Smith", "Rossi", "Dubois", "Jansen", "Nielsen", "Papadopoulos",
+    "Kowalski", "Martínez", "Schmidt", "Bianchi", "Moreau", "Virtanen", "Silva", "O'Brien",
+]  # fmt: skip
+
+SCENARIOS = {
+    "no_filters": {},
+    "query": {"query": "garc"},
+    "topic": {"topic_ids": [1, 2, 3]},
+    "country": {"countries": ["ES"]},
+    "membership_type": {"membership_types": ["associated_member"]},
+    "topic_and_country": {"topic_ids": [1, 2, 3], "countries": ["ES", "FR"]},
+    "query_and_facets": {"query": "mar", "topic_ids": [4, 5, 6, 7], "institution_type_ids": [131, 132]},
+    "all_facets": {
+        "topic_ids": [1, 2, 3, 4, 5],
+        "application_area_ids": [101, 102, 103],
+        "countries": ["DE", "ES", "FR", "IT"],
+        "institution_type_ids": [131, 132, 133],
+        "membership_types": ["member", "associated_member"],
+    },
+}
+
+TABLES = [ContentType, Metadata, Institution, User, Membership, RelInstitution, RelTopic, RelApplicationArea]
+
+
+class QueryCounter:
+    """Execute wrapper counting the SQL queries run on every connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+def create_tables() -> None:
+    """Drop and recreate the stand-in tables with the indexes of the production schema.
+
+    Django creates no indexes for unmanaged models, so foreign key and generic
+    relation indexes are added explicitly.
+    """
+    existing = set(connection.introspection.table_names())
+    with connection.schema_editor() as editor:
+        for model in reversed(TABLES):
+            if model._meta.db_table in existing:
+                editor.delete_model(model)
+        for model in TABLES:
+            editor.create_model(model)
+        for model in TABLES:
+            table = model._meta.db_table
+            for field in model._meta.local_fields:
+                if field.many_to_one:
+                    editor.execute(f"CREATE INDEX {table}_{field.column} ON {table} ({field.column})")
+        for model in (RelInstitution, RelTopic, RelApplicationArea):
+            table = model._meta.db_table
+            editor.execute(f"CREATE INDEX {table}_object ON {table} (content_type_id, object_id)")
+
+
+def seed(member_count: int, seed: int = SEED) -> None:
+    """Fill the stand-in tables with a synthetic directory.
+
+    About one user in ten has no active membership, as in production, and one
+    in twenty holds a second one.
+
+    :param member_count: Number of users to create.
+    :param seed: Seed of the random generator.
+    """
+    rng = random.Random(seed)
+    user_ct = ContentType.objects.create(app_label="hipeac", model="user")
+
+    Metadata.objects.bulk_create(
+        [Metadata(id=id, type="topic", value=f"Topic {id}", position=id) for id in TOPIC_IDS]
+        + [Metadata(id=id, type="application_area", value=f"Area {id}", position=id) for id in APPLICATION_AREA_IDS]
+        + [Metadata(id=id, type="institution_type", value=f"Type {id}", position=id) for id in INSTITUTION_TYPE_IDS]
+    )
+
+    institution_count = max(50, member_count // 10)
+    Institution.objects.bulk_create(
+        [
+            Institution(
+                id=id, name=f"Institution {id}", country=rng.choice(COUNTRIES), type_id=rng.choice(INSTITUTION_TYPE_IDS)
+            )
+            for id in range(1, institution_count + 1)
+        ],
+        batch_size=5000,
+    )
+
+    users, memberships, institutions, topics, areas = [], [], [], [], []
+    for id in range(1, member_count + 1):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        username = f"{first_name[0]}{last_name}{id}".lower()
+        users.append(
+            User(id=id, username=username, email=f"{username}@example.org", first_name=first_name, last_name=last_name)
+        )
+        end_date = date(2020, 1, 1) if rng.random() < 0.1 else None
+        memberships.append(
+            Membership(user_id=id, type=rng.choice(MEMBERSHIP_TYPES), date=date(2015, 1, 1), end_date=end_date)
+        )
+        if rng.random() < 0.05:
+            # Members are shown, filtered and counted with their first active membership only
+            memberships.append(Membership(user_id=id, type=rng.choice(MEMBERSHIP_TYPES), date=date(2018, 1, 1)))
+        institutions.append(
+            RelInstitution(content_type=user_ct, object_id=id, institution_id=rng.randint(1, institution_count))
+        )
+        topics.extend(
+            RelTopic(content_type=user_ct, object_id=id, topic_id=topic_id)
+            for topic_id in rng.sample(TOPIC_IDS, rng.randint(2, 8))
+        )
+        areas.extend(
+            RelApplicationArea(content_type=user_ct, object_id=id, application_area_id=area_id)
+            for area_id in rng.sample(APPLICATION_AREA_IDS, rng.randint(1, 3))
+        )
+
+    for model, objects in [
+        (User, users),
+        (Membership, memberships),
+        (RelInstitution, institutions),
+        (RelTopic, topics),
+        (RelApplicationArea, areas),
+    ]:
+        model.objects.bulk_create(objects, batch_size=5000)
+
+
+def percentile(sorted_times: list[float], fraction: float) -> float:
+    return sorted_times[min(len(sorted_times) - 1, int(fraction * len(sorted_times)))]
+
+
+async def measure(kwargs: dict, runs: int, counter: QueryCounter) -> dict:
+    """Time one scenario and record its queries and allocations.
+
+    :param kwargs: Arguments of ``search_members``.
+    :param runs: Number of timed calls.
+    :param counter: Query counter installed on every connection.
+    :returns: The measurements.
+    """
+    result = await search_members(**kwargs)
+
+    counter.count = 0
+    await search_members(**kwargs)
+    queries = counter.count
+
+    tracemalloc.start()
+    await search_members(**kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await search_members(**kwargs)
+        times.append(time.perf_counter() - start)
+    times.sort()
+
+    return {
+        "total": result.total,
+        "returned": len(result.members),
+        "queries": queries,
+        "peak_alloc_kib": round(peak / 1024, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(times) * 1000, 3),
+            "p50": round(percentile(times, 0.50) * 1000, 3),
+            "p95": round(percentile(times, 0.95) * 1000, 3),
+            "p99": round(percentile(times, 0.99) * 1000, 3),
+            "max": round(times[-1] * 1000, 3),
+        },
+    }
+
+
+async def run_size(member_count: int, runs: int, counter: QueryCounter) -> list[dict]:
+    """Benchmark every scenario against the database and the snapshot for one directory size.
+
+    :param member_count: Number of seeded users.
+    :param runs: Number of timed calls per scenario.
+    :param counter: Query counter installed on every connection.
+    :returns: One result per backend and scenario.
+    """
+    results = []
+    metadata_cache.invalidate()
+
+    for name, kwargs in SCENARIOS.items():
+        log(f"  database / {name}")
+        results.append(
+            {"size": member_count, "backend": "database", "scenario": name, **await measure(kwargs, runs, counter)}
+        )
+
+    with override_settings(MEMBER_SNAPSHOT_ENABLED=True):
+        previous = engine.snapshot
+        engine.refresh_interval = float("inf")
+        start = time.perf_counter()
+        engine.start()
+        while engine.snapshot is previous:
+            await asyncio.sleep(0.01)
+        build_seconds = time.perf_counter() - start
+
+        for name, kwargs in SCENARIOS.items():
+            log(f"  snapshot / {name}")
+            results.append(
+                {
+                    "size": member_count,
+                    "backend": "snapshot",
+                    "scenario": name,
+                    "snapshot_build_s": round(build_seconds, 3),
+                    **await measure(kwargs, runs, counter),
+                }
+            )
+        await engine.stop()
+
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def log(message: str) -> None:
+    print(message, file=sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark suite and write its results as JSON.
+
+    :param argv: Command line arguments, defaults to ``sys.argv``.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="member counts to seed")
+    parser.add_argument("--runs", type=int, default=RUNS, help="timed calls per scenario")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed of the synthetic data")
+    parser.add_argument("--output", help="JSON file to write, defaults to stdout")
+    args = parser.parse_args(argv)
+
+    if connection.vendor != "sqlite":
+        parser.error("DATABASE_URL must point to a SQLite stand-in database, its tables are dropped")
+
+    counter = QueryCounter()
+    connection_created.connect(counter.install)
+    # Measure the search itself, not repeated hits on the result cache
+    search_results.max_entries = 0
+
+    results = []
+    for member_count in args.sizes:
+        log(f"Seeding {member_count} members")
+        create_tables()
+        seed(member_count, args.seed)
+        connection.close()
+        results.extend(asyncio.run(run_size(member_count, args.runs, counter)))
+
+    report = {
+        "benchmark": "search_members",
+        "revision": os.environ.get("GIT_REV") or git_revision(),
+        "python": platform.python_version(),
+        "database": connection.vendor,
+        "seed": args.seed,
+        "runs": args.runs,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Benchmark incremental snapshot refreshes against full rebuilds.
+
+A SQLite stand-in database is seeded like the ``search_members`` benchmark.
+After a full build, a given number of members are changed (renamed, with an
+ended membership, or with new topics) and the directory is refreshed both
+incrementally and from scratch. Each refresh records its latency and SQL
+queries, and the incremental snapshot is checked against the full rebuild::
+
+    python -m benchmarks.snapshot_refresh --output results.json
+    python -m benchmarks.snapshot_refresh --sizes 10000 --churn 0 10 100
+
+``DATABASE_URL`` follows the same rules as for ``benchmarks.search_members``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import time
+from datetime import date
+
+# Sets the SQLite stand-in database up before anything else reads the settings
+from .search_members import QueryCounter, connection, create_tables, git_revision, log, seed
+
+
+# isort: split
+
+from django.db.backends.signals import connection_created
+
+from hipeac_mcp.directory import DirectoryRefresher, Facet, load_snapshot
+from hipeac_mcp.models import Membership, RelTopic, User
+
+
+SIZES = [1_000, 10_000, 100_000]
+CHURN = [0, 1, 10, 100]
+SEED = 42
+
+
+def churn(count: int, rng: random.Random) -> None:
+    """Change random members: a third are renamed, a third lose their membership, a third get a topic.
+
+    :param count: Number of members to change.
+    :param rng: Random generator.
+    """
+    user_ids = list(Membership.objects.active().values_list("user_id", flat=True))
+    topic = RelTopic.objects.first()
+    for index, user_id in enumerate(rng.sample(user_ids, min(count, len(user_ids)))):
+        if index % 3 == 0:
+            User.objects.filter(id=user_id).update(last_name=f"Renamed{index}")
+        elif index % 3 == 1:
+            Membership.objects.filter(user_id=user_id).update(end_date=date(2025, 1, 1))
+        else:
+            RelTopic.objects.create(
+                content_type_id=topic.content_type_id, object_id=user_id, topic_id=rng.randint(1, 100)
+            )
+
+
+def same_directory(snapshot, expected) -> bool:
+    """Check two snapshots hold the same members and facet postings.
+
+    :param snapshot: Snapshot under test.
+    :param expected: Reference snapshot.
+    :returns: Whether they are equivalent.
+    """
+    if list(snapshot.members) != list(expected.members):
+        return False
+    return all(
+        snapshot.postings(facet, value) == bits for facet in Facet for value, bits in expected._index[facet].items()
+    )
+
+
+def timed(function, counter: QueryCounter) -> tuple:
+    counter.count = 0
+    start = time.perf_counter()
+    result = function()
+    return result, round((time.perf_counter() - start) * 1000, 3), counter.count
+
+
+def run_size(member_count: int, churn_levels: list[int], seed_value: int, counter: QueryCounter) -> list[dict]:
+    """Refresh a directory of one size after each churn level.
+
+    :param member_count: Number of seeded users.
+    :param churn_levels: Numbers of members changed before each refresh.
+    :param seed_value: Seed of the synthetic data and of the changes.
+    :param counter: Query counter installed on every connection.
+    :returns: One result per churn level.
+    """
+    rng = random.Random(seed_value)
+    refresher = DirectoryRefresher(full_rebuild_interval=float("inf"))
+    _, build_ms, build_queries = timed(refresher, counter)
+
+    results = []
+    for count in churn_levels:
+        log(f"  churn {count}")
+        churn(count, rng)
+        snapshot, incremental_ms, incremental_queries = timed(refresher, counter)
+        expected, full_ms, full_queries = timed(load_snapshot, counter)
+        results.append(
+            {
+                "size": member_count,
+                "churn": count,
+                "initial_build_ms": build_ms,
+                "initial_build_queries": build_queries,
+                "incremental_ms": incremental_ms,
+                "incremental_queries": incremental_queries,
+                "full_ms": full_ms,
+                "full_queries": full_queries,
+                "matches_full_rebuild": same_directory(snapshot, expected),
+            }
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark and write its results as JSON.
+
+    :param argv: Command line arguments, defaults to ``sys.argv``.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="member counts to seed")
+    parser.add_argument("--churn", type=int, nargs="+", default=CHURN, help="members changed before each refresh")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed of the synthetic data")
+    parser.add_argument("--output", help="JSON file to write, defaults to stdout")
+    args = parser.parse_args(argv)
+
+    if connection.vendor != "sqlite":
+        parser.error("DATABASE_URL must point to a SQLite stand-in database, its tables are dropped")
+
+    counter = QueryCounter()
+    connection_created.connect(counter.install)
+
+    results = []
+    for member_count in args.sizes:
+        log(f"Seeding {member_count} members")
+        create_tables()
+        seed(member_count, args.seed)
+        connection.close()
+        results.extend(run_size(member_count, args.churn, args.seed, counter))
+
+    report = {
+        "benchmark": "snapshot_refresh",
+        "revision": os.environ.get("GIT_REV") or git_revision(),
+        "python": platform.python_version(),
+        "database": connection.vendor,
+        "seed": args.seed,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
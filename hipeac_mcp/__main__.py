@@ -1,7 +1,54 @@
-"""Entry point for running the HiPEAC MCP server."""
+"""Entry point for running the HiPEAC MCP server.
+
+Without arguments the server runs over stdio against the database. Other
+commands:
+
+- ``snapshot export PATH``: write the member directory and metadata to a
+  compressed snapshot file;
+- ``serve [--snapshot PATH]``: run the server over stdio, answering from an
+  exported snapshot file instead of the database when one is given, or
+  when ``OFFLINE_SNAPSHOT_PATH`` is set.
+"""
+
+import argparse
+import sys
+
+from django.conf import settings
 
 from . import mcp
+from .directory import export_snapshot, load_snapshot
+from .offline import serve_offline
 
 
-if __name__ == "__main__":
+def main(argv: list[str] | None = None) -> None:
+    """Run a command line.
+
+    :param argv: Command line arguments, defaults to ``sys.argv[1:]``.
+    """
+    parser = argparse.ArgumentParser(prog="python -m hipeac_mcp", description="HiPEAC MCP server.")
+    commands = parser.add_subparsers(dest="command")
+
+    snapshot = commands.add_parser("snapshot", help="Manage member snapshot files.")
+    snapshot_commands = snapshot.add_subparsers(dest="snapshot_command", required=True)
+    export = snapshot_commands.add_parser("export", help="Export the directory to a compressed snapshot file.")
+    export.add_argument("path", help="Destination of the snapshot file.")
+
+    serve = commands.add_parser("serve", help="Run the server over stdio.")
+    serve.add_argument("--snapshot", help="Answer from an exported snapshot file, without the database.")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "snapshot":
+        directory = load_snapshot()
+        size = export_snapshot(directory, args.path)
+        print(f"Exported {len(directory)} members to {args.path} ({size} bytes)", file=sys.stderr)
+        return
+
+    if path := getattr(args, "snapshot", None) or settings.OFFLINE_SNAPSHOT_PATH:
+        serve_offline(path)
+
     mcp.run(transport="stdio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""Database backends for HiPEAC MCP server."""
+
+from .pool import ConnectionPool, PooledConnection, PoolStats
+
+
+__all__ = ["ConnectionPool", "PooledConnection", "PoolStats"]
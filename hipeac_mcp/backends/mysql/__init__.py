@@ -0,0 +1 @@
+"""MySQL backend whose connections are reused through a process-wide pool."""
@@ -0,0 +1,66 @@
+"""MySQL database wrapper backed by a ``ConnectionPool``.
+
+Pooling is configured with the ``POOL`` entry of the database settings
+(``SIZE``, ``MAX_AGE``, ``IDLE_TIMEOUT`` and ``PING_AFTER``); a ``SIZE`` of 0 or a missing
+entry behaves exactly like the stock MySQL backend.
+"""
+
+from django.db.backends.mysql.base import Database
+from django.db.backends.mysql.base import DatabaseWrapper as MySQLDatabaseWrapper
+from django.utils.asyncio import async_unsafe
+
+from ...instrumentation import register_counters
+from ..pool import ConnectionPool, PooledConnection
+
+
+pools: dict[str, ConnectionPool] = {}
+
+
+def _ping(connection) -> bool:
+    try:
+        connection.ping()
+    except Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(MySQLDatabaseWrapper):
+    """MySQL connection that returns its raw connection to the pool on close."""
+
+    pooled: PooledConnection | None = None
+
+    @property
+    def pool(self) -> ConnectionPool | None:
+        """Pool shared by every connection to this database alias, if pooling is enabled."""
+        options = self.settings_dict.get("POOL") or {}
+        if not options.get("SIZE"):
+            return None
+        if self.alias not in pools:
+            pool = pools.setdefault(
+                self.alias,
+                ConnectionPool(
+                    options["SIZE"],
+                    options.get("MAX_AGE", 300),
+                    options.get("IDLE_TIMEOUT", 60),
+                    options.get("PING_AFTER", 1.0),
+                ),
+            )
+            register_counters(f"db_pool.{self.alias}", pool.stats)
+        return pools[self.alias]
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        self.pooled = pool.acquire(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params), _ping)
+        return self.pooled.connection
+
+    def _close(self):
+        if self.pooled is None or self.pool is None:
+            return super()._close()
+
+        pooled, self.pooled = self.pooled, None
+        reusable = not self.errors_occurred and self.autocommit and not self.in_atomic_block
+        self.pool.release(pooled, reusable)
@@ -0,0 +1,136 @@
+"""Process-wide pool of raw database connections.
+
+Django keeps one connection per task context, and every MCP tool call runs
+in a task of its own, so ``CONN_MAX_AGE`` alone never lets two calls share a
+connection. The pool sits below Django instead: closing a Django connection
+hands the raw connection back, and the next connect takes it again, skipping
+the TCP, TLS and authentication handshake.
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(slots=True)
+class PooledConnection:
+    """A raw connection and its lifetime timestamps."""
+
+    connection: Any
+    created_at: float
+    released_at: float = 0.0
+
+
+@dataclass(slots=True)
+class PoolStats:
+    """Counters describing how a pool has been used."""
+
+    opened: int = 0
+    reused: int = 0
+    stale: int = 0
+    evicted: int = 0
+
+
+class ConnectionPool:
+    """Bounded LIFO stack of idle connections with max-age and idle eviction.
+
+    Idle connections are handed out most recently used first, so the oldest
+    ones age out at the bottom of the stack. A connection idle for longer than
+    ``ping_after`` is pinged before it is reused, which keeps server-side
+    timeouts (MySQL errors 2006 and 2013) from reaching queries; one released
+    just before, as between the queries of a tool call, is reused as is.
+
+    Only idle connections are bounded: connections are opened on demand
+    whatever the number already in use, and the ones released while the pool
+    is full are closed. Concurrent queries of a tool call are bounded by
+    ``DB_QUERY_CONCURRENCY`` instead.
+    """
+
+    def __init__(self, size: int, max_age: float, idle_timeout: float, ping_after: float = 0.0):
+        """Create an empty pool.
+
+        :param size: Maximum number of idle connections kept open; 0 disables pooling.
+        :param max_age: Seconds after which a connection is closed instead of reused.
+        :param idle_timeout: Seconds a connection may sit idle before it is closed.
+        :param ping_after: Seconds a connection may sit idle before it is pinged on reuse.
+        """
+        self.size = size
+        self.max_age = max_age
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self.stats = PoolStats()
+        self._idle: deque[PooledConnection] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, connect: Callable[[], Any], is_alive: Callable[[Any], bool]) -> PooledConnection:
+        """Take an idle connection that is still alive, or open a new one.
+
+        :param connect: Opens a new raw connection.
+        :param is_alive: Pings a raw connection, returning False if it is unusable.
+        :returns: The connection.
+        """
+        while (pooled := self._pop(now := time.monotonic())) is not None:
+            alive = now - pooled.released_at < self.ping_after or is_alive(pooled.connection)
+            with self._lock:
+                if alive:
+                    self.stats.reused += 1
+                else:
+                    self.stats.stale += 1
+            if alive:
+                return pooled
+            self._close(pooled)
+
+        pooled = PooledConnection(connect(), time.monotonic())
+        with self._lock:
+            self.stats.opened += 1
+        return pooled
+
+    def release(self, pooled: PooledConnection, reusable: bool = True) -> None:
+        """Give a connection back, closing it if it cannot be kept.
+
+        :param pooled: Connection obtained from ``acquire``.
+        :param reusable: False if the connection is in an unknown state and must be closed.
+        """
+        now = time.monotonic()
+        pooled.released_at = now
+
+        if reusable and now - pooled.created_at < self.max_age:
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(pooled)
+                    return
+
+        self._close(pooled)
+
+    def clear(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for pooled in idle:
+            self._close(pooled)
+
+    def _pop(self, now: float) -> PooledConnection | None:
+        expired = []
+        with self._lock:
+            while self._idle and self._expired(self._idle[0], now):
+                expired.append(self._idle.popleft())
+            # A connection past its max age may have been released after younger ones still usable
+            while self._idle and self._expired(self._idle[-1], now):
+                expired.append(self._idle.pop())
+            pooled = self._idle.pop() if self._idle else None
+            self.stats.evicted += len(expired)
+        for stale in expired:
+            self._close(stale)
+        return pooled
+
+    def _expired(self, pooled: PooledConnection, now: float) -> bool:
+        return now - pooled.released_at >= self.idle_timeout or now - pooled.created_at >= self.max_age
+
+    def _close(self, pooled: PooledConnection) -> None:
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
@@ -0,0 +1,342 @@
+"""Process-wide caches shared by the MCP tools."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass, replace
+from typing import Any
+
+import pydantic_core
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Max
+
+from .concurrency import SingleFlight
+from .instrumentation import current_call, register_counters
+from .models import Metadata
+from .schemas.metadata import (
+    MEMBERSHIP_TYPE_LABELS,
+    MembershipTypeItem,
+    MetadataItem,
+    MetadataResponse,
+    MetadataType,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class MetadataTable:
+    """All metadata items, grouped by type in ``(position, value)`` order.
+
+    The ``get_metadata`` response is built once per table and identified by a
+    hash of its content exposed as ``version``. It is kept as a model rather
+    than as JSON, as FastMCP validates and serializes structured tool results
+    itself on every call.
+    """
+
+    items: dict[str, dict[int, MetadataItem]]
+    signature: tuple[int, int | None]
+    loaded_at: float
+    checked_at: float
+    response: MetadataResponse
+
+    @classmethod
+    def build(
+        cls, items: dict[str, dict[int, MetadataItem]], signature: tuple[int, int | None], now: float
+    ) -> "MetadataTable":
+        """Build a table and its precomputed response.
+
+        :param items: Metadata items by type and id, in display order.
+        :param signature: Result of the change probe when the items were read.
+        :param now: Monotonic time of the load.
+        :returns: The table.
+        """
+        response = MetadataResponse(
+            topics=list(items.get(MetadataType.TOPIC.value, {}).values()),
+            application_areas=list(items.get(MetadataType.APPLICATION_AREA.value, {}).values()),
+            institution_types=list(items.get(MetadataType.INSTITUTION_TYPE.value, {}).values()),
+            membership_types=[
+                MembershipTypeItem(key=key, label=label) for key, label in MEMBERSHIP_TYPE_LABELS.items()
+            ],
+        )
+        version = hashlib.sha256(pydantic_core.to_json(response)).hexdigest()[:16]
+        response = response.model_copy(update={"version": version})
+
+        return cls(
+            items=items,
+            signature=signature,
+            loaded_at=now,
+            checked_at=now,
+            response=response,
+        )
+
+    @property
+    def version(self) -> str:
+        """Content hash of the metadata response."""
+        return self.response.version  # type: ignore
+
+    def item(self, type_key: str, item_id: int | None) -> MetadataItem | None:
+        """Get a metadata item of a given type.
+
+        :param type_key: Metadata type, e.g. ``topic``.
+        :param item_id: Id of the item.
+        :returns: The item, or None if there is no such item of that type.
+        """
+        return self.items.get(type_key, {}).get(item_id)  # type: ignore
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Counters describing how a cache has been used."""
+
+    hits: int = 0
+    misses: int = 0
+    probes: int = 0
+    reloads: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class MetadataCache:
+    """Metadata loaded once and revalidated with a cheap probe after a TTL.
+
+    Within the TTL the cached table is returned without touching the database.
+    Once it has expired, a ``COUNT``/``MAX(id)`` probe on ``hipeac_metadata``
+    decides whether the full table needs to be reloaded; a reload is also
+    forced after ``max_age`` to pick up renamed items. Concurrent callers
+    share a single in-flight revalidation.
+    """
+
+    def __init__(self, ttl: float, max_age: float):
+        """Create an empty cache.
+
+        :param ttl: Seconds during which the table is served without any query.
+        :param max_age: Seconds after which the table is reloaded even if the probe is unchanged.
+        """
+        self.ttl = ttl
+        self.max_age = max_age
+        self.stats = CacheStats()
+        self._table: MetadataTable | None = None
+        self._pinned = False
+        self._revalidation = SingleFlight()
+
+    async def get(self) -> MetadataTable:
+        """Get the metadata table, revalidating it if the TTL has expired.
+
+        :returns: The metadata table.
+        """
+        table = self._table
+        if table is not None and (self._pinned or time.monotonic() - table.checked_at < self.ttl):
+            self.stats.hits += 1
+            return table
+
+        self.stats.misses += 1
+        return await self._revalidation.do(None, lambda: self._revalidate(table))
+
+    @property
+    def version(self) -> str | None:
+        """Version of the cached table, or None if nothing is loaded yet."""
+        return self._table.version if self._table is not None else None
+
+    def pin(self, table: MetadataTable | None) -> None:
+        """Serve a fixed table that is never revalidated, e.g. loaded from an exported snapshot.
+
+        :param table: Table to serve, or None to go back to loading it from the database.
+        """
+        self._pinned = table is not None
+        self._table = table
+
+    def invalidate(self) -> None:
+        """Drop the cached table so the next call reloads it."""
+        self._pinned = False
+        self._table = None
+
+    async def _revalidate(self, table: MetadataTable | None) -> MetadataTable:
+        now = time.monotonic()
+
+        if table is not None and now - table.loaded_at < self.max_age:
+            self.stats.probes += 1
+            if await self._probe() == table.signature:
+                self._table = replace(table, checked_at=now)
+                return self._table
+
+        self.stats.reloads += 1
+        self._table = await self._load(now)
+        return self._table
+
+    async def _probe(self) -> tuple[int, int | None]:
+        result = await Metadata.objects.order_by().aaggregate(count=Count("id"), max_id=Max("id"))
+        return result["count"], result["max_id"]
+
+    async def _load(self, now: float) -> MetadataTable:
+        signature = await self._probe()
+        items: dict[str, dict[int, MetadataItem]] = {}
+        async for item in Metadata.objects.all().only("id", "type", "value"):
+            items.setdefault(item.type.strip(), {})[item.id] = MetadataItem(id=item.id, value=item.value)  # type: ignore
+        return MetadataTable.build(items, signature, now)
+
+
+class ContentTypeCache:
+    """Content type ids resolved once per process.
+
+    The generic relation tables point at ``django_content_type`` rows that
+    never change, so each id is looked up at most once, or never if it is
+    pinned in ``settings.CONTENT_TYPE_IDS``.
+    """
+
+    def __init__(self, pinned: dict[str, int]):
+        """Create a cache seeded with pinned ids.
+
+        :param pinned: Content type ids keyed by ``"app_label.model"``.
+        """
+        self._ids = dict(pinned)
+
+    async def get_id(self, app_label: str, model: str) -> int:
+        """Get the id of a content type, querying it on first use.
+
+        :param app_label: App label of the content type, e.g. ``hipeac``.
+        :param model: Model name of the content type, e.g. ``user``.
+        :returns: The content type id.
+        :raises ContentType.DoesNotExist: If there is no such content type.
+        """
+        key = f"{app_label}.{model}"
+        if key not in self._ids:
+            self._ids[key] = await sync_to_async(self._lookup)(app_label, model)
+        return self._ids[key]
+
+    def get_id_sync(self, app_label: str, model: str) -> int:
+        """Get the id of a content type from synchronous code, querying it on first use.
+
+        :param app_label: App label of the content type, e.g. ``hipeac``.
+        :param model: Model name of the content type, e.g. ``user``.
+        :returns: The content type id.
+        :raises ContentType.DoesNotExist: If there is no such content type.
+        """
+        key = f"{app_label}.{model}"
+        if key not in self._ids:
+            self._ids[key] = self._lookup(app_label, model)
+        return self._ids[key]
+
+    def _lookup(self, app_label: str, model: str) -> int:
+        return ContentType.objects.filter(app_label=app_label, model=model).values_list("id", flat=True).get()
+
+
+@dataclass(slots=True)
+class CachedResult:
+    """A cached tool result with its size and validity."""
+
+    value: Any
+    size: int
+    version: Hashable
+    expires_at: float
+
+
+class ResultCache:
+    """LRU cache of tool results bounded by entry count and total serialized size.
+
+    Entries expire after a TTL, and are dropped on lookup when they were
+    stored for a different data version (e.g. an older member snapshot).
+    Results are kept as models, so hits are returned without parsing; the
+    size of their JSON serialization is computed once on insertion.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        """Create an empty cache.
+
+        :param max_entries: Maximum number of results kept; 0 disables the cache.
+        :param max_bytes: Maximum total size of the serialized results kept.
+        :param ttl: Seconds during which a result is served.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.stats = CacheStats()
+        self._entries: OrderedDict[Hashable, CachedResult] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: Hashable = None) -> Any | None:
+        """Get a cached result, marking it as most recently used.
+
+        :param key: Canonical arguments of the call.
+        :param version: Current version of the data the result was computed from.
+        :returns: The result, or None on a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and (entry.version != version or entry.expires_at <= time.monotonic()):
+            self._remove(key)
+            self.stats.expirations += 1
+            entry = None
+
+        call = current_call()
+        if entry is None:
+            self.stats.misses += 1
+            if call is not None:
+                call.cache_misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        if call is not None:
+            call.cache_hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, version: Hashable = None) -> None:
+        """Cache a result, evicting the least recently used ones beyond the bounds.
+
+        :param key: Canonical arguments of the call.
+        :param value: The result.
+        :param version: Version of the data the result was computed from.
+        """
+        if self.max_entries <= 0:
+            return
+
+        size = len(pydantic_core.to_json(value))
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = CachedResult(value, size, version, time.monotonic() + self.ttl)
+        self.size += size
+
+        call = current_call()
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+            if call is not None:
+                call.cache_evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._entries.clear()
+        self.size = 0
+
+    def _remove(self, key: Hashable) -> None:
+        self.size -= self._entries.pop(key).size
+
+
+metadata_cache = MetadataCache(settings.METADATA_CACHE_TTL_SECONDS, settings.METADATA_CACHE_MAX_AGE_SECONDS)
+content_types = ContentTypeCache(settings.CONTENT_TYPE_IDS)
+search_results = ResultCache(
+    settings.SEARCH_CACHE_MAX_ENTRIES, settings.SEARCH_CACHE_MAX_BYTES, settings.SEARCH_CACHE_TTL_SECONDS
+)
+
+register_counters("metadata_cache", metadata_cache.stats)
+register_counters("search_results", search_results.stats)
+
+
+__all__ = [
+    "CacheStats",
+    "CachedResult",
+    "ContentTypeCache",
+    "MetadataCache",
+    "MetadataTable",
+    "ResultCache",
+    "content_types",
+    "metadata_cache",
+    "search_results",
+]
@@ -0,0 +1,73 @@
+"""Coalescing of identical concurrent work."""
+
+import asyncio
+import functools
+import inspect
+import json
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class SingleFlight:
+    """Share one in-flight computation between concurrent callers using the same key.
+
+    The first caller starts the computation as a task; callers arriving with
+    the same key before it completes await that task instead of starting
+    their own, and all of them get its result or exception. Nothing is kept
+    once the computation completes, so later calls compute again.
+    """
+
+    def __init__(self):
+        """Create a single-flight group with nothing in flight."""
+        self.started = 0
+        self.shared = 0
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a computation, or join the one already in flight for the same key.
+
+        A caller being cancelled does not cancel the shared computation.
+
+        :param key: Key identifying identical computations.
+        :param func: Starts the computation.
+        :returns: The result of the computation.
+        """
+        future = self._calls.get(key)
+        if future is None:
+            self.started += 1
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(functools.partial(self._forget, key))
+        else:
+            self.shared += 1
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+
+def single_flight(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Coalesce concurrent calls of a coroutine function made with identical arguments.
+
+    Arguments are bound to the signature with defaults applied, so positional,
+    keyword and omitted default arguments give the same key.
+
+    :param func: Async function whose arguments are JSON-serializable.
+    :returns: The wrapped function, with its ``SingleFlight`` group as ``flight``.
+    """
+    signature = inspect.signature(func)
+    flight = SingleFlight()
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = json.dumps(bound.arguments, sort_keys=True, default=str)
+        return await flight.do(key, lambda: func(*args, **kwargs))
+
+    wrapper.flight = flight  # type: ignore[attr-defined]
+    return wrapper
+
+
+__all__ = ["SingleFlight", "single_flight"]
@@ -1,9 +1,16 @@
 """Database utilities for HiPEAC MCP server."""
 
+import asyncio
+import functools
 import os
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
 import django
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import close_old_connections, connections
 
 
 def setup_django():
@@ -17,6 +24,85 @@ def setup_django():
         django.setup()
 
 
+def release_connections(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Close the database connections a tool opened once it finishes.
+
+    Django keeps connections per task context and every MCP tool call runs in
+    its own task, so connections must be released from the tool itself; with
+    the pooled backend, closing hands the raw connection back to the pool.
+
+    :param func: Async tool function.
+    :returns: The wrapped function.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            if any(conn.connection is not None for conn in connections.all(initialized_only=True)):
+                await sync_to_async(close_old_connections)()
+
+    return wrapper
+
+
+@functools.cache
+def query_executor() -> ThreadPoolExecutor:
+    """Get the thread pool running the concurrent queries of every tool call.
+
+    It is shared by the whole process and sized to ``settings.DB_QUERY_CONCURRENCY``,
+    so concurrent queries never hold more connections than the pool keeps.
+
+    :returns: The executor, created on first use.
+    """
+    return ThreadPoolExecutor(max(settings.DB_QUERY_CONCURRENCY, 1), thread_name_prefix="hipeac-mcp-query")
+
+
+def _run_and_close(func: Callable[..., Any], *args) -> Any:
+    try:
+        return func(*args)
+    finally:
+        # Executor threads are not tied to a tool call, so their connection goes back to the pool right away
+        close_old_connections()
+
+
+async def run_query(func: Callable[..., Any], *args) -> Any:
+    """Run a synchronous database query in the query executor.
+
+    Unlike ``sync_to_async``, which runs every query of a tool call in turn on
+    one thread, queries run this way can overlap, each on its own connection.
+    Queries waiting for a free thread are dropped if the caller is cancelled,
+    for instance when the client disconnects; running ones are left to finish,
+    MySQL aborting them after ``settings.DB_QUERY_TIMEOUT_SECONDS``.
+
+    :param func: Function evaluating the query, such as ``list`` or ``queryset.count``.
+    :param args: Arguments passed to ``func``, such as the queryset.
+    :returns: The result of ``func``.
+    :raises TimeoutError: If the query takes longer than ``settings.DB_QUERY_TIMEOUT_SECONDS``.
+    """
+    async with asyncio.timeout(settings.DB_QUERY_TIMEOUT_SECONDS or None):
+        return await sync_to_async(_run_and_close, thread_sensitive=False, executor=query_executor())(func, *args)
+
+
+async def gather_queries(*aws: Awaitable[Any]) -> list[Any]:
+    """Await independent queries concurrently, so a tool call takes as long as the slowest one.
+
+    As soon as one fails, the others are cancelled, and its exception is raised once
+    they are done: queries still waiting for a thread are then known not to run.
+
+    :param aws: Awaitables, usually ``run_query`` calls.
+    :returns: Their results, in order.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.wait(tasks)
+        raise
+
+
 class ReadOnlyRouter:
     """Database router that enforces read-only access.
 
@@ -53,4 +139,4 @@ class ReadOnlyRouter:
         return False
 
 
-__all__ = ["setup_django", "ReadOnlyRouter"]
+__all__ = ["gather_queries", "query_executor", "release_connections", "run_query", "setup_django", "ReadOnlyRouter"]
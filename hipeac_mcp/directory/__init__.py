@@ -0,0 +1,66 @@
+"""In-memory member directory used to answer searches without the database."""
+
+from . import bitsets
+from .engine import SnapshotEngine, aggregates_ready, engine, get_snapshot
+from .graph import CollaborationGraph, Connectivity, LinkKind, PathSearch, PathStep
+from .refresh import DirectoryRefresher, RefreshStats
+from .similarity import SimilarityIndex
+from .snapshot import (
+    DirectoryRows,
+    DirectorySnapshot,
+    Facet,
+    InstitutionAggregate,
+    InstitutionRecord,
+    MemberRecord,
+    MetadataRecord,
+    SearchPage,
+    SortKey,
+    build_snapshot,
+    load_snapshot,
+    member_records,
+)
+from .storage import (
+    SharedSnapshotFile,
+    export_snapshot,
+    import_snapshot,
+    open_snapshot,
+    serialize_snapshot,
+    snapshot_from_buffer,
+    write_snapshot,
+)
+
+
+__all__ = [
+    "bitsets",
+    "CollaborationGraph",
+    "Connectivity",
+    "DirectoryRefresher",
+    "DirectoryRows",
+    "DirectorySnapshot",
+    "Facet",
+    "InstitutionAggregate",
+    "InstitutionRecord",
+    "LinkKind",
+    "MemberRecord",
+    "MetadataRecord",
+    "PathSearch",
+    "PathStep",
+    "RefreshStats",
+    "SearchPage",
+    "SharedSnapshotFile",
+    "SimilarityIndex",
+    "SnapshotEngine",
+    "SortKey",
+    "aggregates_ready",
+    "build_snapshot",
+    "engine",
+    "export_snapshot",
+    "get_snapshot",
+    "import_snapshot",
+    "load_snapshot",
+    "member_records",
+    "open_snapshot",
+    "serialize_snapshot",
+    "snapshot_from_buffer",
+    "write_snapshot",
+]
@@ -0,0 +1,160 @@
+"""Background refresh of the member directory snapshot."""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import Context
+from weakref import WeakKeyDictionary
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from ..instrumentation import register_counters
+from .refresh import DirectoryRefresher
+from .snapshot import DirectorySnapshot
+from .storage import SharedSnapshotFile
+
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotEngine:
+    """Keep an up-to-date directory snapshot, rebuilt in the background.
+
+    The current snapshot is replaced by a single reference assignment once a
+    rebuild has completed, so readers always see either the old or the new
+    snapshot and never wait for a rebuild.
+    """
+
+    def __init__(self, loader: Callable[[], DirectorySnapshot], refresh_interval: float):
+        """Create an engine without loading anything yet.
+
+        :param loader: Synchronous function building a new snapshot from the database.
+        :param refresh_interval: Seconds between two rebuilds.
+        """
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.pinned = False
+        self._snapshot: DirectorySnapshot | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def snapshot(self) -> DirectorySnapshot | None:
+        """The latest snapshot, or None until the first build has completed."""
+        return self._snapshot
+
+    def pin(self, snapshot: DirectorySnapshot | None) -> None:
+        """Serve a fixed snapshot that is never rebuilt, e.g. loaded from an exported file.
+
+        :param snapshot: Snapshot to serve, or None to go back to rebuilding from the database.
+        """
+        self.pinned = snapshot is not None
+        self._snapshot = snapshot
+
+    async def refresh(self) -> DirectorySnapshot:
+        """Rebuild the snapshot in a worker thread and swap it in.
+
+        :returns: The new snapshot.
+        """
+        snapshot = await sync_to_async(self.loader, thread_sensitive=False)()
+        self._snapshot = snapshot
+        logger.info("Member snapshot rebuilt with %d members", len(snapshot))
+        return snapshot
+
+    def start(self) -> None:
+        """Start the background refresh loop on the running event loop, if not already running."""
+        if self.pinned:
+            return
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        # Run in a fresh context so rebuilds are not attributed to the tool call that started them
+        self._task = loop.create_task(self._refresh_forever(), name="member-snapshot-refresh", context=Context())
+
+    async def stop(self) -> None:
+        """Stop the background refresh loop."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Member snapshot rebuild failed, keeping the previous snapshot")
+            await asyncio.sleep(self.refresh_interval)
+
+
+def _default_loader() -> Callable[[], DirectorySnapshot]:
+    refresher = DirectoryRefresher(settings.MEMBER_SNAPSHOT_FULL_REBUILD_SECONDS)
+    register_counters("snapshot_refresh", refresher.stats)
+    if settings.MEMBER_SNAPSHOT_PATH:
+        return SharedSnapshotFile(settings.MEMBER_SNAPSHOT_PATH, settings.MEMBER_SNAPSHOT_REFRESH_SECONDS, refresher)
+    return refresher
+
+
+engine = SnapshotEngine(_default_loader(), settings.MEMBER_SNAPSHOT_REFRESH_SECONDS)
+
+
+_aggregate_builds: WeakKeyDictionary[DirectorySnapshot, dict[str, Future]] = WeakKeyDictionary()
+_aggregate_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot-aggregates")
+
+
+async def aggregates_ready(snapshot: DirectorySnapshot, *names: str, wait: bool = False) -> bool:
+    """Build aggregates of a snapshot in a background thread, the first time they are asked for.
+
+    Aggregates such as the similarity index take a pass over every member, so
+    refreshes do not build them: only the snapshots and workers actually
+    serving them pay for them, one aggregate at a time and never on the event
+    loop. Callers with a database fallback use it until the aggregates are
+    ready. Pinned snapshots are always waited for, having no database to fall
+    back to.
+
+    :param snapshot: The snapshot.
+    :param names: Names of the aggregate properties, e.g. ``similarity_index``.
+    :param wait: Wait until the aggregates are built rather than only start building them.
+    :returns: Whether every aggregate is built.
+    """
+    builds = _aggregate_builds.setdefault(snapshot, {})
+    pending = []
+    for name in names:
+        # Cached properties store their value in the instance dictionary once built
+        if name in vars(snapshot):
+            continue
+        future = builds.get(name)
+        if future is None or (future.done() and future.exception() is not None):
+            future = builds[name] = _aggregate_executor.submit(getattr, snapshot, name)
+        pending.append(future)
+
+    if not pending:
+        return True
+    if not wait and not engine.pinned:
+        return False
+    await asyncio.gather(*(asyncio.wrap_future(future) for future in pending))
+    return True
+
+
+def get_snapshot() -> DirectorySnapshot | None:
+    """Get the current snapshot when the snapshot engine is enabled.
+
+    The first call starts the background refresh; until the first build has
+    completed callers get None and should query the database instead. A
+    pinned snapshot is always returned, whether the engine is enabled or not.
+
+    :returns: The current snapshot, or None if disabled or not built yet.
+    """
+    if engine.pinned:
+        return engine.snapshot
+
+    if not settings.MEMBER_SNAPSHOT_ENABLED:
+        return None
+
+    engine.start()
+    return engine.snapshot
@@ -0,0 +1,257 @@
+"""Collaboration graph of the member directory.
+
+Members are linked when they share an institution or when one is the
+advisor of the other. Shared institutions are not expanded into member
+pairs, which would grow with the square of institution sizes: the graph is
+kept bipartite, with the institutions of each member and the members of each
+institution held in CSR arrays, next to the advisor links. Walking from a
+member to its neighbors goes through its institutions, and a breadth-first
+search expands every institution at most once, so its cost grows with the
+members it reaches rather than with the links between them.
+"""
+
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from enum import Enum
+
+
+class LinkKind(str, Enum):
+    """How a member is linked to the previous member of a path, or to a member it is connected to."""
+
+    INSTITUTION = "institution"
+    ADVISOR = "advisor"
+    ADVISEE = "advisee"
+
+
+@dataclass(frozen=True, slots=True)
+class PathStep:
+    """A member of a path, with the link followed to reach it from the previous member."""
+
+    ordinal: int
+    kind: LinkKind | None = None
+    institution_id: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class PathSearch:
+    """Outcome of a bounded shortest path search."""
+
+    path: list[PathStep] | None
+    explored: int
+    """Number of members and institutions reached."""
+    exhausted: bool
+    """Whether the search gave up on its node budget rather than after its maximum depth."""
+
+
+@dataclass(frozen=True, slots=True)
+class Connectivity:
+    """How a group of members is connected, internally and to the rest of the directory."""
+
+    members: int
+    linked_institutions: frozenset[int]
+    """Institutions outside the group that members of the group are also affiliated to."""
+    advisor_links: int
+    external_advisor_links: int
+    components: int
+    largest_component: int
+
+
+def _csr(groups: Iterable[Iterable[int]]) -> tuple[array, array]:
+    offsets, values = array("I", [0]), array("I")
+    for group in groups:
+        values.extend(group)
+        offsets.append(len(values))
+    return offsets, values
+
+
+class CollaborationGraph:
+    """Members linked by shared institutions and advisor relations, by member ordinal."""
+
+    def __init__(self, institutions: Sequence[Iterable[int]], advisors: Sequence[int | None]):
+        """Build the adjacency arrays.
+
+        :param institutions: Institution ids of each member ordinal.
+        :param advisors: Ordinal of the advisor of each member ordinal, None if they have no advisor
+            in the directory.
+        """
+        member_institutions = [tuple(dict.fromkeys(ids)) for ids in institutions]
+        members_by_institution: dict[int, list[int]] = defaultdict(list)
+        for ordinal, ids in enumerate(member_institutions):
+            for institution_id in ids:
+                members_by_institution[institution_id].append(ordinal)
+
+        self.institution_offsets, self.institution_ids = _csr(member_institutions)
+        self.positions = {institution_id: position for position, institution_id in enumerate(members_by_institution)}
+        self.member_offsets, self.member_ordinals = _csr(members_by_institution.values())
+
+        advisees: list[list[int]] = [[] for _ in advisors]
+        for ordinal, advisor in enumerate(advisors):
+            if advisor is not None and advisor != ordinal:
+                advisees[advisor].append(ordinal)
+        self.advisors = array(
+            "i", (-1 if advisor is None or advisor == ordinal else advisor for ordinal, advisor in enumerate(advisors))
+        )
+        self.advisee_offsets, self.advisee_ordinals = _csr(advisees)
+
+    def __len__(self) -> int:
+        return len(self.advisors)
+
+    def institutions_of(self, ordinal: int) -> Sequence[int]:
+        """Get the institutions of a member.
+
+        :param ordinal: The member ordinal.
+        :returns: Its institution ids.
+        """
+        return self.institution_ids[self.institution_offsets[ordinal] : self.institution_offsets[ordinal + 1]]
+
+    def members_of(self, institution_id: int) -> Sequence[int]:
+        """Get the members of an institution.
+
+        :param institution_id: The institution id.
+        :returns: The ordinals of its members, ascending.
+        """
+        position = self.positions.get(institution_id)
+        if position is None:
+            return ()
+        return self.member_ordinals[self.member_offsets[position] : self.member_offsets[position + 1]]
+
+    def advisor_of(self, ordinal: int) -> int | None:
+        """Get the advisor of a member.
+
+        :param ordinal: The member ordinal.
+        :returns: The ordinal of the advisor, or None.
+        """
+        advisor = self.advisors[ordinal]
+        return None if advisor < 0 else advisor
+
+    def advisees_of(self, ordinal: int) -> Sequence[int]:
+        """Get the members advised by a member.
+
+        :param ordinal: The member ordinal.
+        :returns: The ordinals of the advisees, ascending.
+        """
+        return self.advisee_ordinals[self.advisee_offsets[ordinal] : self.advisee_offsets[ordinal + 1]]
+
+    def neighbors(self, ordinal: int) -> dict[int, list[tuple[LinkKind, int | None]]]:
+        """Get the members directly linked to a member, with every link between them.
+
+        :param ordinal: The member ordinal.
+        :returns: ``(kind, institution id)`` links by neighbor ordinal, advisor links first.
+        """
+        links: dict[int, list[tuple[LinkKind, int | None]]] = defaultdict(list)
+        for other, kind, institution_id in self._links(ordinal, set()):
+            if other != ordinal:
+                links[other].append((kind, institution_id))
+        return dict(links)
+
+    def shortest_path(self, source: int, target: int, max_depth: int, max_nodes: int) -> PathSearch:
+        """Find a shortest chain of links between two members with a bounded breadth-first search.
+
+        The search gives up after ``max_depth`` links, or as soon as ``max_nodes`` members
+        and institutions have been reached, whichever comes first.
+
+        :param source: Ordinal of the first member.
+        :param target: Ordinal of the last member.
+        :param max_depth: Maximum number of links in the path.
+        :param max_nodes: Maximum number of members and institutions reached by the search.
+        :returns: The path from ``source`` to ``target``, or no path if there is none within the bounds.
+        """
+        parents: dict[int, tuple[int, LinkKind | None, int | None]] = {source: (source, None, None)}
+        expanded: set[int] = set()
+        frontier = [source]
+
+        for _ in range(max_depth if source != target else 0):
+            next_frontier = []
+            for ordinal in frontier:
+                for other, kind, institution_id in self._links(ordinal, expanded):
+                    if other in parents:
+                        continue
+                    if other != target and len(parents) + len(expanded) >= max_nodes:
+                        return PathSearch(None, len(parents) + len(expanded), True)
+                    parents[other] = (ordinal, kind, institution_id)
+                    if other == target:
+                        return PathSearch(self._unwind(parents, target), len(parents) + len(expanded), False)
+                    next_frontier.append(other)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        path = self._unwind(parents, target) if source == target else None
+        return PathSearch(path, len(parents) + len(expanded), False)
+
+    def connectivity(self, members: Iterable[int], institutions: Collection[int]) -> Connectivity:
+        """Describe how a group of members, e.g. of an institution or a country, is connected.
+
+        Members of the group are in the same component when a chain of shared institutions
+        or advisor relations joins them without leaving the group.
+
+        :param members: Ordinals of the members of the group.
+        :param institutions: Ids of the institutions defining the group.
+        :returns: The connectivity of the group.
+        """
+        group = set(members)
+        roots = {ordinal: ordinal for ordinal in group}
+
+        def root(ordinal: int) -> int:
+            while roots[ordinal] != ordinal:
+                roots[ordinal] = roots[roots[ordinal]]
+                ordinal = roots[ordinal]
+            return ordinal
+
+        def join(first: int, second: int) -> None:
+            roots[root(first)] = root(second)
+
+        touched = {institution_id for ordinal in group for institution_id in self.institutions_of(ordinal)}
+        for institution_id in touched:
+            inside = [other for other in self.members_of(institution_id) if other in group]
+            for other in inside[1:]:
+                join(other, inside[0])
+
+        advisor_links = external_advisor_links = 0
+        for ordinal in group:
+            if (advisor := self.advisor_of(ordinal)) is not None:
+                if advisor in group:
+                    advisor_links += 1
+                    join(ordinal, advisor)
+                else:
+                    external_advisor_links += 1
+            external_advisor_links += sum(advisee not in group for advisee in self.advisees_of(ordinal))
+
+        sizes = Counter(root(ordinal) for ordinal in group)
+        return Connectivity(
+            members=len(group),
+            linked_institutions=frozenset(touched.difference(institutions)),
+            advisor_links=advisor_links,
+            external_advisor_links=external_advisor_links,
+            components=len(sizes),
+            largest_component=max(sizes.values(), default=0),
+        )
+
+    def _links(self, ordinal: int, expanded: set[int]) -> Iterator[tuple[int, LinkKind, int | None]]:
+        """Walk the links of a member, skipping institutions already expanded and marking the others."""
+        if (advisor := self.advisor_of(ordinal)) is not None:
+            yield advisor, LinkKind.ADVISOR, None
+        for advisee in self.advisees_of(ordinal):
+            yield advisee, LinkKind.ADVISEE, None
+        for institution_id in self.institutions_of(ordinal):
+            if institution_id in expanded:
+                continue
+            expanded.add(institution_id)
+            for other in self.members_of(institution_id):
+                yield other, LinkKind.INSTITUTION, institution_id
+
+    @staticmethod
+    def _unwind(parents: dict[int, tuple[int, LinkKind | None, int | None]], target: int) -> list[PathStep]:
+        path = []
+        ordinal = target
+        while True:
+            previous, kind, institution_id = parents[ordinal]
+            path.append(PathStep(ordinal, kind, institution_id))
+            if previous == ordinal:
+                return path[::-1]
+            ordinal = previous
+
+
+__all__ = ["CollaborationGraph", "Connectivity", "LinkKind", "PathSearch", "PathStep"]
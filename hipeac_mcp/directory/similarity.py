@@ -0,0 +1,94 @@
+"""Member similarity by shared topics and application areas.
+
+Members are rows of a sparse binary incidence matrix over metadata ids
+(topics and application areas), held in CSR form with the transposed
+postings alongside. Features are weighted by their smoothed inverse
+document frequency, so sharing a rare topic counts more than sharing a
+popular one, and members are compared with the cosine of their weighted
+rows. The similarities of one member to every other are the product of the
+matrix with its row: the postings of its features are walked once,
+accumulating weights per member, and the best ones are picked with a heap.
+"""
+
+import heapq
+import math
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+
+
+class SimilarityIndex:
+    """TF-IDF weighted member × feature incidence matrix."""
+
+    def __init__(
+        self,
+        features: Sequence[Iterable[int]],
+        frequencies: Mapping[int, int] | None = None,
+        total: int | None = None,
+    ):
+        """Index the features of every member.
+
+        :param features: Feature ids (metadata ids) of each member ordinal.
+        :param frequencies: Number of members having each feature, when the indexed members are
+            only part of the directory; counted from ``features`` by default.
+        :param total: Number of members of the directory, ``len(features)`` by default.
+        """
+        self.offsets = array("I", [0])
+        self.features = array("I")
+        postings: dict[int, list[int]] = defaultdict(list)
+        for ordinal, member_features in enumerate(features):
+            unique = sorted(set(member_features))
+            self.features.extend(unique)
+            self.offsets.append(len(self.features))
+            for feature in unique:
+                postings[feature].append(ordinal)
+        self.postings = {feature: array("I", ordinals) for feature, ordinals in postings.items()}
+
+        if frequencies is None:
+            frequencies = {feature: len(ordinals) for feature, ordinals in self.postings.items()}
+        total = len(features) if total is None else total
+        self.weights = {
+            feature: (math.log((1 + total) / (1 + frequencies.get(feature, 0))) + 1) ** 2 for feature in self.postings
+        }
+        self.norms = array(
+            "d",
+            (
+                math.sqrt(sum(self.weights[feature] for feature in self.features_of(ordinal)))
+                for ordinal in range(len(self.offsets) - 1)
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def features_of(self, ordinal: int) -> Sequence[int]:
+        """Get the features of a member.
+
+        :param ordinal: The member ordinal.
+        :returns: Its feature ids, ascending.
+        """
+        return self.features[self.offsets[ordinal] : self.offsets[ordinal + 1]]
+
+    def similar(self, ordinal: int, limit: int) -> list[tuple[float, int]]:
+        """Find the members most similar to one member.
+
+        :param ordinal: The member ordinal.
+        :param limit: Maximum number of members to return.
+        :returns: ``(cosine similarity, ordinal)`` pairs of members sharing at least one feature
+            with it, most similar first then by ordinal, leaving the member itself out.
+        """
+        scores = [0.0] * len(self)
+        for feature in self.features_of(ordinal):
+            weight = self.weights[feature]
+            for other in self.postings[feature]:
+                scores[other] += weight
+        scores[ordinal] = 0.0
+
+        norm, norms = self.norms[ordinal], self.norms
+        best = heapq.nlargest(
+            limit, ((score / (norm * norms[other]), -other) for other, score in enumerate(scores) if score)
+        )
+        return [(score, -negated) for score, negated in best]
+
+
+__all__ = ["SimilarityIndex"]
@@ -0,0 +1,603 @@
+"""Immutable in-memory snapshot of the member directory.
+
+A snapshot holds compact records for every active member together with
+inverted indexes from each filterable facet value to a bitset of member
+ordinals. Ordinals are positions in the ``(last_name, id)`` ordering of
+members, so walking a bitset from its lowest bit yields members in order.
+"""
+
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import cached_property
+from itertools import islice
+
+from django.db import connection
+from django.db.models import Exists, OuterRef, QuerySet
+
+from ..cache import content_types
+from ..models import Institution, Membership, Metadata, RelApplicationArea, RelInstitution, RelTopic, User
+from . import bitsets
+from .graph import CollaborationGraph
+from .similarity import SimilarityIndex
+from .text import TrigramIndex, normalize, padded_trigrams
+
+
+class Facet(str, Enum):
+    """Filterable member attributes with an inverted index."""
+
+    TOPIC = "topic"
+    APPLICATION_AREA = "application_area"
+    COUNTRY = "country"
+    INSTITUTION_TYPE = "institution_type"
+    MEMBERSHIP_TYPE = "membership_type"
+
+
+@dataclass(frozen=True, slots=True)
+class MetadataRecord:
+    """A metadata row (topic, application area, institution type...)."""
+
+    id: int
+    type: str
+    value: str
+
+
+@dataclass(frozen=True, slots=True)
+class InstitutionRecord:
+    """An institution row."""
+
+    id: int
+    name: str
+    country: str
+    type_id: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class MemberRecord:
+    """An active member with the ids of everything linked to them."""
+
+    id: int
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+    membership_type: str
+    institution_ids: tuple[int, ...] = ()
+    topic_ids: tuple[int, ...] = ()
+    application_area_ids: tuple[int, ...] = ()
+    advisor_id: int | None = None
+
+
+@dataclass(slots=True)
+class DirectoryRows:
+    """Raw rows read from the database, as plain tuples."""
+
+    users: list[tuple[int, str, str, str, str]] = field(default_factory=list)
+    memberships: list[tuple[int, str]] = field(default_factory=list)
+    institutions: list[tuple[int, str, str, int | None]] = field(default_factory=list)
+    user_institutions: list[tuple[int, int]] = field(default_factory=list)
+    user_topics: list[tuple[int, int]] = field(default_factory=list)
+    user_application_areas: list[tuple[int, int]] = field(default_factory=list)
+    metadata: list[tuple[int, str, str]] = field(default_factory=list)
+    advisors: list[tuple[int, int]] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class InstitutionAggregate:
+    """The number of active members of an institution and how many of them have each topic."""
+
+    institution: InstitutionRecord
+    normalized_name: str
+    member_count: int
+    topic_counts: tuple[tuple[int, int], ...]
+    """``(topic_id, members)`` pairs, largest first."""
+
+
+SortKey = tuple[int, str, int]
+"""Position of a member in search results: text match rank, last name and id."""
+
+
+@dataclass(frozen=True, slots=True)
+class SearchPage:
+    """One page of search results."""
+
+    total: int
+    ordinals: list[int]
+    next_after: SortKey | None
+
+
+class DirectorySnapshot:
+    """Read-only view of the member directory with per-facet inverted indexes."""
+
+    def __init__(
+        self,
+        members: tuple[MemberRecord, ...],
+        institutions: dict[int, InstitutionRecord],
+        metadata: dict[int, MetadataRecord],
+    ):
+        """Index the given records.
+
+        :param members: Active members, in any order.
+        :param institutions: Institutions by id.
+        :param metadata: Metadata items by id.
+        """
+        self.members = tuple(sorted(members, key=lambda member: (member.last_name, member.id)))
+        self.sort_keys = [(member.last_name, member.id) for member in self.members]
+        self.institutions = institutions
+        self.metadata = metadata
+        self.built_at = time.time()
+        self.all_members = (1 << len(self.members)) - 1
+        self._index = self._build_index()
+        self.text_index = TrigramIndex([_searchable_fields(member) for member in self.members])
+
+    @classmethod
+    def from_storage(
+        cls,
+        members: Sequence[MemberRecord],
+        sort_keys: Sequence[tuple[str, int]],
+        institutions: dict[int, InstitutionRecord],
+        metadata: dict[int, MetadataRecord],
+        index: Mapping[Facet, Mapping[int | str, int]],
+        text_index: TrigramIndex,
+        built_at: float,
+    ) -> "DirectorySnapshot":
+        """Wrap records and indexes that are already built, e.g. mapped from a snapshot file.
+
+        :param members: Active members, in ``(last_name, id)`` order.
+        :param sort_keys: ``(last_name, id)`` of each member, by ordinal.
+        :param institutions: Institutions by id.
+        :param metadata: Metadata items by id.
+        :param index: Bitset of members per facet value.
+        :param text_index: Trigram index over the members.
+        :param built_at: Time at which the directory was read from the database.
+        :returns: The snapshot.
+        """
+        snapshot = cls.__new__(cls)
+        snapshot.members = members
+        snapshot.sort_keys = sort_keys
+        snapshot.institutions = institutions
+        snapshot.metadata = metadata
+        snapshot.built_at = built_at
+        snapshot.all_members = (1 << len(members)) - 1
+        snapshot._index = index
+        snapshot.text_index = text_index
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def _build_index(self) -> dict[Facet, dict[int | str, int]]:
+        postings: dict[Facet, dict[int | str, list[int]]] = {facet: defaultdict(list) for facet in Facet}
+
+        for ordinal, member in enumerate(self.members):
+            for facet, value in _facet_values(member, self.institutions):
+                postings[facet][value].append(ordinal)
+
+        return {
+            facet: {value: bitsets.from_ordinals(ordinals) for value, ordinals in values.items()}
+            for facet, values in postings.items()
+        }
+
+    def patched(self, changes: Mapping[int, MemberRecord | None]) -> "DirectorySnapshot":
+        """Build a new snapshot with some members replaced, added or removed.
+
+        Unchanged members keep their records, and the postings of the new
+        snapshot are derived from the current ones: runs of unchanged members
+        are shifted to their new ordinals as a whole, then the changed members
+        are added back. Nothing is re-read or re-tokenized, so the cost grows
+        with the number of changes rather than with the size of the directory.
+
+        :param changes: New record of each changed member by user id, or None for removed members.
+        :returns: The new snapshot, or this one if there are no changes.
+        """
+        if not changes:
+            return self
+
+        removed = {ordinal for ordinal, member in enumerate(self.members) if member.id in changes}
+        added = sorted(
+            (record for record in changes.values() if record is not None),
+            key=lambda member: (member.last_name, member.id),
+        )
+        inserted: dict[int, list[MemberRecord]] = defaultdict(list)
+        for record in added:
+            inserted[bisect_left(self.sort_keys, (record.last_name, record.id))].append(record)
+
+        # Copy runs of unchanged members, recording where each run moves, with the added members in between
+        members: list[MemberRecord] = []
+        documents: list[tuple[str, ...]] = []
+        runs: list[tuple[int, int, int]] = []
+        added_ordinals: list[int] = []
+        position = 0
+        for boundary in sorted(removed | inserted.keys() | {len(self.members)}):
+            if boundary > position:
+                runs.append((position, boundary - position, len(members)))
+                members.extend(self.members[position:boundary])
+                documents.extend(self.text_index.documents[position:boundary])
+            for record in inserted.get(boundary, ()):
+                added_ordinals.append(len(members))
+                members.append(record)
+                documents.append(_searchable_fields(record))
+            position = boundary + 1 if boundary in removed else boundary
+
+        index: dict[Facet, dict[int | str, int]] = {
+            facet: {value: bits for value, bits in self._index[facet].items()} for facet in Facet
+        }
+        if runs != [(0, len(self.members), 0)]:
+            for values in index.values():
+                for value, bits in values.items():
+                    values[value] = bitsets.remap(bits, runs)
+
+        # Postings ending before the first change are shared with this snapshot, the others are copied
+        first_change = min(removed | inserted.keys())
+        text_postings = dict(self.text_index.postings)
+        copied = set()
+        for gram, ordinals in text_postings.items():
+            if ordinals and ordinals[-1] >= first_change:
+                text_postings[gram] = _remap_ordinals(ordinals, runs)
+                copied.add(gram)
+
+        for ordinal in added_ordinals:
+            for facet, value in _facet_values(members[ordinal], self.institutions):
+                index[facet][value] = index[facet].get(value, 0) | 1 << ordinal
+            grams = set()
+            for field_value in documents[ordinal]:
+                grams |= padded_trigrams(field_value)
+            for gram in grams:
+                if gram not in copied:
+                    text_postings[gram] = array("I", text_postings.get(gram, ()))
+                    copied.add(gram)
+                insort(text_postings[gram], ordinal)
+
+        return DirectorySnapshot.from_storage(
+            members=tuple(members),
+            sort_keys=[(member.last_name, member.id) for member in members],
+            institutions=self.institutions,
+            metadata=self.metadata,
+            index={facet: {value: bits for value, bits in values.items() if bits} for facet, values in index.items()},
+            text_index=TrigramIndex.from_postings(
+                documents, {gram: ordinals for gram, ordinals in text_postings.items() if ordinals}
+            ),
+            built_at=time.time(),
+        )
+
+    def postings(self, facet: Facet, value: int | str) -> int:
+        """Get the members having a facet value.
+
+        :param facet: The facet to look up.
+        :param value: The facet value.
+        :returns: Bitset of matching members (0 if none).
+        """
+        return self._index[facet].get(value, 0)
+
+    def filter(self, filters: dict[Facet, Iterable[int | str]]) -> int:
+        """Find members matching every facet filter.
+
+        Values inside a facet are combined with OR, facets with AND.
+
+        :param filters: Accepted values per facet; facets with no values are ignored.
+        :returns: Bitset of matching members.
+        """
+        matches = self.all_members
+
+        for facet, values in filters.items():
+            values = list(values)
+            if not values:
+                continue
+            matches &= bitsets.union(self.postings(facet, value) for value in values)
+            if not matches:
+                break
+
+        return matches
+
+    @cached_property
+    def ordinals_by_username(self) -> dict[str, int]:
+        """Ordinal of every member by lowercase username.
+
+        Like the other aggregates, the index is built the first time it is
+        needed, with a pass over every member.
+        """
+        return {member.username.lower(): ordinal for ordinal, member in enumerate(self.members)}
+
+    @cached_property
+    def institution_aggregates(self) -> dict[int, InstitutionAggregate]:
+        """Member count and topic histogram of every institution having active members.
+
+        The aggregates are built in one pass over the members, the first time
+        they are needed, and belong to this snapshot: a refreshed directory is
+        a new snapshot with its own aggregates.
+        """
+        counts: Counter[int] = Counter()
+        topics: dict[int, Counter[int]] = defaultdict(Counter)
+        for member in self.members:
+            for institution_id in dict.fromkeys(member.institution_ids):
+                if institution_id in self.institutions:
+                    counts[institution_id] += 1
+                    topics[institution_id].update(set(member.topic_ids))
+
+        return {
+            institution_id: InstitutionAggregate(
+                institution=self.institutions[institution_id],
+                normalized_name=normalize(self.institutions[institution_id].name),
+                member_count=count,
+                topic_counts=tuple(sorted(topics[institution_id].items(), key=lambda item: (-item[1], item[0]))),
+            )
+            for institution_id, count in counts.items()
+        }
+
+    @cached_property
+    def similarity_index(self) -> SimilarityIndex:
+        """Incidence of members and their topics and application areas, by ordinal.
+
+        Built the first time it is needed, once per snapshot.
+        """
+        return SimilarityIndex([member.topic_ids + member.application_area_ids for member in self.members])
+
+    @cached_property
+    def collaboration_graph(self) -> CollaborationGraph:
+        """Members linked by shared institutions and advisor relations, by ordinal.
+
+        Built the first time it is needed, once per snapshot; advisors who are not
+        active members are left out.
+        """
+        ordinals = {member.id: ordinal for ordinal, member in enumerate(self.members)}
+        return CollaborationGraph(
+            [[id for id in member.institution_ids if id in self.institutions] for member in self.members],
+            [ordinals.get(member.advisor_id) if member.advisor_id is not None else None for member in self.members],
+        )
+
+    def search_institutions(
+        self, query: str | None, countries: Iterable[str], type_ids: Iterable[int]
+    ) -> list[InstitutionAggregate]:
+        """Find the institutions having active members, by name, country and type.
+
+        :param query: Optional text looked up in institution names, ignoring case and accents.
+        :param countries: Accepted ISO country codes; all countries if empty.
+        :param type_ids: Accepted institution type ids; all types if empty.
+        :returns: The matching institutions, by decreasing number of members then by name.
+        """
+        needle = normalize(query) if query else ""
+        countries, type_ids = set(countries), set(type_ids)
+        found = [
+            aggregate
+            for aggregate in self.institution_aggregates.values()
+            if (not countries or aggregate.institution.country in countries)
+            and (not type_ids or aggregate.institution.type_id in type_ids)
+            and (not needle or needle in aggregate.normalized_name)
+        ]
+        return sorted(found, key=lambda aggregate: (-aggregate.member_count, aggregate.institution.name))
+
+    def find(self, usernames: Iterable[str]) -> list[int | None]:
+        """Look members up by username, ignoring case.
+
+        The username index is built on the first lookup; build it with
+        ``aggregates_ready`` to keep that pass off the event loop.
+
+        :param usernames: Usernames to look up.
+        :returns: The ordinal of each member, or None for usernames of no active member.
+        """
+        ordinals = self.ordinals_by_username
+        return [ordinals.get(username.lower()) for username in usernames]
+
+    def matching(self, query: str | None, filters: dict[Facet, Iterable[int | str]]) -> int:
+        """Find every member matching a free-text query and facet filters, regardless of rank.
+
+        :param query: Optional text looked up in names, username and email.
+        :param filters: Accepted values per facet, see :meth:`filter`.
+        :returns: Bitset of matching members.
+        """
+        matches = self.filter(filters)
+        if query and matches:
+            matches &= bitsets.from_ordinals(ordinal for _, ordinal in self.text_index.search(query))
+        return matches
+
+    def facet_counts(self, matches: int) -> dict[Facet, dict[int | str, int]]:
+        """Count members of a set having each facet value.
+
+        :param matches: Bitset of the members to count, see :meth:`matching`.
+        :returns: Number of members by value for every facet, leaving out values no member has.
+        """
+        return {
+            facet: {value: count for value, bits in values.items() if (count := (bits & matches).bit_count())}
+            for facet, values in self._index.items()
+        }
+
+    def search(
+        self,
+        query: str | None,
+        filters: dict[Facet, Iterable[int | str]],
+        after: SortKey | None = None,
+        limit: int = 20,
+    ) -> SearchPage:
+        """Find a page of members matching a free-text query and facet filters.
+
+        Results are ordered by text match rank (always 0 without a query), then
+        by ``(last_name, id)``, which makes the sort key of the last member a
+        stable keyset cursor for the next page.
+
+        :param query: Optional text looked up in names, username and email.
+        :param filters: Accepted values per facet, see :meth:`filter`.
+        :param after: Sort key of the last member of the previous page.
+        :param limit: Maximum number of members in the page.
+        :returns: The page with the total number of matches.
+        """
+        matches = self.filter(filters)
+        start = (after[0], bisect_right(self.sort_keys, after[1:])) if after else (0, 0)
+
+        if not query:
+            total = matches.bit_count()
+            hits = [(0, ordinal) for ordinal in islice(bitsets.iter_ordinals(matches, start[1]), limit + 1)]
+        else:
+            ranked = self.text_index.search(query)
+            if matches != self.all_members:
+                allowed = set(bitsets.iter_ordinals(matches & bitsets.from_ordinals(ordinal for _, ordinal in ranked)))
+                ranked = [hit for hit in ranked if hit[1] in allowed]
+            total = len(ranked)
+            position = bisect_left(ranked, start)
+            hits = ranked[position : position + limit + 1]
+
+        page = hits[:limit]
+        next_after = None
+        if len(hits) > limit:
+            rank, ordinal = page[-1]
+            next_after = (rank, *self.sort_keys[ordinal])
+
+        return SearchPage(total=total, ordinals=[ordinal for _, ordinal in page], next_after=next_after)
+
+
+def _facet_values(
+    member: MemberRecord, institutions: Mapping[int, InstitutionRecord]
+) -> Iterable[tuple[Facet, int | str]]:
+    yield Facet.MEMBERSHIP_TYPE, member.membership_type
+    for topic_id in member.topic_ids:
+        yield Facet.TOPIC, topic_id
+    for area_id in member.application_area_ids:
+        yield Facet.APPLICATION_AREA, area_id
+    for institution_id in member.institution_ids:
+        institution = institutions.get(institution_id)
+        if institution is None:
+            continue
+        yield Facet.COUNTRY, institution.country
+        if institution.type_id is not None:
+            yield Facet.INSTITUTION_TYPE, institution.type_id
+
+
+def _remap_ordinals(ordinals: Sequence[int], runs: list[tuple[int, int, int]]) -> array:
+    remapped = array("I")
+    for start, length, new_start in runs:
+        low, high = bisect_left(ordinals, start), bisect_left(ordinals, start + length)
+        if new_start == start:
+            remapped.extend(ordinals[low:high])
+        else:
+            remapped.extend(ordinal + new_start - start for ordinal in ordinals[low:high])
+    return remapped
+
+
+def _searchable_fields(member: MemberRecord) -> tuple[str, ...]:
+    return tuple(
+        normalize(value)
+        for value in (
+            member.first_name,
+            member.last_name,
+            f"{member.first_name} {member.last_name}",
+            member.username,
+            member.email,
+        )
+    )
+
+
+def build_snapshot(rows: DirectoryRows) -> DirectorySnapshot:
+    """Assemble a snapshot from raw database rows.
+
+    Only users with an active membership are kept; when a user has several
+    active memberships, the first one wins, and the advisor of the first one
+    having an advisor is kept.
+
+    :param rows: Rows read from the database.
+    :returns: A new snapshot.
+    """
+    return DirectorySnapshot(
+        members=tuple(member_records(rows)),
+        institutions={row[0]: InstitutionRecord(*row) for row in rows.institutions},
+        metadata={id: MetadataRecord(id, type.strip(), value) for id, type, value in rows.metadata},
+    )
+
+
+def member_records(rows: DirectoryRows) -> list[MemberRecord]:
+    """Build the records of the users with an active membership.
+
+    :param rows: Rows read from the database; institutions and metadata are not used.
+    :returns: The records, in the order of ``rows.users``.
+    """
+    membership_by_user: dict[int, str] = {}
+    for user_id, membership_type in rows.memberships:
+        membership_by_user.setdefault(user_id, membership_type)
+
+    advisor_by_user: dict[int, int] = {}
+    for user_id, advisor_id in rows.advisors:
+        advisor_by_user.setdefault(user_id, advisor_id)
+
+    institutions_by_user = _group_by_user(rows.user_institutions)
+    topics_by_user = _group_by_user(rows.user_topics)
+    areas_by_user = _group_by_user(rows.user_application_areas)
+
+    return [
+        MemberRecord(
+            id=user_id,
+            username=username,
+            email=email,
+            first_name=first_name,
+            last_name=last_name,
+            membership_type=membership_by_user[user_id],
+            institution_ids=institutions_by_user.get(user_id, ()),
+            topic_ids=topics_by_user.get(user_id, ()),
+            application_area_ids=areas_by_user.get(user_id, ()),
+            advisor_id=advisor_by_user.get(user_id),
+        )
+        for user_id, username, email, first_name, last_name in rows.users
+        if user_id in membership_by_user
+    ]
+
+
+def _group_by_user(pairs: Iterable[tuple[int, int]]) -> dict[int, tuple[int, ...]]:
+    grouped: dict[int, list[int]] = defaultdict(list)
+    for user_id, related_id in pairs:
+        grouped[user_id].append(related_id)
+    return {user_id: tuple(related_ids) for user_id, related_ids in grouped.items()}
+
+
+ROW_FIELDS: dict[str, tuple[str, ...]] = {
+    "users": ("id", "username", "email", "first_name", "last_name"),
+    "memberships": ("user_id", "type"),
+    "institutions": ("id", "name", "country", "type_id"),
+    "user_institutions": ("object_id", "institution_id"),
+    "user_topics": ("object_id", "topic_id"),
+    "user_application_areas": ("object_id", "application_area_id"),
+    "metadata": ("id", "type", "value"),
+    "advisors": ("user_id", "advisor_id"),
+}
+"""Columns read from each table, by ``DirectoryRows`` field."""
+
+
+def directory_querysets(user_ct_id: int) -> dict[str, QuerySet]:
+    """Get the querysets of every table the snapshot reads.
+
+    :param user_ct_id: Content type id of the user model, used by the generic relations.
+    :returns: Querysets by ``DirectoryRows`` field.
+    """
+    active_memberships = Membership.objects.active()
+    return {
+        "users": User.objects.filter(Exists(active_memberships.filter(user=OuterRef("pk")))),
+        "memberships": active_memberships.order_by("id"),
+        "institutions": Institution.objects.all(),
+        "user_institutions": RelInstitution.objects.filter(content_type_id=user_ct_id),
+        "user_topics": RelTopic.objects.filter(content_type_id=user_ct_id),
+        "user_application_areas": RelApplicationArea.objects.filter(content_type_id=user_ct_id),
+        "metadata": Metadata.objects.all(),
+        "advisors": active_memberships.filter(advisor__isnull=False).order_by("id"),
+    }
+
+
+def fetch_rows() -> DirectoryRows:
+    """Read every table the snapshot needs (synchronous, run it in a worker thread).
+
+    :returns: The raw rows.
+    """
+    try:
+        querysets = directory_querysets(content_types.get_id_sync("hipeac", "user"))
+        return DirectoryRows(
+            **{name: list(queryset.values_list(*ROW_FIELDS[name])) for name, queryset in querysets.items()}
+        )
+    finally:
+        connection.close()
+
+
+def load_snapshot() -> DirectorySnapshot:
+    """Read the directory from the database and build a snapshot.
+
+    :returns: A new snapshot.
+    """
+    return build_snapshot(fetch_rows())
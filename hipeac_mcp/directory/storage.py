@@ -0,0 +1,483 @@
+"""Compact binary snapshot files shared by every worker process.
+
+A snapshot file is written once and memory-mapped read-only by every worker,
+so the operating system keeps a single copy of the directory in its page
+cache however many gunicorn workers serve it. Records, facet bitsets and
+trigram postings are read from the mapping on access instead of being
+materialized as Python objects; only institutions, metadata and the trigram
+table of contents are loaded into each worker.
+
+The layout is an 8-byte magic, the format version and the length of a JSON
+header (two little-endian ``u32``), the header, then 8-byte aligned sections
+whose offsets are listed in the header. Exported files, meant to be copied
+around and served without the database, are the same bytes compressed with
+zlib. The sections are:
+
+- ``member_ids``: ``u32`` id of each member, by ordinal;
+- ``strings`` / ``string_offsets``: username, email, first name, last name
+  and membership type of each member, as UTF-8 with ``5 * n + 1`` offsets;
+- ``documents`` / ``document_offsets``: the normalized searchable fields;
+- ``<relation>_offsets`` / ``<relation>_ids``: institution, topic and
+  application area ids of each member, in CSR form;
+- ``advisor_ids``: ``u32`` user id of the advisor of each member, 0 for none;
+- ``postings``: little-endian facet bitsets, located by the header;
+- ``trigram_offsets`` / ``trigram_ordinals``: member ordinals of each
+  trigram listed in the header, in CSR form.
+"""
+
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from pathlib import Path
+
+from .snapshot import DirectorySnapshot, Facet, InstitutionRecord, MemberRecord, MetadataRecord, load_snapshot
+from .text import TrigramIndex
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HMCPSNAP"
+FORMAT_VERSION = 2
+EXPORT_COMPRESSION_LEVEL = 6
+
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGNMENT = 8
+_STRING_FIELDS = 5
+_RELATIONS = ("institution", "topic", "application_area")
+
+
+def _u32(values) -> bytes:
+    return array("I", values).tobytes()
+
+
+def _csr(groups: Sequence[Sequence[int]]) -> tuple[bytes, bytes]:
+    offsets, values = [0], []
+    for group in groups:
+        values.extend(group)
+        offsets.append(len(values))
+    return _u32(offsets), _u32(values)
+
+
+def _string_table(strings: Sequence[str]) -> tuple[bytes, bytes]:
+    offsets, data = [0], bytearray()
+    for string in strings:
+        data += string.encode()
+        offsets.append(len(data))
+    return _u32(offsets), bytes(data)
+
+
+def _bitset_bytes(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) >> 3, "little")
+
+
+def serialize_snapshot(snapshot: DirectorySnapshot) -> bytes:
+    """Encode a snapshot in the binary snapshot format.
+
+    :param snapshot: Snapshot to encode, built in memory or mapped from a file.
+    :returns: The encoded snapshot.
+    """
+    members = list(snapshot.members)
+    sections: dict[str, bytes] = {"member_ids": _u32(member.id for member in members)}
+
+    sections["string_offsets"], sections["strings"] = _string_table(
+        [
+            value
+            for member in members
+            for value in (member.username, member.email, member.first_name, member.last_name, member.membership_type)
+        ]
+    )
+    sections["document_offsets"], sections["documents"] = _string_table(
+        [value for ordinal in range(len(members)) for value in snapshot.text_index.documents[ordinal]]
+    )
+    for relation in _RELATIONS:
+        sections[f"{relation}_offsets"], sections[f"{relation}_ids"] = _csr(
+            [getattr(member, f"{relation}_ids") for member in members]
+        )
+    sections["advisor_ids"] = _u32(member.advisor_id or 0 for member in members)
+
+    postings = bytearray()
+    facets: dict[str, list] = {}
+    for facet in Facet:
+        entries = facets[facet.value] = []
+        for value, bits in snapshot._index[facet].items():
+            data = _bitset_bytes(bits)
+            entries.append([value, len(postings), len(data)])
+            postings += data
+    sections["postings"] = bytes(postings)
+
+    grams = sorted(snapshot.text_index.postings)
+    sections["trigram_offsets"], sections["trigram_ordinals"] = _csr(
+        [snapshot.text_index.postings[gram] for gram in grams]
+    )
+
+    header = {
+        "built_at": snapshot.built_at,
+        "byteorder": sys.byteorder,
+        "members": len(members),
+        "institutions": [
+            [institution.id, institution.name, institution.country, institution.type_id]
+            for institution in snapshot.institutions.values()
+        ],
+        "metadata": [[item.id, item.type, item.value] for item in snapshot.metadata.values()],
+        "facets": facets,
+        "grams": "\x00".join(grams),
+        "sections": {},
+    }
+
+    # Section offsets depend on the header length, which depends on the offsets: lay them out until stable
+    header_length = 0
+    while True:
+        offset = _align(_PREAMBLE.size + header_length)
+        for name, data in sections.items():
+            header["sections"][name] = [offset, len(data)]
+            offset = _align(offset + len(data))
+        encoded = json.dumps(header, separators=(",", ":")).encode()
+        if len(encoded) == header_length:
+            break
+        header_length = len(encoded)
+
+    output = bytearray(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, header_length) + encoded)
+    for name, data in sections.items():
+        output += bytes(header["sections"][name][0] - len(output))
+        output += data
+    return bytes(output)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def write_snapshot(snapshot: DirectorySnapshot, path: str | os.PathLike) -> None:
+    """Write a snapshot file atomically.
+
+    The file is written next to its destination and renamed over it, so
+    readers either map the previous file or the complete new one.
+
+    :param snapshot: Snapshot to write.
+    :param path: Destination of the snapshot file.
+    """
+    _write_atomically(serialize_snapshot(snapshot), Path(path))
+
+
+def export_snapshot(snapshot: DirectorySnapshot, path: str | os.PathLike) -> int:
+    """Write a compressed snapshot file, for serving without the database.
+
+    :param snapshot: Snapshot to export.
+    :param path: Destination of the exported file.
+    :returns: Size of the exported file in bytes.
+    """
+    data = zlib.compress(serialize_snapshot(snapshot), EXPORT_COMPRESSION_LEVEL)
+    _write_atomically(data, Path(path))
+    return len(data)
+
+
+def _write_atomically(data: bytes, path: Path) -> None:
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False) as file:
+        try:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, path)
+
+
+def open_snapshot(path: str | os.PathLike) -> DirectorySnapshot:
+    """Memory-map a snapshot file read-only.
+
+    The mapping stays valid when the file is later replaced, so a snapshot
+    keeps serving the data it was opened with.
+
+    :param path: Snapshot file written by :func:`write_snapshot`.
+    :returns: The snapshot, reading its members and postings from the mapping.
+    :raises ValueError: If the file is not a snapshot in a supported format.
+    """
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return snapshot_from_buffer(buffer)
+
+
+def import_snapshot(path: str | os.PathLike) -> DirectorySnapshot:
+    """Load a snapshot file written by :func:`export_snapshot` or :func:`write_snapshot`.
+
+    Exported files are decompressed in memory, so unlike :func:`open_snapshot`
+    the snapshot is private to the process.
+
+    :param path: Snapshot file, compressed or not.
+    :returns: The snapshot.
+    :raises ValueError: If the file is not a snapshot in a supported format.
+    """
+    data = Path(path).read_bytes()
+    if not data.startswith(MAGIC):
+        try:
+            data = zlib.decompress(data)
+        except zlib.error as error:
+            raise ValueError("Not a member snapshot file") from error
+    return snapshot_from_buffer(data)
+
+
+def snapshot_from_buffer(buffer) -> DirectorySnapshot:
+    """Read a snapshot from an encoded buffer without copying its sections.
+
+    :param buffer: Bytes-like object holding an encoded snapshot, e.g. a memory map.
+    :returns: The snapshot, reading its members and postings from the buffer.
+    :raises ValueError: If the buffer is not a snapshot in a supported format.
+    """
+    view = memoryview(buffer)
+    if len(view) < _PREAMBLE.size:
+        raise ValueError("Truncated snapshot file")
+    magic, version, header_length = _PREAMBLE.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Not a member snapshot file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported member snapshot format version {version}")
+
+    header = json.loads(bytes(view[_PREAMBLE.size : _PREAMBLE.size + header_length]))
+    if header["byteorder"] != sys.byteorder:
+        raise ValueError(f"Member snapshot written on a {header['byteorder']}-endian machine")
+
+    def section(name: str) -> memoryview:
+        offset, length = header["sections"][name]
+        if offset + length > len(view):
+            raise ValueError("Truncated snapshot file")
+        return view[offset : offset + length]
+
+    def u32(name: str) -> memoryview:
+        return section(name).cast("I")
+
+    strings = _Strings(u32("string_offsets"), section("strings"))
+    documents = _Strings(u32("document_offsets"), section("documents"))
+    relations = {relation: _Groups(u32(f"{relation}_offsets"), u32(f"{relation}_ids")) for relation in _RELATIONS}
+    member_ids = u32("member_ids")
+    members = _Members(member_ids, strings, relations, u32("advisor_ids"))
+
+    postings = section("postings")
+    index = {
+        facet: _Bitsets(postings, {value: (offset, length) for value, offset, length in header["facets"][facet.value]})
+        for facet in Facet
+    }
+    grams = header["grams"].split("\x00") if header["grams"] else []
+    trigram_postings = _Postings(
+        {gram: position for position, gram in enumerate(grams)},
+        _Groups(u32("trigram_offsets"), u32("trigram_ordinals")),
+    )
+
+    return DirectorySnapshot.from_storage(
+        members=members,
+        sort_keys=_SortKeys(member_ids, strings),
+        institutions={row[0]: InstitutionRecord(*row) for row in header["institutions"]},
+        metadata={row[0]: MetadataRecord(*row) for row in header["metadata"]},
+        index=index,
+        text_index=TrigramIndex.from_postings(_Documents(documents), trigram_postings),
+        built_at=header["built_at"],
+    )
+
+
+class _Strings:
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def __getitem__(self, index: int) -> str:
+        return str(self.data[self.offsets[index] : self.offsets[index + 1]], "utf-8")
+
+    def fields(self, ordinal: int) -> tuple[str, ...]:
+        start = ordinal * _STRING_FIELDS
+        return tuple(self[index] for index in range(start, start + _STRING_FIELDS))
+
+
+class _Groups(Sequence[memoryview]):
+    def __init__(self, offsets: memoryview, values: memoryview):
+        self.offsets = offsets
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        index = range(len(self))[index]
+        return self.values[self.offsets[index] : self.offsets[index + 1]]
+
+
+class _Members(Sequence[MemberRecord]):
+    def __init__(self, ids: memoryview, strings: _Strings, relations: dict[str, _Groups], advisor_ids: memoryview):
+        self.ids = ids
+        self.strings = strings
+        self.relations = relations
+        self.advisor_ids = advisor_ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[ordinal] for ordinal in range(len(self))[index]]
+        ordinal = range(len(self))[index]
+        username, email, first_name, last_name, membership_type = self.strings.fields(ordinal)
+        return MemberRecord(
+            id=self.ids[ordinal],
+            username=username,
+            email=email,
+            first_name=first_name,
+            last_name=last_name,
+            membership_type=membership_type,
+            institution_ids=tuple(self.relations["institution"][ordinal]),
+            topic_ids=tuple(self.relations["topic"][ordinal]),
+            application_area_ids=tuple(self.relations["application_area"][ordinal]),
+            advisor_id=self.advisor_ids[ordinal] or None,
+        )
+
+
+class _SortKeys(Sequence[tuple[str, int]]):
+    def __init__(self, ids: memoryview, strings: _Strings):
+        self.ids = ids
+        self.strings = strings
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        ordinal = range(len(self))[index]
+        return self.strings[ordinal * _STRING_FIELDS + 3], self.ids[ordinal]
+
+
+class _Documents(Sequence[tuple[str, ...]]):
+    def __init__(self, strings: _Strings):
+        self.strings = strings
+
+    def __len__(self) -> int:
+        return (len(self.strings.offsets) - 1) // _STRING_FIELDS
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.strings.fields(ordinal) for ordinal in range(len(self))[index]]
+        return self.strings.fields(range(len(self))[index])
+
+
+class _Bitsets(Mapping[int | str, int]):
+    def __init__(self, postings: memoryview, locations: dict[int | str, tuple[int, int]]):
+        self.postings = postings
+        self.locations = locations
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def __iter__(self) -> Iterator[int | str]:
+        return iter(self.locations)
+
+    def __getitem__(self, value: int | str) -> int:
+        offset, length = self.locations[value]
+        return int.from_bytes(self.postings[offset : offset + length], "little")
+
+
+class _Postings(Mapping[str, memoryview]):
+    def __init__(self, positions: dict[str, int], groups: _Groups):
+        self.positions = positions
+        self.groups = groups
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.positions)
+
+    def __getitem__(self, gram: str) -> memoryview:
+        return self.groups[self.positions[gram]]
+
+
+class SharedSnapshotFile:
+    """Snapshot loader sharing one snapshot file between worker processes.
+
+    The first worker to take an exclusive lock next to the file becomes its
+    designated builder, and keeps the lock for as long as it runs: it alone
+    rebuilds the file when it is older than ``max_age``, so only it holds the
+    state of an incremental ``builder``. The other workers only map the file,
+    again only when it has been replaced, and read the directory from the
+    database themselves only while the file does not exist yet. When the
+    designated builder exits, the next worker to load the file takes over.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike, max_age: float, builder: Callable[[], DirectorySnapshot] = load_snapshot
+    ):
+        """Create a loader without touching the file yet.
+
+        :param path: Location of the shared snapshot file.
+        :param max_age: Seconds after which the file is rebuilt.
+        :param builder: Synchronous function building a new snapshot from the database, only
+            called in the designated builder.
+        """
+        self.path = Path(path)
+        self.max_age = max_age
+        self.builder = builder
+        self._snapshot: DirectorySnapshot | None = None
+        self._identity: tuple[int, int] | None = None
+        self._builder_lock: int | None = None
+
+    def __call__(self) -> DirectorySnapshot:
+        """Get the shared snapshot, rebuilding the file first if it is stale.
+
+        :returns: The snapshot mapped from the file.
+        """
+        designated = self._claim_builder()
+        if self._needs_build(designated):
+            with open(self.path.with_name(self.path.name + ".lock"), "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    if self._needs_build(designated):
+                        write_snapshot(self.builder() if designated else load_snapshot(), self.path)
+                        logger.info("Member snapshot file %s rebuilt", self.path)
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+        stat = self.path.stat()
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        if self._snapshot is None or identity != self._identity:
+            self._snapshot = open_snapshot(self.path)
+            self._identity = identity
+        return self._snapshot
+
+    def _claim_builder(self) -> bool:
+        if self._builder_lock is None:
+            fd = os.open(self.path.with_name(self.path.name + ".builder"), os.O_WRONLY | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            # Never released: the lock goes away with the process, handing the role over to another worker
+            self._builder_lock = fd
+        return True
+
+    def _needs_build(self, designated: bool) -> bool:
+        return self._is_stale() if designated else not self.path.exists()
+
+    def _is_stale(self) -> bool:
+        try:
+            return time.time() - self.path.stat().st_mtime >= self.max_age
+        except FileNotFoundError:
+            return True
+
+
+__all__ = [
+    "EXPORT_COMPRESSION_LEVEL",
+    "FORMAT_VERSION",
+    "MAGIC",
+    "SharedSnapshotFile",
+    "export_snapshot",
+    "import_snapshot",
+    "open_snapshot",
+    "serialize_snapshot",
+    "snapshot_from_buffer",
+    "write_snapshot",
+]
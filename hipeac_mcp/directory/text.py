@@ -0,0 +1,156 @@
+"""Accent-insensitive substring and fuzzy name search over member fields.
+
+Every member is indexed by the trigrams of its normalized (case-folded,
+accent-stripped) names, username and email. A query is answered by
+intersecting the postings of its trigrams, verifying the surviving
+candidates with a plain substring test and ranking them by match quality.
+When nothing contains the query, members sharing enough trigrams with it
+are returned instead, ranked from ``SIMILAR`` upwards by the number of
+missing trigrams, so small typos still find someone.
+"""
+
+import unicodedata
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Mapping, Sequence
+
+
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, SIMILAR = range(5)
+
+MIN_SIMILARITY = 0.5
+
+
+def normalize(text: str) -> str:
+    """Case-fold, strip accents and collapse whitespace.
+
+    :param text: Text to normalize.
+    :returns: The normalized text, e.g. ``"Müller"`` becomes ``"muller"``.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(char for char in decomposed if not unicodedata.combining(char)).split())
+
+
+def trigrams(text: str) -> set[str]:
+    """Get the set of three-character substrings of a text.
+
+    :param text: Normalized text.
+    :returns: Its trigrams (empty for texts shorter than three characters).
+    """
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def padded_trigrams(text: str) -> set[str]:
+    """Get the trigrams of a text padded like word boundaries.
+
+    Padding adds trigrams for the start and end of the text, which lets
+    short words be compared for similarity.
+
+    :param text: Normalized text.
+    :returns: Its padded trigrams.
+    """
+    return trigrams(f"  {text} ")
+
+
+def match_rank(fields: Sequence[str], query: str) -> int | None:
+    """Rank how well a member's normalized fields match a normalized query.
+
+    :param fields: Normalized searchable fields of the member.
+    :param query: Normalized query.
+    :returns: EXACT, PREFIX, WORD_PREFIX or SUBSTRING, or None if no field contains the query.
+    """
+    best = None
+    for field in fields:
+        position = field.find(query)
+        if position == -1:
+            continue
+        if field == query:
+            return EXACT
+        if position == 0:
+            rank = PREFIX
+        else:
+            rank = SUBSTRING
+            while position != -1:
+                if not field[position - 1].isalnum():
+                    rank = WORD_PREFIX
+                    break
+                position = field.find(query, position + 1)
+        if best is None or rank < best:
+            best = rank
+    return best
+
+
+class TrigramIndex:
+    """Inverted index from trigrams to the ordinals of the members containing them."""
+
+    def __init__(self, documents: Sequence[tuple[str, ...]]):
+        """Index normalized member fields.
+
+        :param documents: Normalized searchable fields, one tuple per member ordinal.
+        """
+        self.documents = documents
+        postings: dict[str, list[int]] = defaultdict(list)
+        for ordinal, fields in enumerate(documents):
+            grams = set()
+            for field in fields:
+                grams |= padded_trigrams(field)
+            for gram in grams:
+                postings[gram].append(ordinal)
+        self.postings: Mapping[str, Sequence[int]] = {gram: array("I", ordinals) for gram, ordinals in postings.items()}
+
+    @classmethod
+    def from_postings(
+        cls, documents: Sequence[tuple[str, ...]], postings: Mapping[str, Sequence[int]]
+    ) -> "TrigramIndex":
+        """Wrap documents and postings that are already built, e.g. mapped from a snapshot file.
+
+        :param documents: Normalized searchable fields, one tuple per member ordinal.
+        :param postings: Ascending member ordinals per trigram.
+        :returns: The index.
+        """
+        index = cls.__new__(cls)
+        index.documents = documents
+        index.postings = postings
+        return index
+
+    def search(self, query: str) -> list[tuple[int, int]]:
+        """Find members matching a free-text query, best matches first.
+
+        :param query: Raw query text.
+        :returns: ``(rank, ordinal)`` pairs sorted ascending; lower ranks are better matches.
+        """
+        needle = normalize(query)
+        if not needle:
+            return []
+
+        ranked = [
+            (rank, ordinal)
+            for ordinal in self._candidates(needle)
+            if (rank := match_rank(self.documents[ordinal], needle)) is not None
+        ]
+        if not ranked:
+            ranked = self._similar(needle)
+
+        ranked.sort()
+        return ranked
+
+    def _candidates(self, needle: str) -> Sequence[int] | set[int]:
+        grams = trigrams(needle)
+        if not grams:
+            return range(len(self.documents))
+
+        postings = sorted((self.postings.get(gram, array("I")) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+        return candidates
+
+    def _similar(self, needle: str) -> list[tuple[int, int]]:
+        grams = padded_trigrams(needle)
+        shared: Counter[int] = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        threshold = MIN_SIMILARITY * len(grams)
+        return [(SIMILAR + len(grams) - count, ordinal) for ordinal, count in shared.items() if count >= threshold]
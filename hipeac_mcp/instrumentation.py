@@ -0,0 +1,181 @@
+"""Per-call instrumentation of the MCP tools.
+
+A tool wrapped with ``instrument`` collects, for the duration of one call,
+the number of SQL queries, the time spent in the database and the rows
+returned, through an execute wrapper installed on every Django connection,
+as well as its result cache hits, misses and evictions. The figures are
+attached to a Sentry span, and calls slower than ``settings.SLOW_TOOL_CALL_MS``
+are logged together with their arguments. Long-lived components such as caches
+and connection pools register their cumulative counters, which are read with
+``counters`` and reported along with traced and slow calls.
+
+Serializing the response again only to measure it would double its cost,
+so serialization time and response size are only recorded for calls that
+are traced or slow.
+"""
+
+import functools
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import pydantic_core
+import sentry_sdk
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CallStats:
+    """Measurements of a single tool call."""
+
+    tool: str
+    queries: int = 0
+    db_time: float = 0.0
+    rows: int = 0
+    duration: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cache_evictions: int = 0
+    serialization_time: float | None = None
+    response_bytes: int | None = None
+
+    def measure_response(self, result: Any) -> None:
+        """Serialize a tool result the way FastMCP does, recording its cost and size.
+
+        :param result: Value returned by the tool.
+        """
+        start = time.perf_counter()
+        payload = pydantic_core.to_json(result, fallback=str, indent=2)
+        self.serialization_time = time.perf_counter() - start
+        self.response_bytes = len(payload)
+
+
+_counters: dict[str, Any] = {}
+
+
+def register_counters(name: str, stats: Any) -> None:
+    """Expose the counters of a long-lived component, such as a cache.
+
+    :param name: Name under which the counters are reported.
+    :param stats: Dataclass instance holding integer counters, updated in place.
+    """
+    _counters[name] = stats
+
+
+def counters() -> dict[str, dict[str, int]]:
+    """Get the current value of every registered counter.
+
+    :returns: Counters by component name.
+    """
+    return {name: asdict(stats) for name, stats in _counters.items()}
+
+
+_current_call: ContextVar[CallStats | None] = ContextVar("hipeac_mcp_tool_call", default=None)
+
+
+def current_call() -> CallStats | None:
+    """Get the measurements of the tool call running in the current context.
+
+    :returns: The call measurements, or None outside an instrumented tool call.
+    """
+    return _current_call.get()
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """Django execute wrapper adding each query to the current tool call.
+
+    Rows are counted from the cursor ``rowcount``, which MySQL sets to the
+    size of the buffered result set.
+    """
+    stats = _current_call.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+        stats.rows += max(context["cursor"].rowcount or 0, 0)
+
+
+def _install_execute_wrapper(sender, connection, **kwargs) -> None:
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+connection_created.connect(_install_execute_wrapper, dispatch_uid="hipeac_mcp.instrumentation")
+
+
+def instrument(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Measure the queries, database time and response of every call to a tool.
+
+    :param func: Async tool function.
+    :returns: The wrapped function.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        stats = CallStats(func.__name__)
+        with sentry_sdk.start_span(op="mcp.tool", name=func.__name__) as span:
+            token = _current_call.set(stats)
+            start = time.perf_counter()
+            result = None
+            try:
+                result = await func(*args, **kwargs)
+                return result
+            finally:
+                stats.duration = time.perf_counter() - start
+                _current_call.reset(token)
+                slow = stats.duration * 1000 >= settings.SLOW_TOOL_CALL_MS
+                if result is not None and (slow or span.sampled):
+                    stats.measure_response(result)
+                _report(stats, span, kwargs, slow)
+
+    return wrapper
+
+
+def _report(stats: CallStats, span, arguments: dict[str, Any], slow: bool) -> None:
+    for key, value in asdict(stats).items():
+        if key != "tool" and value is not None:
+            span.set_data(f"tool.{key}", value)
+
+    totals = counters() if slow or span.sampled else {}
+    for name, values in totals.items():
+        for key, value in values.items():
+            span.set_data(f"counters.{name}.{key}", value)
+
+    if slow:
+        logger.warning(
+            "Slow tool call %s took %.1fms: %d queries, %.1fms in the database, %d rows, %s response bytes, "
+            "%d cache evictions, arguments %s, counters %s",
+            stats.tool,
+            stats.duration * 1000,
+            stats.queries,
+            stats.db_time * 1000,
+            stats.rows,
+            stats.response_bytes,
+            stats.cache_evictions,
+            json.dumps(arguments, default=str),
+            json.dumps(totals),
+        )
+    else:
+        logger.debug(
+            "Tool call %s took %.1fms: %d queries, %.1fms in the database",
+            stats.tool,
+            stats.duration * 1000,
+            stats.queries,
+            stats.db_time * 1000,
+        )
+
+
+__all__ = ["CallStats", "counters", "current_call", "execute_wrapper", "instrument", "register_counters"]
@@ -0,0 +1,55 @@
+"""Serving the MCP tools from an exported snapshot file, without the database.
+
+``python -m hipeac_mcp snapshot export`` writes the member directory and
+the metadata to a single compressed file. Once that file is loaded with
+``serve_offline``, ``search_members`` and ``get_metadata`` are answered from
+memory and never open a database connection, which makes a read replica
+for burst traffic or a local development server out of a copied file. The
+network tools, which need a snapshot, are served too.
+"""
+
+import logging
+import os
+import time
+
+from .cache import MetadataTable, metadata_cache
+from .directory import DirectorySnapshot, engine, import_snapshot
+from .schemas.metadata import MetadataItem
+from .tools.network import register_network_tools
+
+
+logger = logging.getLogger(__name__)
+
+
+def metadata_table(snapshot: DirectorySnapshot) -> MetadataTable:
+    """Build the metadata table served by ``get_metadata`` from a snapshot.
+
+    Snapshot metadata keeps the ``(type, position, value)`` order it was read
+    in, so the response lists items in the same order as the database does.
+
+    :param snapshot: The snapshot.
+    :returns: The metadata table.
+    """
+    items: dict[str, dict[int, MetadataItem]] = {}
+    for record in snapshot.metadata.values():
+        items.setdefault(record.type, {})[record.id] = MetadataItem(id=record.id, value=record.value)
+    signature = (len(snapshot.metadata), max(snapshot.metadata, default=None))
+    return MetadataTable.build(items, signature, time.monotonic())
+
+
+def serve_offline(path: str | os.PathLike) -> DirectorySnapshot:
+    """Answer the tools from an exported snapshot file for the rest of the process.
+
+    :param path: File written by ``python -m hipeac_mcp snapshot export``.
+    :returns: The loaded snapshot.
+    :raises ValueError: If the file is not a snapshot in a supported format.
+    """
+    snapshot = import_snapshot(path)
+    engine.pin(snapshot)
+    metadata_cache.pin(metadata_table(snapshot))
+    register_network_tools()
+    logger.info("Serving %d members from %s without the database", len(snapshot), path)
+    return snapshot
+
+
+__all__ = ["metadata_table", "serve_offline"]
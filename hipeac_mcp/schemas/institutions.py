@@ -0,0 +1,25 @@
+"""Pydantic schemas for institution search responses."""
+
+from pydantic import BaseModel
+
+from .members import FacetCount
+from .metadata import MetadataItem
+
+
+class InstitutionSummary(BaseModel):
+    """An institution with the number of its active members and their main topics."""
+
+    id: int
+    name: str
+    country: str
+    type: MetadataItem | None = None
+    member_count: int
+    top_topics: list[FacetCount]
+
+
+class InstitutionSearchResponse(BaseModel):
+    """Search results for institution queries."""
+
+    total: int
+    limit: int
+    institutions: list[InstitutionSummary]
@@ -1,10 +1,24 @@
 """Pydantic schemas for member search responses."""
 
+from enum import Enum
+
 from pydantic import BaseModel, HttpUrl
 
 from .metadata import MembershipType, MetadataItem
 
 
+class DetailLevel(str, Enum):
+    """How much of each member profile a search returns.
+
+    ``summary`` only has names, username and profile URL, ``standard`` adds the
+    membership and institutions, and ``full`` adds topics and application areas.
+    """
+
+    SUMMARY = "summary"
+    STANDARD = "standard"
+    FULL = "full"
+
+
 class Institution(BaseModel):
     """Institution information."""
 
@@ -32,3 +46,46 @@ class MemberSearchResponse(BaseModel):
     total: int
     limit: int
     members: list[Member]
+    next_cursor: str | None = None
+
+
+class MemberLookupResponse(BaseModel):
+    """Profiles of members looked up by username."""
+
+    members: list[Member]
+    not_found: list[str]
+
+
+class SimilarMember(BaseModel):
+    """A member similar to another one, with what they have in common."""
+
+    member: Member
+    score: float
+    shared_topics: list[MetadataItem]
+    shared_application_areas: list[MetadataItem]
+
+
+class SimilarMembersResponse(BaseModel):
+    """Members most similar to a given member, most similar first."""
+
+    member: Member
+    similar: list[SimilarMember]
+
+
+class FacetCount(BaseModel):
+    """Number of matching members having one facet value."""
+
+    value: int | str
+    label: str | None = None
+    count: int
+
+
+class MemberFacetsResponse(BaseModel):
+    """Number of members matching a search, overall and per facet value."""
+
+    total: int
+    topics: list[FacetCount]
+    application_areas: list[FacetCount]
+    countries: list[FacetCount]
+    institution_types: list[FacetCount]
+    membership_types: list[FacetCount]
@@ -42,6 +42,14 @@ class MembershipType(str, Enum):
     AFFILIATED_PHD = "affiliated_phd"
 
 
+MEMBERSHIP_TYPE_LABELS = {
+    MembershipType.MEMBER: "Full member (from EU)",
+    MembershipType.ASSOCIATED_MEMBER: "Associated member (non-EU)",
+    MembershipType.AFFILIATED_MEMBER: "Affiliated member",
+    MembershipType.AFFILIATED_PHD: "Affiliated PhD student",
+}
+
+
 class MembershipTypeItem(BaseModel):
     """A membership type option."""
 
@@ -50,8 +58,12 @@ class MembershipTypeItem(BaseModel):
 
 
 class MetadataResponse(BaseModel):
-    """Complete metadata response."""
+    """Complete metadata response.
+
+    When the client already holds the current ``version``, only the version is sent back.
+    """
 
+    version: str | None = None
     application_areas: list[MetadataItem] | None = None
     institution_types: list[MetadataItem] | None = None
     membership_types: list[MembershipTypeItem] | None = None
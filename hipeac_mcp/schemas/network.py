@@ -0,0 +1,84 @@
+"""Pydantic schemas for collaboration network responses."""
+
+from enum import Enum
+
+from pydantic import BaseModel
+
+from .members import Institution, Member
+
+
+class LinkType(str, Enum):
+    """How two members are linked: a shared institution, or one advising the other."""
+
+    INSTITUTION = "institution"
+    ADVISOR = "advisor"
+    ADVISEE = "advisee"
+
+
+class Connection(BaseModel):
+    """A member linked to another one, with every link between them."""
+
+    member: Member
+    advisor: bool = False
+    advisee: bool = False
+    shared_institutions: list[Institution]
+
+
+class MemberConnectionsResponse(BaseModel):
+    """Members directly linked to a member."""
+
+    member: Member
+    total: int
+    connections: list[Connection]
+
+
+class PathStep(BaseModel):
+    """A member of a connection path, with the link from the previous member."""
+
+    member: Member
+    link: LinkType | None = None
+    institution: Institution | None = None
+
+
+class ConnectionPathResponse(BaseModel):
+    """Shortest chain of links between two members, if one was found within the search bounds."""
+
+    found: bool
+    degrees: int | None = None
+    path: list[PathStep]
+    explored: int
+    truncated: bool
+
+
+class Connectivity(BaseModel):
+    """How a group of members is connected, internally and to the rest of the network."""
+
+    members: int
+    components: int
+    largest_component: int
+    advisor_links: int
+    external_advisor_links: int
+    linked_institutions: int
+    linked_countries: int
+
+
+class CountryConnectivity(Connectivity):
+    """Connectivity of the members of a country."""
+
+    country: str
+    institutions: int
+
+
+class InstitutionConnectivity(Connectivity):
+    """Connectivity of the members of an institution."""
+
+    id: int
+    name: str
+    country: str
+
+
+class NetworkConnectivityResponse(BaseModel):
+    """Connectivity statistics per country and per institution."""
+
+    countries: list[CountryConnectivity]
+    institutions: list[InstitutionConnectivity]
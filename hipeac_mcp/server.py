@@ -4,20 +4,25 @@ This module provides the MCP server via Streamable HTTP transport.
 Endpoint: POST / (at root)
 """
 
+from django.conf import settings
 from django.db import close_old_connections
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from . import mcp
+from .offline import serve_offline
 
 
 class DatabaseConnectionMiddleware(BaseHTTPMiddleware):
     """Middleware to manage Django database connections per request.
 
-    This ensures connections are closed properly after each request to prevent
+    This ensures connections are released properly after each request to prevent
     stale connection errors (2006, 2026) in long-running servers with async ORM.
 
-    With CONN_MAX_AGE=0, close_old_connections() closes all connections immediately.
-    We also close connections before each request to ensure fresh connections.
+    With CONN_MAX_AGE=0, close_old_connections() closes the Django connections
+    before and after each request. With the pooled backend, closing hands their
+    raw connections back to the process-wide pool, which pings them before they
+    are reused; they are only closed when the pool is disabled or already holds
+    DB_POOL_SIZE idle connections.
     """
 
     async def dispatch(self, request, call_next):
@@ -36,5 +41,8 @@ class DatabaseConnectionMiddleware(BaseHTTPMiddleware):
             close_old_connections()
 
 
+if settings.OFFLINE_SNAPSHOT_PATH:
+    serve_offline(settings.OFFLINE_SNAPSHOT_PATH)
+
 app = mcp.streamable_http_app()
 app.add_middleware(DatabaseConnectionMiddleware)
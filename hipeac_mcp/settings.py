@@ -10,23 +10,41 @@ from urllib.parse import urlparse
 
 db = urlparse(os.environ.get("DATABASE_URL"))
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.mysql",
-        "NAME": db.path[1:],
-        "USER": db.username,
-        "PASSWORD": db.password,
-        "HOST": db.hostname,
-        "PORT": db.port,
-        "OPTIONS": {
-            "charset": "utf8mb4",
-            "ssl_mode": "REQUIRED",
-            "init_command": "SET SESSION TRANSACTION READ ONLY; SET sql_mode='STRICT_TRANS_TABLES';",
-            "connect_timeout": 3,
-        },
-        "CONN_MAX_AGE": 0,  # Don't persist connections with sync_to_async thread pools
+# Independent queries of a tool call run concurrently on this many threads, each holding its own connection
+DB_QUERY_CONCURRENCY = int(os.environ.get("DB_QUERY_CONCURRENCY", os.environ.get("DB_POOL_SIZE", "4")))
+# Tool calls stop waiting for a query after this many seconds, and MySQL aborts it at the same deadline
+DB_QUERY_TIMEOUT_SECONDS = float(os.environ.get("DB_QUERY_TIMEOUT_SECONDS", "10"))
+
+if db.scheme == "sqlite":
+    # Local stand-in database, used by the benchmarks
+    DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": db.path[1:]}}
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "hipeac_mcp.backends.mysql",
+            "NAME": db.path[1:],
+            "USER": db.username,
+            "PASSWORD": db.password,
+            "HOST": db.hostname,
+            "PORT": db.port,
+            "OPTIONS": {
+                "charset": "utf8mb4",
+                "ssl_mode": "REQUIRED",
+                "init_command": "SET SESSION TRANSACTION READ ONLY; SET sql_mode='STRICT_TRANS_TABLES'; "
+                f"SET SESSION max_execution_time={int(DB_QUERY_TIMEOUT_SECONDS * 1000)};",
+                "connect_timeout": 3,
+            },
+            "CONN_MAX_AGE": 0,  # Django connections are per task, raw connections are reused through POOL instead
+            # Keep idle connections in a process-wide pool, pinged before reuse once idle for PING_AFTER seconds
+            # (a SIZE of 0 disables it)
+            "POOL": {
+                "SIZE": int(os.environ.get("DB_POOL_SIZE", "4")),
+                "MAX_AGE": int(os.environ.get("DB_POOL_MAX_AGE_SECONDS", "300")),
+                "IDLE_TIMEOUT": int(os.environ.get("DB_POOL_IDLE_SECONDS", "60")),
+                "PING_AFTER": float(os.environ.get("DB_POOL_PING_AFTER_SECONDS", "1")),
+            },
+        }
     }
-}
 
 INSTALLED_APPS = [
     "django.contrib.contenttypes",
@@ -41,3 +59,31 @@ USE_TZ = True
 TIME_ZONE = "UTC"
 
 DATABASE_ROUTERS = ["hipeac_mcp.db.ReadOnlyRouter"]
+
+# Answer member searches from an in-memory snapshot of the directory, rebuilt in the background
+MEMBER_SNAPSHOT_ENABLED = os.environ.get("MEMBER_SNAPSHOT_ENABLED", "false").lower() in ("1", "true", "yes")
+MEMBER_SNAPSHOT_REFRESH_SECONDS = int(os.environ.get("MEMBER_SNAPSHOT_REFRESH_SECONDS", "300"))
+# Refreshes only read the rows that changed, except for a full rebuild after this many seconds
+MEMBER_SNAPSHOT_FULL_REBUILD_SECONDS = int(os.environ.get("MEMBER_SNAPSHOT_FULL_REBUILD_SECONDS", "86400"))
+# Snapshot file shared by every worker process, rebuilt by one of them; unset to build one per process
+MEMBER_SNAPSHOT_PATH = os.environ.get("MEMBER_SNAPSHOT_PATH") or None
+
+# Answer searches and metadata from a file written by `python -m hipeac_mcp snapshot export`, without the database
+OFFLINE_SNAPSHOT_PATH = os.environ.get("OFFLINE_SNAPSHOT_PATH") or None
+
+# Serve metadata from memory, probing the table for changes after the TTL and reloading it after the max age
+METADATA_CACHE_TTL_SECONDS = int(os.environ.get("METADATA_CACHE_TTL_SECONDS", "60"))
+METADATA_CACHE_MAX_AGE_SECONDS = int(os.environ.get("METADATA_CACHE_MAX_AGE_SECONDS", "3600"))
+
+# Pin content type ids ("app_label.model") of generic relation targets so they are never queried
+CONTENT_TYPE_IDS = (
+    {"hipeac.user": int(os.environ["USER_CONTENT_TYPE_ID"])} if os.environ.get("USER_CONTENT_TYPE_ID") else {}
+)
+
+# Log tool calls slower than this, with their arguments and query counts
+SLOW_TOOL_CALL_MS = int(os.environ.get("SLOW_TOOL_CALL_MS", "1000"))
+
+# Cache search_members results in an LRU bounded by entry count and serialized size (0 entries disables it)
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", "1024"))
+SEARCH_CACHE_MAX_BYTES = int(os.environ.get("SEARCH_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+SEARCH_CACHE_TTL_SECONDS = int(os.environ.get("SEARCH_CACHE_TTL_SECONDS", "60"))
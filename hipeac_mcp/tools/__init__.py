@@ -1,6 +1,6 @@
 """MCP tools for HiPEAC member analysis."""
 
-from . import members, metadata
+from . import institutions, members, metadata, network
 
 
-__all__ = ["members", "metadata"]
+__all__ = ["institutions", "members", "metadata", "network"]
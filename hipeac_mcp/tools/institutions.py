@@ -0,0 +1,194 @@
+"""MCP Tools for searching the institutions of HiPEAC members.
+
+Institutions are described by the members affiliated to them: how many
+active members they have and which research topics those members work on.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import Count, Exists, OuterRef, Q
+from mcp.types import ToolAnnotations
+
+from hipeac_mcp import mcp
+
+from ..cache import content_types, metadata_cache, search_results
+from ..concurrency import single_flight
+from ..db import gather_queries, release_connections, run_query
+from ..directory import DirectorySnapshot, aggregates_ready, get_snapshot
+from ..instrumentation import instrument
+from ..models import Institution, Membership, RelInstitution, RelTopic, User
+from ..schemas.institutions import InstitutionSearchResponse, InstitutionSummary
+from ..schemas.members import FacetCount
+from .members import _result_version, _snapshot_models
+
+
+TOP_TOPICS = 5
+"""Number of topics listed for each institution."""
+
+
+@mcp.tool(structured_output=True, annotations=ToolAnnotations(readOnlyHint=True))
+@instrument
+@single_flight
+@release_connections
+async def search_institutions(
+    query: str | None = None,
+    countries: list[str] | None = None,
+    institution_type_ids: list[int] | None = None,
+    limit: int = 20,
+) -> InstitutionSearchResponse:
+    """Search the institutions of HiPEAC network members by name, country and type.
+
+    Returns each institution with its number of active members and the research topics
+    most of them work on, largest institutions first. Use this to answer questions about
+    organizations (e.g. companies in Spain working on compilers) instead of reading
+    member profiles; `search_members` can then list the people of interest.
+
+    :param query: Text search in institution names.
+    :param countries: Filter by ISO country codes (e.g., ['BE', 'ES', 'DE']).
+    :param institution_type_ids: Filter by institution type IDs, e.g. industry or academia
+        (get from get_metadata tool).
+    :param limit: Maximum number of results to return (max: 100).
+    :returns: The total number of matching institutions with active members, and the
+        largest of them with their member counts and top topics.
+    """
+    actual_limit = max(1, min(limit, 100))
+    query = (query or "").strip() or None
+    countries = sorted({c.upper() for c in countries or []})
+    type_ids = sorted(set(institution_type_ids or []))
+
+    snapshot = get_snapshot()
+    if snapshot is not None and not await aggregates_ready(snapshot, "institution_aggregates"):
+        snapshot = None
+    version = await _result_version(snapshot)
+    key = ("search_institutions", query, tuple(countries), tuple(type_ids), actual_limit)
+
+    response = search_results.get(key, version)
+    if response is None:
+        if snapshot is not None:
+            response = _search_snapshot(snapshot, query, countries, type_ids, actual_limit)
+        else:
+            response = await _search_database(query, countries, type_ids, actual_limit)
+        search_results.set(key, response, version)
+    return response
+
+
+def _search_snapshot(
+    snapshot: DirectorySnapshot, query: str | None, countries: list[str], type_ids: list[int], limit: int
+) -> InstitutionSearchResponse:
+    """Answer an institution search from the aggregates of the member directory snapshot.
+
+    :param snapshot: The snapshot to search.
+    :param query: Optional text looked up in institution names.
+    :param countries: Accepted country codes.
+    :param type_ids: Accepted institution type ids.
+    :param limit: Maximum number of institutions to return.
+    :returns: Structured search results.
+    """
+    found = snapshot.search_institutions(query, countries, type_ids)
+    metadata = _snapshot_models(snapshot)[0]
+
+    return InstitutionSearchResponse(
+        total=len(found),
+        limit=limit,
+        institutions=[
+            InstitutionSummary(
+                id=aggregate.institution.id,
+                name=aggregate.institution.name,
+                country=aggregate.institution.country,
+                type=metadata.get(aggregate.institution.type_id),  # type: ignore
+                member_count=aggregate.member_count,
+                top_topics=[
+                    FacetCount(
+                        value=topic_id, label=topic.value if (topic := metadata.get(topic_id)) else None, count=count
+                    )
+                    for topic_id, count in aggregate.topic_counts[:TOP_TOPICS]
+                ],
+            )
+            for aggregate in found[:limit]
+        ],
+    )
+
+
+async def _search_database(
+    query: str | None, countries: list[str], type_ids: list[int], limit: int
+) -> InstitutionSearchResponse:
+    """Answer an institution search with grouped database queries.
+
+    Institutions are counted and paged with one query annotated with their number of
+    active members; the affiliations and topics of the page are then read concurrently
+    and counted per institution.
+
+    :param query: Optional text looked up in institution names.
+    :param countries: Accepted country codes.
+    :param type_ids: Accepted institution type ids.
+    :param limit: Maximum number of institutions to return.
+    :returns: Structured search results.
+    """
+    user_ct_id = await content_types.get_id("hipeac", "user")
+    members = User.objects.filter(Exists(Membership.objects.active().filter(user=OuterRef("pk")))).values("pk")
+    affiliations = RelInstitution.objects.filter(content_type_id=user_ct_id, object_id__in=members)
+
+    queryset = Institution.objects.annotate(
+        member_count=Count(
+            "user_institutions__object_id",
+            distinct=True,
+            filter=Q(user_institutions__in=affiliations.values("pk")),
+        )
+    ).filter(member_count__gt=0)
+    if query:
+        queryset = queryset.filter(name__icontains=query)
+    if countries:
+        queryset = queryset.filter(country__in=countries)
+    if type_ids:
+        queryset = queryset.filter(type_id__in=type_ids)
+
+    page, total = await gather_queries(
+        run_query(list, queryset.order_by("-member_count", "name").only("id", "name", "country", "type_id")[:limit]),
+        run_query(queryset.count),
+    )
+    if not page:
+        return InstitutionSearchResponse(total=total, limit=limit, institutions=[])
+
+    page_affiliations = affiliations.filter(institution_id__in=[institution.id for institution in page])
+    rows, topic_rows, metadata = await gather_queries(
+        run_query(list, page_affiliations.values_list("institution_id", "object_id")),
+        run_query(
+            list,
+            RelTopic.objects.filter(
+                content_type_id=user_ct_id, object_id__in=page_affiliations.values("object_id")
+            ).values_list("object_id", "topic_id"),
+        ),
+        metadata_cache.get(),
+    )
+
+    topics_by_user: dict[int, set[int]] = defaultdict(set)
+    for user_id, topic_id in topic_rows:
+        topics_by_user[user_id].add(topic_id)
+    topics: dict[int, Counter[int]] = defaultdict(Counter)
+    for institution_id, user_id in set(rows):
+        topics[institution_id].update(topics_by_user.get(user_id, ()))
+
+    def top_topics(institution_id: int) -> list[FacetCount]:
+        counts = sorted(topics[institution_id].items(), key=lambda item: (-item[1], item[0]))[:TOP_TOPICS]
+        return [
+            FacetCount(
+                value=topic_id, label=topic.value if (topic := metadata.item("topic", topic_id)) else None, count=count
+            )
+            for topic_id, count in counts
+        ]
+
+    return InstitutionSearchResponse(
+        total=total,
+        limit=limit,
+        institutions=[
+            InstitutionSummary(
+                id=institution.id,
+                name=institution.name,
+                country=institution.country,
+                type=metadata.item("institution_type", institution.type_id),  # type: ignore
+                member_count=institution.member_count,  # type: ignore
+                top_topics=top_topics(institution.id),  # type: ignore
+            )
+            for institution in page
+        ],
+    )
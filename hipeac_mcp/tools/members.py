@@ -4,43 +4,84 @@ These tools provide intelligent search and discovery of network members
 based on research interests, location, and institutional affiliation.
 """
 
-from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q
+import functools
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+
+from django.db.models import Count, Exists, Model, OuterRef, Q, QuerySet, Subquery
 from mcp.types import ToolAnnotations
 from pydantic import HttpUrl
 
 from hipeac_mcp import mcp
 
-from ..models import RelApplicationArea, RelInstitution, RelTopic, User
-from ..schemas.members import Institution, Member, MemberSearchResponse
-from ..schemas.metadata import MembershipType, MetadataItem
-
+from ..cache import MetadataTable, content_types, metadata_cache, search_results
+from ..concurrency import single_flight
+from ..db import gather_queries, release_connections, run_query
+from ..directory import (
+    DirectorySnapshot,
+    Facet,
+    MemberRecord,
+    SimilarityIndex,
+    SortKey,
+    aggregates_ready,
+    get_snapshot,
+)
+from ..instrumentation import instrument
+from ..models import Membership, RelApplicationArea, RelInstitution, RelTopic, User
+from ..schemas.members import (
+    DetailLevel,
+    FacetCount,
+    Institution,
+    Member,
+    MemberFacetsResponse,
+    MemberLookupResponse,
+    MemberSearchResponse,
+    SimilarMember,
+    SimilarMembersResponse,
+)
+from ..schemas.metadata import MEMBERSHIP_TYPE_LABELS, MembershipType, MetadataItem
+
+
+def _related_to_user(model: type[Model], user_ct_id: int, **lookups) -> Exists:
+    """Build a correlated EXISTS over a generic user relation.
+
+    :param model: Generic relation model (RelTopic, RelApplicationArea or RelInstitution).
+    :param user_ct_id: Content type id of the user model.
+    :param lookups: Additional filters applied to the relation rows.
+    :returns: Expression matching users with at least one matching relation row.
+    """
+    return Exists(model.objects.filter(content_type_id=user_ct_id, object_id=OuterRef("pk"), **lookups))
 
-# Cache for metadata to avoid repeated queries
-_metadata_cache: dict[str, dict[int, MetadataItem]] = {}
 
+def _first_membership_type() -> Subquery:
+    """Build the type of the first active membership of a user by id.
 
-async def _ensure_metadata_cache():
-    """Ensure metadata cache is populated."""
-    if _metadata_cache:
-        return
+    A member holding several active memberships is shown, filtered and counted
+    with this one only, as in the snapshot.
 
-    from ..models import Metadata
+    :returns: Expression giving the membership type of the outer user.
+    """
+    return Subquery(Membership.objects.active().filter(user=OuterRef("pk")).order_by("id").values("type")[:1])
 
-    # Load all metadata into cache
-    async for item in Metadata.objects.all().only("id", "type", "value"):
-        cache_key = item.type.strip()
-        if cache_key not in _metadata_cache:
-            _metadata_cache[cache_key] = {}
-        _metadata_cache[cache_key][item.id] = MetadataItem(id=item.id, value=item.value)  # type: ignore
 
+async def _result_version(snapshot: DirectorySnapshot | None) -> float | str:
+    """Get the version of the data a tool result is computed from, to validate cached results.
 
-def _get_metadata_item(type_key: str, item_id: int) -> MetadataItem | None:
-    """Get a metadata item from cache."""
-    return _metadata_cache.get(type_key, {}).get(item_id)
+    :param snapshot: Snapshot the result is computed from, or None for the database.
+    :returns: The build time of the snapshot, or the version of the metadata table, loaded
+        first so that results are never cached before a version is known.
+    """
+    if snapshot is not None:
+        return snapshot.built_at
+    return (await metadata_cache.get()).version
 
 
 @mcp.tool(structured_output=True, annotations=ToolAnnotations(readOnlyHint=True))
+@instrument
+@single_flight
+@release_connections
 async def search_members(
     query: str | None = None,
     topic_ids: list[int] | None = None,
@@ -49,6 +90,8 @@ async def search_members(
     institution_type_ids: list[int] | None = None,
     membership_types: list[MembershipType] | None = None,
     limit: int = 20,
+    cursor: str | None = None,
+    detail: DetailLevel = DetailLevel.FULL,
 ) -> MemberSearchResponse:
     """Search HiPEAC network members by research interests, location, and institution.
 
@@ -67,10 +110,70 @@ async def search_members(
     :param membership_types: Filter by membership type keys: 'member', 'associated_member',
         'affiliated_member', 'affiliated_phd' (get from get_metadata tool).
     :param limit: Maximum number of results to return (max: 100).
-    :returns: Structured search results with member profiles.
+    :param cursor: The ``next_cursor`` of a previous response, to fetch the following page
+        of the same search.
+    :param detail: Profile fields to return: 'summary' (names, username and profile URL),
+        'standard' (adds membership and institutions) or 'full' (adds topics and application
+        areas). Fields left out are null; use 'summary' to pick members by name.
+    :returns: Structured search results with member profiles, the total number of matches
+        and a cursor for the next page.
+    :raises ValueError: If the cursor is not a valid cursor, or was issued by the other of
+        the database and the snapshot, which order text matches differently.
+    """
+    actual_limit = max(1, min(limit, 100))
+    query = (query or "").strip() or None
+    filters = _normalize_filters(topic_ids, application_area_ids, countries, institution_type_ids, membership_types)
+
+    snapshot = get_snapshot()
+    after = _decode_cursor(cursor, snapshot is not None) if cursor else None
+    version = await _result_version(snapshot)
+    detail = DetailLevel(detail)
+    key = (query, *(tuple(values) for values in filters.values()), actual_limit, cursor, detail)
+
+    response = search_results.get(key, version)
+    if response is None:
+        if snapshot is not None:
+            response = _search_snapshot(snapshot, query, filters, after, actual_limit, detail)
+        else:
+            response = await _search_database(query, filters, after, actual_limit, detail)
+        search_results.set(key, response, version)
+    return response
+
+
+def _normalize_filters(
+    topic_ids: list[int] | None,
+    application_area_ids: list[int] | None,
+    countries: list[str] | None,
+    institution_type_ids: list[int] | None,
+    membership_types: list[MembershipType] | None,
+) -> dict[Facet, list]:
+    """Turn filter arguments into sorted, deduplicated values per facet, so equivalent calls share a cache key.
+
+    :param topic_ids: Research topic ids.
+    :param application_area_ids: Application area ids.
+    :param countries: ISO country codes, in any case.
+    :param institution_type_ids: Institution type ids.
+    :param membership_types: Membership type keys.
+    :returns: Accepted values per facet, empty for facets that are not filtered.
+    """
+    return {
+        Facet.TOPIC: sorted(set(topic_ids or [])),
+        Facet.APPLICATION_AREA: sorted(set(application_area_ids or [])),
+        Facet.COUNTRY: sorted({c.upper() for c in countries or []}),
+        Facet.INSTITUTION_TYPE: sorted(set(institution_type_ids or [])),
+        Facet.MEMBERSHIP_TYPE: sorted({MembershipType(m).value for m in membership_types or []}),
+    }
+
+
+def _matching_users(query: str | None, filters: dict[Facet, list], user_ct_id: int) -> QuerySet:
+    """Build the queryset of active members matching a free-text query and facet filters.
+
+    :param query: Optional free-text query.
+    :param filters: Accepted values per facet.
+    :param user_ct_id: Content type id of the user model.
+    :returns: The unordered queryset of users.
     """
-    user_ct = await ContentType.objects.aget(app_label="hipeac", model="user")
-    queryset = User.objects.filter(memberships__end_date__isnull=True).distinct()
+    queryset = User.objects.filter(Exists(Membership.objects.active().filter(user=OuterRef("pk"))))
 
     if query:
         queryset = queryset.filter(
@@ -80,129 +183,703 @@ async def search_members(
             | Q(username__icontains=query)
         )
 
-    if topic_ids:
-        topic_user_ids = [
-            id
-            async for id in RelTopic.objects.filter(content_type=user_ct, topic_id__in=topic_ids).values_list(
-                "object_id", flat=True
-            )
-        ]
-        if topic_user_ids:
-            queryset = queryset.filter(id__in=topic_user_ids)
-
-    if application_area_ids:
-        area_user_ids = [
-            id
-            async for id in RelApplicationArea.objects.filter(
-                content_type=user_ct, application_area_id__in=application_area_ids
-            ).values_list("object_id", flat=True)
-        ]
-        if area_user_ids:
-            queryset = queryset.filter(id__in=area_user_ids)
-
-    if countries:
-        country_user_ids = [
-            id
-            async for id in RelInstitution.objects.filter(
-                content_type=user_ct, institution__country__in=[c.upper() for c in countries]
-            ).values_list("object_id", flat=True)
-        ]
-        if country_user_ids:
-            queryset = queryset.filter(id__in=country_user_ids)
-
-    if institution_type_ids:
-        type_user_ids = [
-            id
-            async for id in RelInstitution.objects.filter(
-                content_type=user_ct, institution__type_id__in=institution_type_ids
-            ).values_list("object_id", flat=True)
-        ]
-        if type_user_ids:
-            queryset = queryset.filter(id__in=type_user_ids)
+    if topic_ids := filters[Facet.TOPIC]:
+        queryset = queryset.filter(_related_to_user(RelTopic, user_ct_id, topic_id__in=topic_ids))
 
-    if membership_types:
-        queryset = queryset.filter(memberships__type__in=membership_types)
+    if application_area_ids := filters[Facet.APPLICATION_AREA]:
+        queryset = queryset.filter(
+            _related_to_user(RelApplicationArea, user_ct_id, application_area_id__in=application_area_ids)
+        )
 
-    actual_limit = min(limit, 100)
-    members = [m async for m in queryset.select_related().prefetch_related("memberships")[:actual_limit]]
+    if countries := filters[Facet.COUNTRY]:
+        queryset = queryset.filter(_related_to_user(RelInstitution, user_ct_id, institution__country__in=countries))
 
-    if not members:
-        return MemberSearchResponse(total=0, limit=actual_limit, members=[])
+    if institution_type_ids := filters[Facet.INSTITUTION_TYPE]:
+        queryset = queryset.filter(
+            _related_to_user(RelInstitution, user_ct_id, institution__type_id__in=institution_type_ids)
+        )
 
-    # Ensure metadata cache is populated
-    await _ensure_metadata_cache()
+    if membership_types := filters[Facet.MEMBERSHIP_TYPE]:
+        queryset = queryset.alias(membership_type=_first_membership_type()).filter(membership_type__in=membership_types)
 
-    # Build structured member profiles
-    member_profiles = []
+    return queryset
 
-    for user in members:
-        # Fetch institutions
-        rel_institutions = [
-            rel
-            async for rel in RelInstitution.objects.filter(
-                content_type=user_ct,
-                object_id=user.id,  # type: ignore
-            ).select_related("institution")
-        ]
-        institutions = [
-            Institution(
+
+async def _search_database(
+    query: str | None, filters: dict[Facet, list], after: SortKey | None, limit: int, detail: DetailLevel
+) -> MemberSearchResponse:
+    """Answer a member search with database queries.
+
+    :param query: Optional free-text query.
+    :param filters: Accepted values per facet.
+    :param after: Sort key decoded from the request cursor.
+    :param limit: Maximum number of members to return.
+    :param detail: Profile fields to load.
+    :returns: Structured search results with member profiles.
+    """
+    user_ct_id = await content_types.get_id("hipeac", "user")
+    queryset = _matching_users(query, filters, user_ct_id)
+
+    page = queryset.order_by("last_name", "id")
+    if after:
+        _, last_name, user_id = after
+        page = page.filter(Q(last_name__gt=last_name) | Q(last_name=last_name, id__gt=user_id))
+
+    page_query = run_query(list, page.only("id", "username", "first_name", "last_name")[: limit + 1])
+    total = None
+    if after is None:
+        users = await page_query
+    else:
+        # Following pages always report the total, so it is counted while the page is read
+        users, total = await gather_queries(page_query, run_query(queryset.count))
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = _encode_cursor((0, users[-1].last_name, users[-1].id), False)  # type: ignore
+
+    if total is None and next_cursor is None:
+        total = len(users)
+
+    if not users:
+        return MemberSearchResponse(total=total, limit=limit, members=[])
+
+    metadata = await metadata_cache.get() if detail != DetailLevel.SUMMARY else None
+    queries = [_hydrate_members(users, user_ct_id, metadata, detail)]
+    if total is None:
+        queries.append(run_query(queryset.count))
+    member_profiles, *counted = await gather_queries(*queries)
+
+    return MemberSearchResponse(
+        total=counted[0] if counted else total, limit=limit, members=member_profiles, next_cursor=next_cursor
+    )
+
+
+CURSOR_SOURCES = ("database", "snapshot")
+"""Names of the sources of search results recorded in cursors, indexed by whether the snapshot answered."""
+
+
+def _encode_cursor(key: SortKey, from_snapshot: bool) -> str:
+    """Encode the sort key of the last member of a page as an opaque cursor.
+
+    The cursor records whether the snapshot or the database answered, as only the
+    snapshot ranks text matches, so its sort keys do not resume a database search.
+
+    :param key: Text match rank, last name and id of the member.
+    :param from_snapshot: Whether the page was answered from the snapshot.
+    :returns: The cursor.
+    """
+    source = CURSOR_SOURCES[from_snapshot]
+    return urlsafe_b64encode(json.dumps([source, *key], separators=(",", ":")).encode()).decode()
+
+
+def _decode_cursor(cursor: str, from_snapshot: bool) -> SortKey:
+    """Decode a cursor produced by :func:`_encode_cursor`.
+
+    :param cursor: The cursor.
+    :param from_snapshot: Whether the page is answered from the snapshot.
+    :returns: Text match rank, last name and id of the last member of the previous page.
+    :raises ValueError: If the cursor is malformed, or was issued by the other source.
+    """
+    try:
+        source, rank, last_name, user_id = json.loads(urlsafe_b64decode(cursor.encode()))
+        key = int(rank), str(last_name), int(user_id)
+    except (ValueError, TypeError) as error:
+        raise ValueError("Invalid cursor, use the next_cursor of a previous search_members response") from error
+    if source != CURSOR_SOURCES[from_snapshot]:
+        raise ValueError("The cursor was issued before the search source changed, search again without a cursor")
+    return key
+
+
+async def _hydrate_members(
+    users: list[User], user_ct_id: int, metadata: MetadataTable | None, detail: DetailLevel = DetailLevel.FULL
+) -> list[Member]:
+    """Build member profiles for a page of users with one query per relation, run concurrently.
+
+    Only the relations of the requested detail level are queried, none for ``summary``.
+
+    :param users: Users to build profiles for, in result order.
+    :param user_ct_id: Content type id of the user model, used by the generic relations.
+    :param metadata: Metadata table used to resolve topics, areas and institution types,
+        only needed above ``summary``.
+    :param detail: Profile fields to load.
+    :returns: Member profiles in the same order as ``users``.
+    """
+    user_ids = [user.id for user in users]  # type: ignore
+    queries = {}
+    if detail != DetailLevel.SUMMARY:
+        queries["institutions"] = run_query(
+            list,
+            RelInstitution.objects.filter(content_type_id=user_ct_id, object_id__in=user_ids).select_related(
+                "institution"
+            ),
+        )
+        queries["memberships"] = run_query(
+            list,
+            Membership.objects.active().filter(user_id__in=user_ids).order_by("id").values_list("user_id", "type"),
+        )
+    if detail == DetailLevel.FULL:
+        queries["topics"] = run_query(
+            list,
+            RelTopic.objects.filter(content_type_id=user_ct_id, object_id__in=user_ids).values_list(
+                "object_id", "topic_id"
+            ),
+        )
+        queries["application_areas"] = run_query(
+            list,
+            RelApplicationArea.objects.filter(content_type_id=user_ct_id, object_id__in=user_ids).values_list(
+                "object_id", "application_area_id"
+            ),
+        )
+    rows = dict(zip(queries, await gather_queries(*queries.values()), strict=True))
+
+    institutions_by_user: dict[int, list[Institution]] = defaultdict(list)
+    for rel in rows.get("institutions", ()):
+        institutions_by_user[rel.object_id].append(
+            Institution.model_construct(
                 name=rel.institution.name,
                 country=rel.institution.country,
-                type=(
-                    _get_metadata_item("institution_type", rel.institution.type_id)  # type: ignore
-                    if hasattr(rel.institution, "type_id") and rel.institution.type_id  # type: ignore
-                    else None
-                ),
+                type=metadata.item("institution_type", rel.institution.type_id),  # type: ignore
             )
-            for rel in rel_institutions
-        ]
+        )
 
-        # Fetch topics with metadata
-        rel_topics = [
-            rel
-            async for rel in RelTopic.objects.filter(content_type=user_ct, object_id=user.id).select_related(  # type: ignore
-                "topic"
-            )
-        ]
-        topics_list = [
-            item
-            for rel in rel_topics
-            if (item := _get_metadata_item("topic", rel.topic_id)) is not None  # type: ignore
-        ]
-        topics = topics_list if topics_list else None
-
-        # Fetch application areas with metadata
-        rel_areas = [
-            rel
-            async for rel in RelApplicationArea.objects.filter(
-                content_type=user_ct,
-                object_id=user.id,  # type: ignore
-            ).select_related("application_area")
-        ]
-        areas_list = [
-            item
-            for rel in rel_areas
-            if (item := _get_metadata_item("application_area", rel.application_area_id)) is not None  # type: ignore
-        ]
-        application_areas = areas_list if areas_list else None
-
-        # Fetch active membership (only one active membership per user)
-        membership = None
-        async for m in user.memberships.filter(end_date__isnull=True):  # type: ignore
-            membership = MembershipType(m.type)
-            break  # Only take the first active membership
-
-        member_profiles.append(
-            Member(
-                username=user.username,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                profile_url=HttpUrl(f"https://www.hipeac.net/~{user.username}/"),
-                institutions=institutions if institutions else None,
-                topics=topics,
-                application_areas=application_areas,
-                membership=membership,
+    topics_by_user: dict[int, list[MetadataItem]] = defaultdict(list)
+    for object_id, topic_id in rows.get("topics", ()):
+        if (item := metadata.item("topic", topic_id)) is not None:  # type: ignore
+            topics_by_user[object_id].append(item)
+
+    areas_by_user: dict[int, list[MetadataItem]] = defaultdict(list)
+    for object_id, area_id in rows.get("application_areas", ()):
+        if (item := metadata.item("application_area", area_id)) is not None:  # type: ignore
+            areas_by_user[object_id].append(item)
+
+    membership_by_user: dict[int, MembershipType] = {}
+    for user_id, membership_type in rows.get("memberships", ()):
+        membership_by_user.setdefault(user_id, MembershipType(membership_type))
+
+    return [
+        _member(
+            user.username,
+            user.first_name,
+            user.last_name,
+            institutions_by_user.get(user.id, []),  # type: ignore
+            topics_by_user.get(user.id, []),  # type: ignore
+            areas_by_user.get(user.id, []),  # type: ignore
+            membership_by_user.get(user.id),  # type: ignore
+        )
+        for user in users
+    ]
+
+
+def _search_snapshot(
+    snapshot: DirectorySnapshot,
+    query: str | None,
+    filters: dict[Facet, list],
+    after: SortKey | None,
+    limit: int,
+    detail: DetailLevel = DetailLevel.FULL,
+) -> MemberSearchResponse:
+    """Answer a member search from the in-memory directory snapshot.
+
+    :param snapshot: The snapshot to search.
+    :param query: Optional free-text query.
+    :param filters: Accepted values per facet.
+    :param after: Sort key decoded from the request cursor.
+    :param limit: Maximum number of members to return.
+    :param detail: Profile fields to return.
+    :returns: Structured search results with member profiles.
+    """
+    page = snapshot.search(query, filters, after, limit)
+    member_profiles = [_member_from_record(snapshot, snapshot.members[ordinal], detail) for ordinal in page.ordinals]
+    return MemberSearchResponse(
+        total=page.total,
+        limit=limit,
+        members=member_profiles,
+        next_cursor=_encode_cursor(page.next_after, True) if page.next_after else None,
+    )
+
+
+def _member_from_record(
+    snapshot: DirectorySnapshot, record: MemberRecord, detail: DetailLevel = DetailLevel.FULL
+) -> Member:
+    """Build a member profile from a snapshot record.
+
+    :param snapshot: The snapshot the record belongs to.
+    :param record: The member record.
+    :param detail: Profile fields to return.
+    :returns: The member profile.
+    """
+    if detail == DetailLevel.SUMMARY:
+        return _member(record.username, record.first_name, record.last_name, [], [], [], None)
+
+    metadata, institutions = _snapshot_models(snapshot)
+    full = detail == DetailLevel.FULL
+    return _member(
+        record.username,
+        record.first_name,
+        record.last_name,
+        [institution for id in record.institution_ids if (institution := institutions.get(id))],
+        [item for id in record.topic_ids if (item := metadata.get(id))] if full else [],
+        [item for id in record.application_area_ids if (item := metadata.get(id))] if full else [],
+        MembershipType(record.membership_type),
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _snapshot_models(snapshot: DirectorySnapshot) -> tuple[dict[int, MetadataItem], dict[int, Institution]]:
+    """Build the metadata items and institutions of a snapshot once, to be shared by every profile.
+
+    :param snapshot: The snapshot, only the current one is kept.
+    :returns: Metadata items and institutions by id.
+    """
+    metadata = {id: MetadataItem(id=record.id, value=record.value) for id, record in snapshot.metadata.items()}
+    institutions = {
+        id: Institution.model_construct(
+            name=record.name,
+            country=record.country,
+            type=metadata.get(record.type_id) if record.type_id is not None else None,
+        )
+        for id, record in snapshot.institutions.items()
+    }
+    return metadata, institutions
+
+
+@functools.lru_cache(maxsize=4096)
+def _profile_url(username: str) -> HttpUrl:
+    return HttpUrl(f"https://www.hipeac.net/~{username}/")
+
+
+def _member(
+    username: str,
+    first_name: str,
+    last_name: str,
+    institutions: list[Institution],
+    topics: list[MetadataItem],
+    application_areas: list[MetadataItem],
+    membership: MembershipType | None,
+) -> Member:
+    """Build a member profile from trusted values, skipping validation.
+
+    Profiles are built from our own rows, already of the types the schema
+    declares, so ``model_construct`` gives the same model, serialized the same
+    way, without validating every nested item again.
+
+    :param username: Username, also used for the profile URL.
+    :param first_name: First name.
+    :param last_name: Last name.
+    :param institutions: Affiliations, omitted when empty.
+    :param topics: Research topics, omitted when empty.
+    :param application_areas: Application areas, omitted when empty.
+    :param membership: Active membership type.
+    :returns: The member profile.
+    """
+    return Member.model_construct(
+        username=username,
+        first_name=first_name,
+        last_name=last_name,
+        profile_url=_profile_url(username),
+        membership=membership,
+        institutions=institutions or None,
+        application_areas=application_areas or None,
+        topics=topics or None,
+    )
+
+
+MAX_USERNAMES = 200
+"""Maximum number of usernames looked up by one get_members call."""
+
+
+@mcp.tool(structured_output=True, annotations=ToolAnnotations(readOnlyHint=True))
+@instrument
+@single_flight
+@release_connections
+async def get_members(usernames: list[str], detail: DetailLevel = DetailLevel.FULL) -> MemberLookupResponse:
+    """Get the profiles of HiPEAC network members by username.
+
+    Use this to get details of specific people, e.g. from the usernames of a
+    `search_members` response, instead of searching for each of them.
+
+    :param usernames: Usernames of the members, ignoring case (at most 200).
+    :param detail: Profile fields to return: 'summary' (names, username and profile URL),
+        'standard' (adds membership and institutions) or 'full' (adds topics and application
+        areas).
+    :returns: The profiles of the members found, in the order of ``usernames``, and the
+        usernames that are not those of an active member.
+    :raises ValueError: If more than 200 usernames are given.
+    """
+    # Usernames differing only in case are the same member: keep the first spelling of each
+    unique: dict[str, str] = {}
+    for username in map(str.strip, usernames):
+        if username:
+            unique.setdefault(username.lower(), username)
+    requested = list(unique.values())
+    if len(requested) > MAX_USERNAMES:
+        raise ValueError(f"Too many usernames, look up at most {MAX_USERNAMES} at a time")
+    detail = DetailLevel(detail)
+
+    snapshot = get_snapshot()
+    if snapshot is not None and not await aggregates_ready(snapshot, "ordinals_by_username"):
+        snapshot = None
+    version = await _result_version(snapshot)
+    key = ("get_members", tuple(requested), detail)
+
+    response = search_results.get(key, version)
+    if response is None:
+        if snapshot is not None:
+            profiles = {
+                username.lower(): _member_from_record(snapshot, snapshot.members[ordinal], detail)
+                for username, ordinal in zip(requested, snapshot.find(requested), strict=True)
+                if ordinal is not None
+            }
+        else:
+            profiles = await _lookup_database(requested, detail)
+        response = MemberLookupResponse(
+            members=[profiles[username.lower()] for username in requested if username.lower() in profiles],
+            not_found=[username for username in requested if username.lower() not in profiles],
+        )
+        search_results.set(key, response, version)
+    return response
+
+
+async def _lookup_database(usernames: list[str], detail: DetailLevel) -> dict[str, Member]:
+    """Build the profiles of active members with one indexed username query and a batched hydration.
+
+    :param usernames: Usernames to look up.
+    :param detail: Profile fields to load.
+    :returns: Profiles by lowercase username.
+    """
+    if not usernames:
+        return {}
+
+    user_ct_id = await content_types.get_id("hipeac", "user")
+    users = await run_query(
+        list,
+        User.objects.filter(
+            Exists(Membership.objects.active().filter(user=OuterRef("pk"))), username__in=usernames
+        ).only("id", "username", "first_name", "last_name"),
+    )
+    if not users:
+        return {}
+
+    metadata = await metadata_cache.get() if detail != DetailLevel.SUMMARY else None
+    profiles = await _hydrate_members(users, user_ct_id, metadata, detail)
+    return {profile.username.lower(): profile for profile in profiles}
+
+
+MAX_SIMILAR_MEMBERS = 50
+"""Maximum number of members returned by one find_similar_members call."""
+
+
+@mcp.tool(structured_output=True, annotations=ToolAnnotations(readOnlyHint=True))
+@instrument
+@single_flight
+@release_connections
+async def find_similar_members(
+    username: str, limit: int = 10, detail: DetailLevel = DetailLevel.FULL
+) -> SimilarMembersResponse:
+    """Find HiPEAC network members with research interests similar to a given member.
+
+    Members are ranked by the research topics and application areas they share with
+    the given member, a rare topic in common counting more than a popular one. Use this
+    to answer "who works on the same things as X", e.g. to suggest collaborators.
+
+    :param username: Username of the member, ignoring case.
+    :param limit: Maximum number of similar members to return (max: 50).
+    :param detail: Profile fields to return: 'summary' (names, username and profile URL),
+        'standard' (adds membership and institutions) or 'full' (adds topics and application
+        areas).
+    :returns: The profile of the member and the most similar members, most similar first,
+        each with a similarity score between 0 and 1 and the topics and application areas
+        in common.
+    :raises ValueError: If there is no active member with this username.
+    """
+    actual_limit = max(1, min(limit, MAX_SIMILAR_MEMBERS))
+    username = username.strip()
+    detail = DetailLevel(detail)
+
+    snapshot = get_snapshot()
+    if snapshot is not None and not await aggregates_ready(snapshot, "ordinals_by_username", "similarity_index"):
+        snapshot = None
+    version = await _result_version(snapshot)
+    key = ("find_similar_members", username.lower(), actual_limit, detail)
+
+    response = search_results.get(key, version)
+    if response is None:
+        if snapshot is not None:
+            response = _similar_snapshot(snapshot, username, actual_limit, detail)
+        else:
+            response = await _similar_database(username, actual_limit, detail)
+        search_results.set(key, response, version)
+    return response
+
+
+def _similar_snapshot(
+    snapshot: DirectorySnapshot, username: str, limit: int, detail: DetailLevel
+) -> SimilarMembersResponse:
+    """Find similar members with the similarity index of the directory snapshot.
+
+    :param snapshot: The snapshot to search.
+    :param username: Username of the member.
+    :param limit: Maximum number of similar members to return.
+    :param detail: Profile fields to return.
+    :returns: The member and the most similar members.
+    :raises ValueError: If there is no active member with this username.
+    """
+    (ordinal,) = snapshot.find([username])
+    if ordinal is None:
+        raise ValueError(f"No active member with username '{username}'")
+
+    record = snapshot.members[ordinal]
+    metadata = _snapshot_models(snapshot)[0]
+    similar = []
+    for score, other in snapshot.similarity_index.similar(ordinal, limit):
+        candidate = snapshot.members[other]
+        similar.append(
+            _similar_member(
+                _member_from_record(snapshot, candidate, detail),
+                score,
+                _shared(record.topic_ids, candidate.topic_ids, metadata.get),
+                _shared(record.application_area_ids, candidate.application_area_ids, metadata.get),
             )
         )
+    return SimilarMembersResponse(member=_member_from_record(snapshot, record, detail), similar=similar)
+
+
+async def _similar_database(username: str, limit: int, detail: DetailLevel) -> SimilarMembersResponse:
+    """Find similar members by reading the incidence of the members sharing a feature with the member.
+
+    The topics and application areas of every candidate are read concurrently with how many
+    members have each of them, and scored with a similarity index of the candidates, which
+    gives the same scores as the snapshot.
+
+    :param username: Username of the member.
+    :param limit: Maximum number of similar members to return.
+    :param detail: Profile fields to load.
+    :returns: The member and the most similar members.
+    :raises ValueError: If there is no active member with this username.
+    """
+    user_ct_id = await content_types.get_id("hipeac", "user")
+    active = User.objects.filter(Exists(Membership.objects.active().filter(user=OuterRef("pk"))))
+    user = await run_query(active.filter(username=username).only("id", "username", "first_name", "last_name").first)
+    if user is None:
+        raise ValueError(f"No active member with username '{username}'")
+
+    topics = RelTopic.objects.filter(content_type_id=user_ct_id, object_id__in=active.values("pk"))
+    areas = RelApplicationArea.objects.filter(content_type_id=user_ct_id, object_id__in=active.values("pk"))
+    own_topics, own_areas = await gather_queries(
+        run_query(list, topics.filter(object_id=user.id).values_list("topic_id", flat=True)),  # type: ignore
+        run_query(list, areas.filter(object_id=user.id).values_list("application_area_id", flat=True)),  # type: ignore
+    )
+
+    topic_users = topics.filter(topic_id__in=own_topics).values("object_id")
+    area_users = areas.filter(application_area_id__in=own_areas).values("object_id")
+    sharing = Q(object_id__in=topic_users) | Q(object_id__in=area_users)
+    total, topic_counts, area_counts, topic_rows, area_rows, candidates, metadata = await gather_queries(
+        run_query(active.count),
+        run_query(list, topics.order_by().values_list("topic_id").annotate(count=Count("object_id", distinct=True))),
+        run_query(
+            list,
+            areas.order_by().values_list("application_area_id").annotate(count=Count("object_id", distinct=True)),
+        ),
+        run_query(list, topics.filter(sharing).values_list("object_id", "topic_id")),
+        run_query(list, areas.filter(sharing).values_list("object_id", "application_area_id")),
+        run_query(
+            list,
+            active.filter(Q(pk__in=topic_users) | Q(pk__in=area_users) | Q(pk=user.id)).values_list(  # type: ignore
+                "id", "username", "first_name", "last_name"
+            ),
+        ),
+        metadata_cache.get(),
+    )
+
+    topics_by_user: dict[int, list[int]] = defaultdict(list)
+    for user_id, topic_id in topic_rows:
+        topics_by_user[user_id].append(topic_id)
+    areas_by_user: dict[int, list[int]] = defaultdict(list)
+    for user_id, area_id in area_rows:
+        areas_by_user[user_id].append(area_id)
+    frequencies: dict[int, int] = defaultdict(int)
+    for feature, count in [*topic_counts, *area_counts]:
+        frequencies[feature] += count
+
+    # Candidates are indexed in the (last_name, id) order of snapshot ordinals, which breaks ties the same way
+    users = [User(id=id, username=name, first_name=first, last_name=last) for id, name, first, last in candidates]
+    users.sort(key=lambda candidate: (candidate.last_name, candidate.id))
+    index = SimilarityIndex(
+        [topics_by_user.get(candidate.id, []) + areas_by_user.get(candidate.id, []) for candidate in users],  # type: ignore
+        frequencies,
+        total,
+    )
+    ordinal = next(position for position, candidate in enumerate(users) if candidate.id == user.id)  # type: ignore
+    best = index.similar(ordinal, limit)
+
+    profiles = await _hydrate_members(
+        [user, *(users[other] for _, other in best)],
+        user_ct_id,
+        metadata if detail != DetailLevel.SUMMARY else None,
+        detail,
+    )
+    topic_item, area_item = (
+        functools.partial(metadata.item, "topic"),
+        functools.partial(metadata.item, "application_area"),
+    )
+    own_topic_ids, own_area_ids = topics_by_user.get(user.id, []), areas_by_user.get(user.id, [])  # type: ignore
+    return SimilarMembersResponse(
+        member=profiles[0],
+        similar=[
+            _similar_member(
+                profile,
+                score,
+                _shared(own_topic_ids, topics_by_user.get(users[other].id, []), topic_item),  # type: ignore
+                _shared(own_area_ids, areas_by_user.get(users[other].id, []), area_item),  # type: ignore
+            )
+            for (score, other), profile in zip(best, profiles[1:], strict=True)
+        ],
+    )
+
+
+def _shared(
+    own_ids: Iterable[int], other_ids: Iterable[int], item: Callable[[int], MetadataItem | None]
+) -> list[MetadataItem]:
+    """List the metadata items two members have in common.
+
+    :param own_ids: Metadata ids of the member, in the order they are listed.
+    :param other_ids: Metadata ids of the other member.
+    :param item: Gives the metadata item of an id.
+    :returns: The items in common, in the order of ``own_ids``.
+    """
+    other_ids = set(other_ids)
+    return [found for id in dict.fromkeys(own_ids) if id in other_ids and (found := item(id)) is not None]
+
+
+def _similar_member(
+    member: Member, score: float, topics: list[MetadataItem], application_areas: list[MetadataItem]
+) -> SimilarMember:
+    return SimilarMember.model_construct(
+        member=member, score=round(score, 4), shared_topics=topics, shared_application_areas=application_areas
+    )
+
+
+@mcp.tool(structured_output=True, annotations=ToolAnnotations(readOnlyHint=True))
+@instrument
+@single_flight
+@release_connections
+async def member_facets(
+    query: str | None = None,
+    topic_ids: list[int] | None = None,
+    application_area_ids: list[int] | None = None,
+    countries: list[str] | None = None,
+    institution_type_ids: list[int] | None = None,
+    membership_types: list[MembershipType] | None = None,
+) -> MemberFacetsResponse:
+    """Count HiPEAC network members matching a search, per topic, country and other facets.
+
+    Returns counts per topic, application area, country, institution type and membership type.
+    Use this instead of repeated `search_members` calls to learn how many members match,
+    or which topics and countries are most represented among them: it takes the same
+    filters and returns no profiles. Each value can be passed back as a filter.
+
+    :param query: Text search in member names, emails, or usernames.
+    :param topic_ids: Filter by research topic IDs (get from get_metadata tool).
+    :param application_area_ids: Filter by application area IDs (get from get_metadata tool).
+    :param countries: Filter by ISO country codes (e.g., ['BE', 'ES', 'DE']).
+    :param institution_type_ids: Filter by institution type IDs (get from get_metadata tool).
+    :param membership_types: Filter by membership type keys: 'member', 'associated_member',
+        'affiliated_member', 'affiliated_phd' (get from get_metadata tool).
+    :returns: The number of matching members, and per facet the number of them having each
+        value, largest first.
+    """
+    query = (query or "").strip() or None
+    filters = _normalize_filters(topic_ids, application_area_ids, countries, institution_type_ids, membership_types)
+
+    snapshot = get_snapshot()
+    version = await _result_version(snapshot)
+    key = ("member_facets", query, *(tuple(values) for values in filters.values()))
+
+    response = search_results.get(key, version)
+    if response is None:
+        if snapshot is not None:
+            matches = snapshot.matching(query, filters)
+            metadata = _snapshot_models(snapshot)[0]
+            response = _facets_response(
+                matches.bit_count(),
+                snapshot.facet_counts(matches),
+                lambda facet, value: item.value if (item := metadata.get(value)) else None,  # type: ignore
+            )
+        else:
+            response = await _facets_database(query, filters)
+        search_results.set(key, response, version)
+    return response
+
+
+async def _facets_database(query: str | None, filters: dict[Facet, list]) -> MemberFacetsResponse:
+    """Count matching members per facet value with one grouped query per facet, run concurrently.
+
+    :param query: Optional free-text query.
+    :param filters: Accepted values per facet.
+    :returns: The facet counts.
+    """
+    user_ct_id = await content_types.get_id("hipeac", "user")
+    users = _matching_users(query, filters, user_ct_id).values("pk")
+    related = {"content_type_id": user_ct_id, "object_id__in": users}
+
+    def grouped(queryset: QuerySet, value: str, user: str = "object_id"):
+        return run_query(list, queryset.order_by().values_list(value).annotate(count=Count(user, distinct=True)))
+
+    total, *grouped_counts = await gather_queries(
+        run_query(users.count),
+        grouped(RelTopic.objects.filter(**related), "topic_id"),
+        grouped(RelApplicationArea.objects.filter(**related), "application_area_id"),
+        grouped(RelInstitution.objects.filter(**related), "institution__country"),
+        grouped(RelInstitution.objects.filter(**related, institution__type__isnull=False), "institution__type_id"),
+        grouped(
+            User.objects.filter(pk__in=users).annotate(membership_type=_first_membership_type()),
+            "membership_type",
+            "pk",
+        ),
+    )
+    facets = [Facet.TOPIC, Facet.APPLICATION_AREA, Facet.COUNTRY, Facet.INSTITUTION_TYPE, Facet.MEMBERSHIP_TYPE]
+    counts = {facet: dict(rows) for facet, rows in zip(facets, grouped_counts, strict=True)}
+
+    metadata = await metadata_cache.get()
+    return _facets_response(
+        total,
+        counts,
+        lambda facet, value: item.value if (item := metadata.item(facet.value, value)) else None,  # type: ignore
+    )
+
+
+def _facets_response(
+    total: int,
+    counts: dict[Facet, dict[int | str, int]],
+    metadata_value: Callable[[Facet, int | str], str | None],
+) -> MemberFacetsResponse:
+    """Build the facet counts response, with values ordered by decreasing count.
+
+    :param total: Number of matching members.
+    :param counts: Number of matching members by value, per facet.
+    :param metadata_value: Gives the name of a topic, application area or institution type.
+    :returns: The response.
+    """
+
+    def label(facet: Facet, value: int | str) -> str | None:
+        if facet == Facet.COUNTRY:
+            return None
+        if facet == Facet.MEMBERSHIP_TYPE:
+            return MEMBERSHIP_TYPE_LABELS.get(value)  # type: ignore
+        return metadata_value(facet, value)
+
+    def facet_counts(facet: Facet) -> list[FacetCount]:
+        return [
+            FacetCount.model_construct(value=value, label=label(facet, value), count=count)
+            for value, count in sorted(counts.get(facet, {}).items(), key=lambda item: (-item[1], str(item[0])))
+        ]
 
-    return MemberSearchResponse(total=len(member_profiles), limit=actual_limit, members=member_profiles)
+    return MemberFacetsResponse(
+        total=total,
+        topics=facet_counts(Facet.TOPIC),
+        application_areas=facet_counts(Facet.APPLICATION_AREA),
+        countries=facet_counts(Facet.COUNTRY),
+        institution_types=facet_counts(Facet.INSTITUTION_TYPE),
+        membership_types=facet_counts(Facet.MEMBERSHIP_TYPE),
+    )
@@ -0,0 +1,290 @@
+"""MCP Tools for analyzing the collaboration network of HiPEAC members.
+
+Members are linked when they share an institution or when one is the advisor
+of the other. The links are read from the collaboration graph of the member
+directory snapshot, built once per snapshot, so these tools need the snapshot:
+they are only registered when it is enabled, or when a snapshot file is served
+without the database.
+"""
+
+import heapq
+
+from django.conf import settings
+from mcp.types import ToolAnnotations
+
+from hipeac_mcp import mcp
+
+from ..cache import search_results
+from ..concurrency import single_flight
+from ..db import release_connections
+from ..directory import Connectivity, DirectorySnapshot, Facet, LinkKind, aggregates_ready, bitsets, get_snapshot
+from ..instrumentation import instrument
+from ..schemas.members import DetailLevel
+from ..schemas.network import (
+    Connection,
+    ConnectionPathResponse,
+    CountryConnectivity,
+    InstitutionConnectivity,
+    LinkType,
+    MemberConnectionsResponse,
+    NetworkConnectivityResponse,
+    PathStep,
+)
+from .members import _member_from_record, _snapshot_models
+
+
+MAX_CONNECTIONS = 100
+"""Maximum number of connections returned by one member_connections call."""
+
+MAX_PATH_DEPTH = 6
+"""Maximum number of links of a path looked for by connection_path."""
+
+PATH_NODE_BUDGET = 20_000
+"""Members and institutions a connection_path search may reach before giving up."""
+
+MAX_GROUPS = 50
+"""Maximum number of countries and of institutions described by one network_connectivity call."""
+
+
+async def _network_snapshot(*aggregates: str) -> DirectorySnapshot:
+    """Get the snapshot holding the collaboration graph, waiting for its aggregates to be built.
+
+    :param aggregates: Aggregates needed besides the collaboration graph.
+    :returns: The current snapshot.
+    :raises ValueError: If the snapshot is disabled or not built yet.
+    """
+    snapshot = get_snapshot()
+    if snapshot is None:
+        raise ValueError("Network analysis needs the member snapshot, which is disabled or still loading")
+    await aggregates_ready(snapshot, "collaboration_graph", *aggregates, wait=True)
+    return snapshot
+
+
+def _ordinal(snapshot: DirectorySnapshot, username: str) -> int:
+    """Find the ordinal of a member.
+
+    :param snapshot: The snapshot to look the member up in.
+    :param username: Username of the member, ignoring case.
+    :returns: The member ordinal.
+    :raises ValueError: If there is no active member with this username.
+    """
+    (ordinal,) = snapshot.find([username.strip()])
+    if ordinal is None:
+        raise ValueError(f"No active member with username '{username.strip()}'")
+    return ordinal
+
+
+@instrument
+@single_flight
+@release_connections
+async def member_connections(
+    username: str, limit: int = 20, detail: DetailLevel = DetailLevel.SUMMARY
+) -> MemberConnectionsResponse:
+    """List the HiPEAC network members directly linked to a member.
+
+    Members are linked when they share an institution, or when one is the advisor of
+    the other. Advisor and advisees come first, then members sharing the most institutions.
+
+    :param username: Username of the member, ignoring case.
+    :param limit: Maximum number of connections to return (max: 100).
+    :param detail: Profile fields to return: 'summary' (names, username and profile URL),
+        'standard' (adds membership and institutions) or 'full' (adds topics and application
+        areas).
+    :returns: The member, its number of connections and the first of them, each with the
+        institutions shared and whether it is the advisor or an advisee of the member.
+    :raises ValueError: If there is no active member with this username, or the member
+        snapshot is not available.
+    """
+    actual_limit = max(1, min(limit, MAX_CONNECTIONS))
+    detail = DetailLevel(detail)
+    snapshot = await _network_snapshot("ordinals_by_username")
+    key = ("member_connections", username.strip().lower(), actual_limit, detail)
+
+    response = search_results.get(key, snapshot.built_at)
+    if response is None:
+        ordinal = _ordinal(snapshot, username)
+        neighbors = snapshot.collaboration_graph.neighbors(ordinal)
+        institutions = _snapshot_models(snapshot)[1]
+
+        def rank(other: int) -> tuple:
+            links = neighbors[other]
+            advised = any(kind != LinkKind.INSTITUTION for kind, _ in links)
+            return not advised, -len(links), other
+
+        connections = []
+        # Members of a large institution have many neighbors: only the first ones are ordered
+        for other in heapq.nsmallest(actual_limit, neighbors, key=rank):
+            links = neighbors[other]
+            connections.append(
+                Connection(
+                    member=_member_from_record(snapshot, snapshot.members[other], detail),
+                    advisor=(LinkKind.ADVISOR, None) in links,
+                    advisee=(LinkKind.ADVISEE, None) in links,
+                    shared_institutions=[institutions[id] for kind, id in links if kind == LinkKind.INSTITUTION],  # type: ignore
+                )
+            )
+        response = MemberConnectionsResponse(
+            member=_member_from_record(snapshot, snapshot.members[ordinal], detail),
+            total=len(neighbors),
+            connections=connections,
+        )
+        search_results.set(key, response, snapshot.built_at)
+    return response
+
+
+@instrument
+@single_flight
+@release_connections
+async def connection_path(from_username: str, to_username: str, max_depth: int = 4) -> ConnectionPathResponse:
+    """Find how two HiPEAC network members are connected, through the fewest links.
+
+    Each link is a shared institution or an advisor relation. The search is bounded: it
+    looks for paths of at most ``max_depth`` links, and gives up when too much of the
+    network has been explored, in which case ``truncated`` is true and a longer path may
+    still exist.
+
+    :param from_username: Username of the first member, ignoring case.
+    :param to_username: Username of the last member, ignoring case.
+    :param max_depth: Maximum number of links in the path (max: 6).
+    :returns: Whether a path was found, its number of links, and the members along it,
+        each with the link from the previous member.
+    :raises ValueError: If either username is not that of an active member, or the member
+        snapshot is not available.
+    """
+    depth = max(0, min(max_depth, MAX_PATH_DEPTH))
+    snapshot = await _network_snapshot("ordinals_by_username")
+    key = ("connection_path", from_username.strip().lower(), to_username.strip().lower(), depth)
+
+    response = search_results.get(key, snapshot.built_at)
+    if response is None:
+        search = snapshot.collaboration_graph.shortest_path(
+            _ordinal(snapshot, from_username), _ordinal(snapshot, to_username), depth, PATH_NODE_BUDGET
+        )
+        institutions = _snapshot_models(snapshot)[1]
+        path = [
+            PathStep(
+                member=_member_from_record(snapshot, snapshot.members[step.ordinal], DetailLevel.SUMMARY),
+                link=LinkType(step.kind.value) if step.kind is not None else None,
+                institution=institutions.get(step.institution_id) if step.institution_id is not None else None,
+            )
+            for step in search.path or []
+        ]
+        response = ConnectionPathResponse(
+            found=search.path is not None,
+            degrees=len(path) - 1 if search.path is not None else None,
+            path=path,
+            explored=search.explored,
+            truncated=search.exhausted,
+        )
+        search_results.set(key, response, snapshot.built_at)
+    return response
+
+
+@instrument
+@single_flight
+@release_connections
+async def network_connectivity(
+    countries: list[str] | None = None, institution_ids: list[int] | None = None
+) -> NetworkConnectivityResponse:
+    """Describe how well connected the HiPEAC members of countries and institutions are.
+
+    For each group of members: how many connected components they form through shared
+    institutions and advisor relations, the size of the largest one, the advisor relations
+    inside the group and with the rest of the network, and the number of other
+    institutions and countries its members are also affiliated to.
+
+    :param countries: ISO country codes (e.g., ['BE', 'ES']); every country when neither
+        countries nor institutions are given.
+    :param institution_ids: Institution IDs (get from search_institutions tool); institutions
+        without active members are left out.
+    :returns: Connectivity statistics per country, by decreasing number of members, and per
+        institution, in the order given.
+    :raises ValueError: If more than 50 countries or institutions are given, or the member
+        snapshot is not available.
+    """
+    codes = list(dict.fromkeys(c.strip().upper() for c in countries or []))
+    ids = list(dict.fromkeys(institution_ids or []))
+    if len(codes) > MAX_GROUPS or len(ids) > MAX_GROUPS:
+        raise ValueError(f"Too many countries or institutions, describe at most {MAX_GROUPS} of each at a time")
+    snapshot = await _network_snapshot("institution_aggregates")
+    key = ("network_connectivity", tuple(codes), tuple(ids))
+
+    response = search_results.get(key, snapshot.built_at)
+    if response is None:
+        graph = snapshot.collaboration_graph
+        aggregates = snapshot.institution_aggregates
+        institutions_by_country: dict[str, set[int]] = {}
+        for id in aggregates:
+            institutions_by_country.setdefault(snapshot.institutions[id].country, set()).add(id)
+        if not codes and not ids:
+            codes = sorted(institutions_by_country)
+
+        def linked_countries(connectivity: Connectivity, country: str) -> int:
+            return len({snapshot.institutions[id].country for id in connectivity.linked_institutions} - {country})
+
+        country_stats = []
+        for code in codes:
+            connectivity = graph.connectivity(
+                bitsets.iter_ordinals(snapshot.postings(Facet.COUNTRY, code)), institutions_by_country.get(code, set())
+            )
+            country_stats.append(
+                CountryConnectivity(
+                    country=code,
+                    institutions=len(institutions_by_country.get(code, ())),
+                    linked_countries=linked_countries(connectivity, code),
+                    **_connectivity_fields(connectivity),
+                )
+            )
+        country_stats.sort(key=lambda stats: (-stats.members, stats.country))
+
+        institution_stats = []
+        for id in ids:
+            if id not in aggregates:
+                continue
+            record = aggregates[id].institution
+            connectivity = graph.connectivity(graph.members_of(id), {id})
+            institution_stats.append(
+                InstitutionConnectivity(
+                    id=id,
+                    name=record.name,
+                    country=record.country,
+                    linked_countries=linked_countries(connectivity, record.country),
+                    **_connectivity_fields(connectivity),
+                )
+            )
+
+        response = NetworkConnectivityResponse(countries=country_stats, institutions=institution_stats)
+        search_results.set(key, response, snapshot.built_at)
+    return response
+
+
+def _connectivity_fields(connectivity: Connectivity) -> dict[str, int]:
+    return {
+        "members": connectivity.members,
+        "components": connectivity.components,
+        "largest_component": connectivity.largest_component,
+        "advisor_links": connectivity.advisor_links,
+        "external_advisor_links": connectivity.external_advisor_links,
+        "linked_institutions": len(connectivity.linked_institutions),
+    }
+
+
+_registered = False
+
+
+def register_network_tools() -> None:
+    """Register the network tools with the server, once.
+
+    Called at import when ``MEMBER_SNAPSHOT_ENABLED`` is set, and by
+    ``serve_offline`` once a snapshot is pinned.
+    """
+    global _registered
+    if _registered:
+        return
+    for tool in (member_connections, connection_path, network_connectivity):
+        mcp.tool(structured_output=True, annotations=ToolAnnotations(readOnlyHint=True))(tool)
+    _registered = True
+
+
+if settings.MEMBER_SNAPSHOT_ENABLED:
+    register_network_tools()
@@ -0,0 +1,215 @@
+"""Tests for the pooled MySQL backend."""
+
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+
+def alive(connection):
+    return True
+
+
+class TestConnectionPool:
+    """Tests for ConnectionPool."""
+
+    def test_released_connection_is_reused(self):
+        """Test a released connection is handed out again instead of opening a new one."""
+        from hipeac_mcp.backends import ConnectionPool
+
+        pool = ConnectionPool(size=2, max_age=300, idle_timeout=60)
+        connect = Mock(side_effect=lambda: Mock())
+
+        first = pool.acquire(connect, alive)
+        pool.release(first)
+        second = pool.acquire(connect, alive)
+
+        assert second is first
+        assert connect.call_count == 1
+        assert (pool.stats.opened, pool.stats.reused) == (1, 1)
+
+    def test_most_recently_used_first(self):
+        """Test idle connections are reused in LIFO order."""
+        from hipeac_mcp.backends import ConnectionPool
+
+        pool = ConnectionPool(size=2, max_age=300, idle_timeout=60)
+        first, second = pool.acquire(Mock, alive), pool.acquire(Mock, alive)
+        pool.release(first)
+        pool.release(second)
+
+        assert pool.acquire(Mock, alive) is second
+
+    def test_dead_connection_is_replaced(self):
+        """Test a connection failing its ping is closed and a new one is opened."""
+        from hipeac_mcp.backends import ConnectionPool
+
+        pool = ConnectionPool(size=2, max_age=300, idle_timeout=60)
+        stale = pool.acquire(Mock, alive)
+        pool.release(stale)
+
+        fresh = pool.acquire(Mock, lambda connection: False)
+
+        assert fresh is not stale
+        stale.connection.close.assert_called_once()
+        assert pool.stats.stale == 1
+
+    def test_size_bounds_idle_connections(self):
+        """Test connections beyond the pool size are closed on release."""
+        from hipeac_mcp.backends import ConnectionPool
+
+        pool = ConnectionPool(size=1, max_age=300, idle_timeout=60)
+        first, second = pool.acquire(Mock, alive), pool.acquire(Mock, alive)
+
+        pool.release(first)
+        pool.release(second)
+
+        first.connection.close.assert_not_called()
+        second.connection.close.assert_called_once()
+
+    def test_unreusable_connection_is_closed(self):
+        """Test a connection released in an unknown state is closed."""
+        from hipeac_mcp.backends import ConnectionPool
+
+        pool = ConnectionPool(size=2, max_age=300, idle_timeout=60)
+        pooled = pool.acquire(Mock, alive)
+
+        pool.release(pooled, reusable=False)
+
+        pooled.connection.close.assert_called_once()
+        assert pool.acquire(Mock, alive) is not pooled
+
+    @pytest.mark.parametrize(("max_age", "idle_timeout"), [(0, 60), (300, 0)])
+    def test_expired_connections_are_evicted(self, max_age, idle_timeout):
+        """Test connections past their max age or idle timeout are not reused."""
+        from hipeac_mcp.backends import ConnectionPool
+
+        pool = ConnectionPool(size=2, max_age=300, idle_timeout=60)
+        pooled = pool.acquire(Mock, alive)
+        pool.release(pooled)
+        pool.max_age, pool.idle_timeout = max_age, idle_timeout
+
+        assert pool.acquire(Mock, alive) is not pooled
+        pooled.connection.close.assert_called_once()
+        assert pool.stats.evicted == 1
+
+    def test_expired_top_does_not_hide_live_connections(self):
+        """Test a connection past its max age on top of the stack is evicted and a younger one below reused."""
+        from hipeac_mcp.backends import ConnectionPool
+
+        pool = ConnectionPool(size=2, max_age=300, idle_timeout=60)
+        old, young = pool.acquire(Mock, alive), pool.acquire(Mock, alive)
+        pool.release(young)
+        pool.release(old)
+        old.created_at -= 300
+        connect = Mock()
+
+        assert pool.acquire(connect, alive) is young
+        connect.assert_not_called()
+        old.connection.close.assert_called_once()
+        assert (pool.stats.opened, pool.stats.reused, pool.stats.evicted) == (2, 1, 1)
+
+    def test_counters_are_not_lost_between_threads(self):
+        """Test counters updated by many threads at once add up."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        from hipeac_mcp.backends import ConnectionPool
+
+        pool = ConnectionPool(size=8, max_age=300, idle_timeout=60)
+
+        def use(_):
+            pool.release(pool.acquire(Mock, alive))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(use, range(2000)))
+
+        assert pool.stats.opened + pool.stats.reused == 2000
+
+    def test_recently_released_connection_is_not_pinged(self):
+        """Test only connections idle for longer than ping_after are pinged before they are reused."""
+        from hipeac_mcp.backends import ConnectionPool
+
+        pool = ConnectionPool(size=2, max_age=300, idle_timeout=60, ping_after=1)
+        is_alive = Mock(return_value=True)
+        pooled = pool.acquire(Mock, is_alive)
+
+        pool.release(pooled)
+        assert pool.acquire(Mock, is_alive) is pooled
+        is_alive.assert_not_called()
+
+        pool.release(pooled)
+        pooled.released_at -= 1
+        assert pool.acquire(Mock, is_alive) is pooled
+        is_alive.assert_called_once_with(pooled.connection)
+
+    def test_clear(self):
+        """Test clear closes every idle connection."""
+        from hipeac_mcp.backends import ConnectionPool
+
+        pool = ConnectionPool(size=2, max_age=300, idle_timeout=60)
+        pooled = pool.acquire(Mock, alive)
+        pool.release(pooled)
+
+        pool.clear()
+
+        pooled.connection.close.assert_called_once()
+
+
+class TestPooledDatabaseWrapper:
+    """Tests for the pooled MySQL DatabaseWrapper."""
+
+    def wrapper(self, size=2):
+        from django.conf import settings
+
+        from hipeac_mcp.backends.mysql.base import DatabaseWrapper
+
+        return DatabaseWrapper({**settings.DATABASES["default"], "POOL": {"SIZE": size}}, alias=f"pool-{size}")
+
+    @patch("hipeac_mcp.backends.mysql.base.pools", {})
+    @patch("django.db.backends.mysql.base.Database")
+    def test_close_returns_connection_to_pool(self, mock_database):
+        """Test closing one wrapper lets the next one reuse its raw connection."""
+        mock_database.connect.side_effect = lambda **params: MagicMock()
+
+        first, second = self.wrapper(), self.wrapper()
+        raw = first.get_new_connection({})
+        first.connection, first.autocommit = raw, True
+        first._close()
+
+        assert second.get_new_connection({}) is raw
+        raw.close.assert_not_called()
+        assert mock_database.connect.call_count == 1
+
+    @patch("hipeac_mcp.backends.mysql.base.pools", {})
+    @patch("django.db.backends.mysql.base.Database")
+    def test_connection_with_errors_is_closed(self, mock_database):
+        """Test a connection that raised a database error is not pooled."""
+        mock_database.connect.side_effect = lambda **params: MagicMock()
+
+        wrapper = self.wrapper()
+        raw = wrapper.get_new_connection({})
+        wrapper.connection, wrapper.autocommit, wrapper.errors_occurred = raw, True, True
+        wrapper._close()
+
+        raw.close.assert_called_once()
+
+    @patch("hipeac_mcp.backends.mysql.base.pools", {})
+    @patch("django.db.backends.mysql.base.Database")
+    def test_size_zero_disables_pooling(self, mock_database):
+        """Test a pool size of 0 closes connections like the stock backend."""
+        mock_database.connect.side_effect = lambda **params: MagicMock()
+
+        wrapper = self.wrapper(size=0)
+        raw = wrapper.get_new_connection({})
+        wrapper.connection = raw
+        wrapper._close()
+
+        assert wrapper.pool is None
+        raw.close.assert_called_once()
+
+    @patch("hipeac_mcp.backends.mysql.base.pools", {})
+    @patch("hipeac_mcp.backends.mysql.base.register_counters")
+    def test_pool_counters_are_registered(self, mock_register):
+        """Test the counters of a pool are registered once, when the pool is created."""
+        first, second = self.wrapper(), self.wrapper()
+
+        assert first.pool is second.pool
+        mock_register.assert_called_once_with("db_pool.pool-2", first.pool.stats)
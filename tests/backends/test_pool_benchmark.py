@@ -0,0 +1,61 @@
+"""Benchmark for per-call database latency with and without the connection pool."""
+
+import os
+import time
+
+import pytest
+from asgiref.sync import sync_to_async
+
+
+RUNS = 50
+
+
+def one_call():
+    """Run one query and release the connection, like a tool call does."""
+    from django.db import close_old_connections, connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    close_old_connections()
+
+
+async def timed_calls(runs=RUNS):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await sync_to_async(one_call)()
+        times.append(time.perf_counter() - start)
+    return sum(times) / len(times)
+
+
+@pytest.mark.asyncio
+async def test_benchmark_pooled_connections():
+    """Compare per-call latency with a fresh connection per call and with the pool."""
+    if not os.environ.get("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    from django.db import connection
+
+    from hipeac_mcp.backends.mysql import base
+
+    pool_options = connection.settings_dict["POOL"]
+    size = pool_options["SIZE"]
+    try:
+        pool_options["SIZE"] = 0
+        unpooled = await timed_calls()
+
+        pool_options["SIZE"] = 4
+        await timed_calls(1)
+        pooled = await timed_calls()
+        stats = base.pools[connection.alias].stats
+    finally:
+        pool_options["SIZE"] = size
+
+    print(f"\n\nPer-call latency ({RUNS} calls, SELECT 1):")
+    print(f"New connection: {unpooled * 1000:.2f}ms")
+    print(f"Pooled:         {pooled * 1000:.2f}ms")
+    print(f"Pool: {stats.opened} opened, {stats.reused} reused, {stats.stale} stale")
+
+    # This is informational, not a hard assertion
+    assert pooled > 0
@@ -13,3 +13,70 @@ def setup_django():
 
     _setup_django()
     yield
+
+
+@pytest.fixture(autouse=True)
+def clear_search_results():
+    """Start every test with an empty search result cache.
+
+    :yields: None.
+    """
+    from hipeac_mcp.cache import search_results
+
+    search_results.clear()
+    yield
+
+
+@pytest.fixture
+def directory_rows():
+    """Small member directory as raw database rows.
+
+    :returns: A DirectoryRows instance.
+    """
+    from hipeac_mcp.directory import DirectoryRows
+
+    return DirectoryRows(
+        users=[
+            (1, "jsmith", "jane@example.com", "Jane", "Smith"),
+            (2, "hmuller", "hans@example.com", "Hans", "Müller"),
+            (3, "agarcia", "ana@example.com", "Ana", "García"),
+            (4, "former", "former@example.com", "Former", "Member"),
+        ],
+        memberships=[(1, "member"), (2, "associated_member"), (3, "affiliated_phd")],
+        institutions=[(10, "Ghent University", "BE", 100), (11, "BSC", "ES", 101)],
+        user_institutions=[(1, 10), (2, 10), (3, 11)],
+        user_topics=[(1, 42), (2, 42), (3, 43)],
+        user_application_areas=[(1, 7), (3, 7)],
+        metadata=[
+            (42, "topic", "Compilers"),
+            (43, "topic", "Computer architecture"),
+            (7, "application_area ", "Healthcare"),
+            (100, "institution_type", "University"),
+            (101, "institution_type", "Research center"),
+        ],
+        advisors=[(3, 1)],
+    )
+
+
+@pytest.fixture
+def directory_snapshot(directory_rows):
+    """Snapshot built from the ``directory_rows`` fixture.
+
+    :returns: A DirectorySnapshot instance.
+    """
+    from hipeac_mcp.directory import build_snapshot
+
+    return build_snapshot(directory_rows)
+
+
+@pytest.fixture
+def aggregated_snapshot(directory_snapshot):
+    """Snapshot of the ``directory_snapshot`` fixture with its aggregates already built.
+
+    :returns: A DirectorySnapshot instance.
+    """
+    directory_snapshot.institution_aggregates  # noqa: B018
+    directory_snapshot.similarity_index  # noqa: B018
+    directory_snapshot.collaboration_graph  # noqa: B018
+    directory_snapshot.ordinals_by_username  # noqa: B018
+    return directory_snapshot
@@ -0,0 +1,63 @@
+"""Tests for integer-backed ordinal bitsets."""
+
+import random
+
+import pytest
+
+
+class TestBitsets:
+    """Tests for the bitsets helpers."""
+
+    @pytest.mark.parametrize(
+        "ordinals",
+        [
+            [],
+            [0],
+            [3, 7, 8, 64, 1000],
+            list(range(0, 5000, 3)),
+            sorted(random.Random(7).sample(range(100_000), 50)),
+        ],
+    )
+    def test_round_trip(self, ordinals):
+        """Test ordinals survive a round trip through a bitset, in ascending order."""
+        from hipeac_mcp.directory import bitsets
+
+        bits = bitsets.from_ordinals(ordinals)
+
+        assert list(bitsets.iter_ordinals(bits)) == ordinals
+        assert bits.bit_count() == len(ordinals)
+
+    def test_from_ordinals_ignores_order_and_duplicates(self):
+        """Test unsorted input with duplicates gives the same bitset."""
+        from hipeac_mcp.directory import bitsets
+
+        assert bitsets.from_ordinals([9, 2, 9, 5]) == 0b1000100100
+
+    def test_union(self):
+        """Test union ORs every bitset and handles no input."""
+        from hipeac_mcp.directory import bitsets
+
+        assert bitsets.union([0b0011, 0b0110, 0b1000]) == 0b1111
+        assert bitsets.union([]) == 0
+
+
+class TestRemap:
+    """Tests for moving runs of ordinals."""
+
+    @pytest.mark.parametrize(
+        ("runs", "expected"),
+        [
+            ([(0, 10, 0)], [1, 4, 5, 9]),
+            ([(0, 4, 0), (5, 5, 4)], [1, 4, 8]),
+            ([(0, 4, 0), (4, 6, 5)], [1, 5, 6, 10]),
+            ([(0, 2, 3), (2, 8, 10)], [4, 12, 13, 17]),
+            ([], []),
+        ],
+    )
+    def test_runs_are_moved_and_gaps_dropped(self, runs, expected):
+        """Test each run is shifted to its new start and ordinals outside runs disappear."""
+        from hipeac_mcp.directory import bitsets
+
+        bits = bitsets.from_ordinals([1, 4, 5, 9])
+
+        assert list(bitsets.iter_ordinals(bitsets.remap(bits, runs))) == expected
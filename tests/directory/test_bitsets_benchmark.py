@@ -0,0 +1,95 @@
+"""Benchmark for bitset-backed facet intersection against Python sets."""
+
+import random
+import time
+
+import pytest
+
+
+MEMBER_COUNT = 20_000
+RUNS = 50
+
+
+def synthetic_rows(member_count: int, seed: int = 42):
+    """Generate a random directory with realistic facet cardinalities."""
+    from hipeac_mcp.directory import DirectoryRows
+
+    rng = random.Random(seed)
+    countries = [f"C{i:02d}" for i in range(40)]
+    rows = DirectoryRows(
+        metadata=[(id, "topic", f"Topic {id}") for id in range(1, 101)]
+        + [(id, "application_area", f"Area {id}") for id in range(101, 131)]
+        + [(id, "institution_type", f"Type {id}") for id in range(131, 137)],
+        institutions=[(id, f"Institution {id}", rng.choice(countries), rng.randint(131, 136)) for id in range(2000)],
+    )
+
+    for user_id in range(member_count):
+        rows.users.append((user_id, f"user{user_id}", f"user{user_id}@example.com", "First", f"Last{user_id}"))
+        rows.memberships.append((user_id, rng.choice(["member", "associated_member", "affiliated_member"])))
+        rows.user_institutions.append((user_id, rng.randrange(2000)))
+        rows.user_topics.extend((user_id, topic_id) for topic_id in rng.sample(range(1, 101), rng.randint(2, 8)))
+        rows.user_application_areas.extend((user_id, area_id) for area_id in rng.sample(range(101, 131), 2))
+
+    return rows
+
+
+def set_based_filter(set_index, filters):
+    """Reference implementation intersecting per-value ordinal sets."""
+    matches = None
+    for facet, values in filters.items():
+        facet_matches = set().union(*(set_index[facet].get(value, set()) for value in values))
+        matches = facet_matches if matches is None else matches & facet_matches
+    return sorted(matches or ())
+
+
+def timed(function, runs=RUNS):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return sum(times) / len(times)
+
+
+@pytest.fixture(scope="module")
+def snapshots():
+    from hipeac_mcp.directory import bitsets, build_snapshot
+
+    snapshot = build_snapshot(synthetic_rows(MEMBER_COUNT))
+    set_index = {
+        facet: {value: set(bitsets.iter_ordinals(bits)) for value, bits in values.items()}
+        for facet, values in snapshot._index.items()
+    }
+    return snapshot, set_index
+
+
+@pytest.mark.parametrize("facet_count", [1, 3, 5])
+def test_benchmark_facet_intersection(snapshots, facet_count):
+    """Compare bitset and set intersection for 1, 3 and 5 facets."""
+    from hipeac_mcp.directory import Facet, bitsets
+
+    snapshot, set_index = snapshots
+    filters = dict(
+        list(
+            {
+                Facet.TOPIC: [1, 2, 3],
+                Facet.MEMBERSHIP_TYPE: ["member", "associated_member"],
+                Facet.APPLICATION_AREA: [101, 102, 103, 104],
+                Facet.INSTITUTION_TYPE: [131, 132, 133],
+                Facet.COUNTRY: ["C00", "C01", "C02", "C03", "C04", "C05"],
+            }.items()
+        )[:facet_count]
+    )
+
+    expected = set_based_filter(set_index, filters)
+    assert list(bitsets.iter_ordinals(snapshot.filter(filters))) == expected
+
+    set_time = timed(lambda: set_based_filter(set_index, filters))
+    bitset_time = timed(lambda: list(bitsets.iter_ordinals(snapshot.filter(filters))))
+
+    print(f"\n\nFacet intersection, {facet_count} facet(s), {MEMBER_COUNT} members, {len(expected)} matches:")
+    print(f"Sets:    {set_time * 1000:.3f}ms")
+    print(f"Bitsets: {bitset_time * 1000:.3f}ms")
+
+    # This is informational, not a hard assertion
+    assert bitset_time > 0
@@ -0,0 +1,160 @@
+"""Tests for the background snapshot engine."""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+from django.test import override_settings
+
+
+class TestSnapshotEngine:
+    """Tests for SnapshotEngine."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_swaps_snapshot(self, directory_snapshot):
+        """Test a refresh replaces the current snapshot."""
+        from hipeac_mcp.directory import SnapshotEngine
+
+        engine = SnapshotEngine(lambda: directory_snapshot, refresh_interval=60)
+        assert engine.snapshot is None
+
+        snapshot = await engine.refresh()
+
+        assert snapshot is directory_snapshot
+        assert engine.snapshot is directory_snapshot
+
+    @pytest.mark.asyncio
+    async def test_refresh_leaves_aggregates_unbuilt(self, directory_snapshot):
+        """Test a refresh serves the new snapshot without building aggregates nobody asked for."""
+        from hipeac_mcp.directory import SnapshotEngine
+
+        engine = SnapshotEngine(lambda: directory_snapshot, refresh_interval=60)
+
+        await engine.refresh()
+
+        assert "institution_aggregates" not in vars(directory_snapshot)
+        assert "similarity_index" not in vars(directory_snapshot)
+        assert "collaboration_graph" not in vars(directory_snapshot)
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_previous_snapshot(self, directory_snapshot):
+        """Test a failing rebuild does not drop the snapshot being served."""
+        from hipeac_mcp.directory import SnapshotEngine
+
+        loader = Mock(side_effect=[directory_snapshot, RuntimeError("database is gone")])
+        engine = SnapshotEngine(loader, refresh_interval=0)
+
+        engine.start()
+        while loader.call_count < 2:
+            await asyncio.sleep(0.01)
+        await engine.stop()
+
+        assert engine.snapshot is directory_snapshot
+
+    @pytest.mark.asyncio
+    async def test_start_is_idempotent(self, directory_snapshot):
+        """Test starting twice keeps a single refresh loop."""
+        from hipeac_mcp.directory import SnapshotEngine
+
+        engine = SnapshotEngine(lambda: directory_snapshot, refresh_interval=60)
+
+        engine.start()
+        task = engine._task
+        engine.start()
+
+        assert engine._task is task
+        await engine.stop()
+
+
+class TestAggregatesReady:
+    """Tests for building snapshot aggregates in the background."""
+
+    @pytest.mark.asyncio
+    async def test_built_in_background_once(self, directory_snapshot):
+        """Test an aggregate is built once in the background, and reported ready when built."""
+        from hipeac_mcp.directory import SimilarityIndex, aggregates_ready
+
+        with patch("hipeac_mcp.directory.snapshot.SimilarityIndex", wraps=SimilarityIndex) as mock_index:
+            first = await aggregates_ready(directory_snapshot, "similarity_index")
+            waited = await asyncio.gather(
+                aggregates_ready(directory_snapshot, "similarity_index", wait=True),
+                aggregates_ready(directory_snapshot, "similarity_index", wait=True),
+            )
+            last = await aggregates_ready(directory_snapshot, "similarity_index")
+
+        assert (first, waited, last) == (False, [True, True], True)
+        assert "similarity_index" in vars(directory_snapshot)
+        mock_index.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_build_is_retried(self, directory_snapshot):
+        """Test a failed build raises for callers waiting on it, and is started again on the next call."""
+        from hipeac_mcp.directory import SimilarityIndex, aggregates_ready
+
+        with patch(
+            "hipeac_mcp.directory.snapshot.SimilarityIndex", side_effect=[RuntimeError("boom"), SimilarityIndex([])]
+        ):
+            with pytest.raises(RuntimeError, match="boom"):
+                await aggregates_ready(directory_snapshot, "similarity_index", wait=True)
+            assert await aggregates_ready(directory_snapshot, "similarity_index", wait=True)
+
+    @pytest.mark.asyncio
+    async def test_pinned_snapshot_is_waited_for(self, directory_snapshot):
+        """Test aggregates of a pinned snapshot are waited for, there being no database to fall back to."""
+        from hipeac_mcp.directory import aggregates_ready, engine
+
+        try:
+            engine.pin(directory_snapshot)
+            assert await aggregates_ready(directory_snapshot, "institution_aggregates", "collaboration_graph")
+        finally:
+            engine.pin(None)
+
+        assert "collaboration_graph" in vars(directory_snapshot)
+
+
+class TestGetSnapshot:
+    """Tests for get_snapshot."""
+
+    @pytest.mark.asyncio
+    async def test_disabled_returns_none(self):
+        """Test nothing is started when the engine is disabled."""
+        from hipeac_mcp.directory import engine, get_snapshot
+
+        with override_settings(MEMBER_SNAPSHOT_ENABLED=False), patch.object(engine, "start") as mock_start:
+            assert get_snapshot() is None
+
+        mock_start.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_enabled_starts_engine(self, directory_snapshot):
+        """Test the engine is started and its snapshot returned when enabled."""
+        from hipeac_mcp.directory import engine, get_snapshot
+
+        with (
+            override_settings(MEMBER_SNAPSHOT_ENABLED=True),
+            patch.object(engine, "start") as mock_start,
+            patch.object(engine, "_snapshot", directory_snapshot),
+        ):
+            assert get_snapshot() is directory_snapshot
+
+        mock_start.assert_called_once()
+
+
+class TestPinnedSnapshot:
+    """Tests for serving a fixed snapshot."""
+
+    @pytest.mark.asyncio
+    async def test_pinned_snapshot_is_served_without_refresh(self, directory_snapshot):
+        """Test a pinned snapshot is returned even when the engine is disabled, and never rebuilt."""
+        from hipeac_mcp.directory import engine, get_snapshot
+
+        try:
+            engine.pin(directory_snapshot)
+            with override_settings(MEMBER_SNAPSHOT_ENABLED=False):
+                assert get_snapshot() is directory_snapshot
+            assert engine._task is None
+        finally:
+            engine.pin(None)
+
+        assert not engine.pinned
+        assert engine.snapshot is None
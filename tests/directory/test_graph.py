@@ -0,0 +1,112 @@
+"""Tests for the collaboration graph."""
+
+import pytest
+
+
+@pytest.fixture
+def graph():
+    """Two institutions sharing member 2, a separate one, and advisor links 0 -> 5 and 6 -> 0.
+
+    :returns: A CollaborationGraph instance.
+    """
+    from hipeac_mcp.directory import CollaborationGraph
+
+    return CollaborationGraph(
+        [(10,), (10,), (10, 11, 11), (11,), (12,), (12,), (), ()],
+        [5, None, None, None, None, None, 0, 7],
+    )
+
+
+class TestCollaborationGraph:
+    """Tests for CollaborationGraph."""
+
+    def test_adjacency(self, graph):
+        """Test institutions, members and advisor links are held both ways, without duplicates or self links."""
+        assert list(graph.institutions_of(2)) == [10, 11]
+        assert list(graph.members_of(11)) == [2, 3]
+        assert list(graph.members_of(99)) == []
+        assert (graph.advisor_of(0), graph.advisor_of(1), graph.advisor_of(7)) == (5, None, None)
+        assert list(graph.advisees_of(5)) == [0]
+
+    def test_neighbors(self, graph):
+        """Test neighbors come with every link to them, advisor links first."""
+        from hipeac_mcp.directory import LinkKind
+
+        assert graph.neighbors(0) == {
+            5: [(LinkKind.ADVISOR, None)],
+            6: [(LinkKind.ADVISEE, None)],
+            1: [(LinkKind.INSTITUTION, 10)],
+            2: [(LinkKind.INSTITUTION, 10)],
+        }
+        assert graph.neighbors(7) == {}
+
+    def test_shortest_path(self, graph):
+        """Test the path follows the fewest links, each step recording how it was reached."""
+        from hipeac_mcp.directory import LinkKind, PathStep
+
+        search = graph.shortest_path(3, 4, max_depth=6, max_nodes=100)
+
+        assert search.path == [
+            PathStep(3),
+            PathStep(2, LinkKind.INSTITUTION, 11),
+            PathStep(0, LinkKind.INSTITUTION, 10),
+            PathStep(5, LinkKind.ADVISOR),
+            PathStep(4, LinkKind.INSTITUTION, 12),
+        ]
+        assert not search.exhausted
+
+    def test_same_member(self, graph):
+        """Test a member is connected to itself by an empty path."""
+        from hipeac_mcp.directory import PathStep
+
+        assert graph.shortest_path(3, 3, max_depth=0, max_nodes=1).path == [PathStep(3)]
+
+    @pytest.mark.parametrize("source, target, max_depth", [(3, 4, 3), (0, 7, 6)])
+    def test_no_path_within_depth(self, graph, source, target, max_depth):
+        """Test the search stops at its maximum depth, or when nothing is left to explore."""
+        search = graph.shortest_path(source, target, max_depth=max_depth, max_nodes=100)
+
+        assert search.path is None
+        assert not search.exhausted
+
+    def test_node_budget(self, graph):
+        """Test the search gives up once it has reached its node budget."""
+        search = graph.shortest_path(3, 4, max_depth=6, max_nodes=4)
+
+        assert search.path is None
+        assert search.exhausted
+        assert search.explored == 4
+
+    def test_connectivity(self, graph):
+        """Test components, advisor links and other institutions of a group of members."""
+        connectivity = graph.connectivity([0, 1, 3, 5, 6], {10, 11})
+
+        assert (connectivity.members, connectivity.components, connectivity.largest_component) == (5, 2, 4)
+        assert (connectivity.advisor_links, connectivity.external_advisor_links) == (2, 0)
+        assert connectivity.linked_institutions == {12}
+
+    def test_connectivity_of_institution(self, graph):
+        """Test the members of one institution form a single component, with links outside."""
+        connectivity = graph.connectivity(graph.members_of(10), {10})
+
+        assert (connectivity.members, connectivity.components, connectivity.largest_component) == (3, 1, 3)
+        assert (connectivity.advisor_links, connectivity.external_advisor_links) == (0, 2)
+        assert connectivity.linked_institutions == {11}
+
+
+class TestSnapshotGraph:
+    """Tests for the collaboration graph of a snapshot."""
+
+    def test_advisors_are_linked_by_ordinal(self, directory_rows):
+        """Test advisor ids are mapped to ordinals, leaving out advisors who are not active members."""
+        from hipeac_mcp.directory import build_snapshot
+
+        directory_rows.advisors.append((2, 4))
+        snapshot = build_snapshot(directory_rows)
+        graph = snapshot.collaboration_graph
+        ordinals = {member.username: ordinal for ordinal, member in enumerate(snapshot.members)}
+
+        assert graph.advisor_of(ordinals["agarcia"]) == ordinals["jsmith"]
+        assert graph.advisor_of(ordinals["hmuller"]) is None
+        assert list(graph.members_of(10)) == sorted([ordinals["jsmith"], ordinals["hmuller"]])
+        assert snapshot.collaboration_graph is graph
@@ -0,0 +1,221 @@
+"""Tests for the incremental snapshot refresh."""
+
+import zlib
+from collections import defaultdict
+from unittest.mock import patch
+
+import pytest
+
+
+class FakeDatabase:
+    """Directory tables held as rows by id, read through the refresh module helpers."""
+
+    def __init__(self, rows):
+        self.tables = {
+            "users": {row[0]: row for row in rows.users if any(user_id == row[0] for user_id, _ in rows.memberships)},
+            "memberships": dict(enumerate(rows.memberships, start=1)),
+            "institutions": {row[0]: row for row in rows.institutions},
+            "user_institutions": dict(enumerate(rows.user_institutions, start=1)),
+            "user_topics": dict(enumerate(rows.user_topics, start=1)),
+            "user_application_areas": dict(enumerate(rows.user_application_areas, start=1)),
+            "metadata": {row[0]: row for row in rows.metadata},
+            "advisors": dict(enumerate(rows.advisors, start=1)),
+        }
+        self.reads = []
+
+    def rows(self):
+        from hipeac_mcp.directory import DirectoryRows
+
+        return DirectoryRows(**{name: [table[id] for id in sorted(table)] for name, table in self.tables.items()})
+
+    def querysets(self, user_ct_id):
+        return {name: FakeQuerySet(self, name) for name in self.tables}
+
+    def checksums(self, queryset, fields):
+        from hipeac_mcp.directory import refresh
+
+        checksums = defaultdict(lambda: (0, 0))
+        for id, row in self.tables[queryset.name].items():
+            count, checksum = checksums[id // refresh.BUCKET_SIZE]
+            checksums[id // refresh.BUCKET_SIZE] = (count + 1, checksum + zlib.crc32(repr(row).encode()))
+        return dict(checksums)
+
+    def table(self, queryset, fields):
+        self.reads.append((queryset.name, None))
+        return dict(sorted(self.tables[queryset.name].items()))
+
+    def buckets(self, queryset, fields, buckets):
+        from hipeac_mcp.directory import refresh
+
+        self.reads.append((queryset.name, sorted(buckets)))
+        table = self.tables[queryset.name]
+        return {id: table[id] for id in sorted(table) if id // refresh.BUCKET_SIZE in buckets}
+
+
+class FakeQuerySet:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+
+    def values_list(self, *fields):
+        self.database.reads.append((self.name, None))
+        table = self.database.tables[self.name]
+        return [table[id] for id in sorted(table)]
+
+
+@pytest.fixture
+def database(directory_rows):
+    """Patch the table reads of the refresh module with a fake database in buckets of 2 ids.
+
+    :yields: The FakeDatabase instance.
+    """
+    database = FakeDatabase(directory_rows)
+    with (
+        patch("hipeac_mcp.directory.refresh.BUCKET_SIZE", 2),
+        patch("hipeac_mcp.directory.refresh.content_types"),
+        patch("hipeac_mcp.directory.refresh.connection"),
+        patch("hipeac_mcp.directory.refresh.directory_querysets", database.querysets),
+        patch("hipeac_mcp.directory.refresh.fetch_checksums", database.checksums),
+        patch("hipeac_mcp.directory.refresh.fetch_table", database.table),
+        patch("hipeac_mcp.directory.refresh.fetch_buckets", database.buckets),
+    ):
+        yield database
+
+
+class TestDirectoryRefresher:
+    """Tests for DirectoryRefresher."""
+
+    def refresh(self, refresher, database):
+        from hipeac_mcp.directory import build_snapshot
+
+        from .test_snapshot import assert_same_snapshot
+
+        database.reads.clear()
+        snapshot = refresher()
+        assert_same_snapshot(snapshot, build_snapshot(database.rows()))
+        return snapshot
+
+    def test_first_call_reads_everything(self, database):
+        """Test the first refresh is a full build."""
+        from hipeac_mcp.directory import DirectoryRefresher
+
+        refresher = DirectoryRefresher(full_rebuild_interval=3600)
+
+        self.refresh(refresher, database)
+
+        assert len(database.reads) == 8
+        assert refresher.stats.full == 1
+
+    def test_unchanged_tables_are_not_read(self, database):
+        """Test nothing but checksums is read when nothing changed, and the snapshot is kept."""
+        from hipeac_mcp.directory import DirectoryRefresher
+
+        refresher = DirectoryRefresher(full_rebuild_interval=3600)
+        first = self.refresh(refresher, database)
+
+        second = self.refresh(refresher, database)
+
+        assert second is first
+        assert database.reads == []
+        assert refresher.stats.unchanged == 1
+
+    def test_renamed_user_is_patched(self, database):
+        """Test an edited user only causes its bucket to be read again."""
+        from hipeac_mcp.directory import DirectoryRefresher
+
+        refresher = DirectoryRefresher(full_rebuild_interval=3600)
+        first = self.refresh(refresher, database)
+        database.tables["users"][3] = (3, "agarcia", "ana@example.com", "Ana", "Zapata")
+
+        second = self.refresh(refresher, database)
+
+        assert second is not first
+        assert database.reads == [("users", [1])]
+        assert (refresher.stats.incremental, refresher.stats.changed_members) == (1, 1)
+
+    def test_ended_membership_removes_member(self, database):
+        """Test a membership leaving the active set removes its member."""
+        from hipeac_mcp.directory import DirectoryRefresher
+
+        refresher = DirectoryRefresher(full_rebuild_interval=3600)
+        self.refresh(refresher, database)
+        del database.tables["memberships"][2]
+        del database.tables["users"][2]
+
+        snapshot = self.refresh(refresher, database)
+
+        assert [member.username for member in snapshot.members] == ["agarcia", "jsmith"]
+        assert refresher.stats.full == 1
+
+    def test_new_member_and_relations_are_added(self, database):
+        """Test rows past the previous high-water marks are picked up."""
+        from hipeac_mcp.directory import DirectoryRefresher
+
+        refresher = DirectoryRefresher(full_rebuild_interval=3600)
+        self.refresh(refresher, database)
+        database.tables["users"][4] = (4, "former", "former@example.com", "Former", "Member")
+        database.tables["memberships"][4] = (4, "member")
+        database.tables["user_topics"][4] = (4, 43)
+        database.tables["user_topics"][5] = (1, 43)
+
+        snapshot = self.refresh(refresher, database)
+
+        assert len(snapshot) == 4
+        assert refresher.stats.changed_members == 2
+
+    def test_changed_advisor_is_patched(self, database):
+        """Test a new advisor only causes the advised member to be rebuilt."""
+        from hipeac_mcp.directory import DirectoryRefresher
+
+        refresher = DirectoryRefresher(full_rebuild_interval=3600)
+        self.refresh(refresher, database)
+        database.tables["advisors"][2] = (2, 1)
+
+        snapshot = self.refresh(refresher, database)
+
+        assert database.reads == [("advisors", [1])]
+        assert [member.advisor_id for member in snapshot.members] == [1, 1, None]
+        assert refresher.stats.changed_members == 1
+
+    def test_changed_institution_rebuilds_everything(self, database):
+        """Test a change to a table shared by many members triggers a full rebuild."""
+        from hipeac_mcp.directory import DirectoryRefresher
+
+        refresher = DirectoryRefresher(full_rebuild_interval=3600)
+        self.refresh(refresher, database)
+        database.tables["institutions"][11] = (11, "BSC", "FR", 101)
+
+        self.refresh(refresher, database)
+
+        assert refresher.stats.full == 2
+        assert len(database.reads) == 8
+
+    def test_full_rebuild_interval(self, database):
+        """Test every refresh reads everything once the full rebuild interval has elapsed."""
+        from hipeac_mcp.directory import DirectoryRefresher
+
+        refresher = DirectoryRefresher(full_rebuild_interval=0)
+        self.refresh(refresher, database)
+
+        self.refresh(refresher, database)
+
+        assert refresher.stats.full == 2
+
+
+class TestTableState:
+    """Tests for TableState."""
+
+    def test_update_reports_users_of_changed_rows(self):
+        """Test users of added, removed and edited rows are reported, and their rows replaced."""
+        from hipeac_mcp.directory.refresh import TableState
+
+        with patch("hipeac_mcp.directory.refresh.BUCKET_SIZE", 2):
+            table = TableState(0, {0: (1, 1), 1: (2, 2)}, {1: (10, 42), 2: (11, 42), 3: (12, 43)})
+
+            users = table.update({1: (2, 3), 2: (1, 4)}, {1, 2}, {2: (11, 42), 3: (12, 44), 4: (13, 42)})
+
+            assert users == {12, 13}
+            assert table.rows_of(12) == [(12, 44)]
+            assert table.rows_of(13) == [(13, 42)]
+            assert table.rows_of(10) == [(10, 42)]
+            assert table.changed_buckets({1: (2, 3), 2: (1, 4)}) == set()
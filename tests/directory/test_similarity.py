@@ -0,0 +1,90 @@
+"""Tests for member similarity scoring."""
+
+import math
+import random
+
+import pytest
+
+
+def cosine(features, ordinal, other):
+    """Reference TF-IDF cosine computed from dense vectors."""
+    vocabulary = sorted(set().union(*features))
+    frequencies = {feature: sum(feature in member for member in features) for feature in vocabulary}
+
+    def vector(member):
+        return [
+            math.log((1 + len(features)) / (1 + frequencies[feature])) + 1 if feature in member else 0.0
+            for feature in vocabulary
+        ]
+
+    a, b = vector(features[ordinal]), vector(features[other])
+    return sum(x * y for x, y in zip(a, b, strict=True)) / math.sqrt(sum(x * x for x in a) * sum(y * y for y in b))
+
+
+class TestSimilarityIndex:
+    """Tests for SimilarityIndex."""
+
+    def test_rare_features_weigh_more(self):
+        """Test sharing a rare feature scores higher than sharing a popular one."""
+        from hipeac_mcp.directory import SimilarityIndex
+
+        index = SimilarityIndex([(1, 2), (1, 3), (2, 4), (1, 5), (1, 6)])
+
+        assert [ordinal for _, ordinal in index.similar(0, 10)] == [2, 1, 3, 4]
+
+    def test_member_itself_and_unrelated_members_are_left_out(self):
+        """Test only other members sharing a feature are returned, ties by ordinal."""
+        from hipeac_mcp.directory import SimilarityIndex
+
+        index = SimilarityIndex([(1,), (2,), (1, 1), (), (1,)])
+
+        assert index.similar(0, 10) == [(pytest.approx(1.0), 2), (pytest.approx(1.0), 4)]
+        assert index.similar(3, 10) == []
+
+    def test_limit(self):
+        """Test at most ``limit`` members are returned, the best ones."""
+        from hipeac_mcp.directory import SimilarityIndex
+
+        index = SimilarityIndex([(1, 2), (1,), (1, 2), (2,)])
+
+        assert [ordinal for _, ordinal in index.similar(0, 1)] == [2]
+
+    def test_matches_dense_cosine(self):
+        """Test scores and ranking match a dense TF-IDF cosine on random members."""
+        from hipeac_mcp.directory import SimilarityIndex
+
+        rng = random.Random(7)
+        features = [set(rng.sample(range(20), rng.randint(1, 5))) for _ in range(60)]
+        index = SimilarityIndex(features)
+
+        for ordinal in range(0, 60, 7):
+            expected = sorted(
+                (-score, other)
+                for other in range(60)
+                if other != ordinal and features[other] & features[ordinal]
+                for score in [cosine(features, ordinal, other)]
+            )[:10]
+            found = index.similar(ordinal, 10)
+            assert [other for _, other in found] == [other for _, other in expected]
+            assert [score for score, _ in found] == pytest.approx([-score for score, _ in expected])
+
+    def test_external_frequencies(self):
+        """Test a subset of the directory scores like the whole directory when given its frequencies."""
+        from hipeac_mcp.directory import SimilarityIndex
+
+        directory = [(1, 2), (1, 3), (3,), (4,), (4, 5)]
+        whole = SimilarityIndex(directory)
+        subset = SimilarityIndex(directory[:3], {1: 2, 2: 1, 3: 2, 4: 2, 5: 1}, len(directory))
+
+        assert subset.similar(0, 10) == whole.similar(0, 10)
+
+    def test_snapshot_index_follows_ordinals(self, directory_snapshot):
+        """Test the snapshot index holds the topics and application areas of each member ordinal."""
+        index = directory_snapshot.similarity_index
+
+        assert [tuple(index.features_of(ordinal)) for ordinal in range(len(index))] == [
+            (7, 43),
+            (42,),
+            (7, 42),
+        ]
+        assert directory_snapshot.similarity_index is index
@@ -0,0 +1,332 @@
+"""Tests for the in-memory directory snapshot."""
+
+import pytest
+
+
+class TestBuildSnapshot:
+    """Tests for building a snapshot from raw rows."""
+
+    def test_only_active_members_are_kept(self, directory_snapshot):
+        """Test users without an active membership are left out."""
+        usernames = {member.username for member in directory_snapshot.members}
+
+        assert usernames == {"jsmith", "hmuller", "agarcia"}
+
+    def test_members_are_ordered_by_last_name_and_id(self, directory_snapshot):
+        """Test ordinals follow the (last_name, id) ordering."""
+        last_names = [member.last_name for member in directory_snapshot.members]
+
+        assert last_names == ["García", "Müller", "Smith"]
+
+    def test_member_links(self, directory_snapshot):
+        """Test relation rows are grouped per member."""
+        jane = next(member for member in directory_snapshot.members if member.username == "jsmith")
+
+        assert jane.membership_type == "member"
+        assert jane.institution_ids == (10,)
+        assert jane.topic_ids == (42,)
+        assert jane.application_area_ids == (7,)
+
+    def test_advisor_of_first_advised_membership(self, directory_rows):
+        """Test members keep the advisor of their first membership having one, if any."""
+        from hipeac_mcp.directory import build_snapshot
+
+        directory_rows.advisors.append((3, 2))
+        snapshot = build_snapshot(directory_rows)
+
+        assert {member.username: member.advisor_id for member in snapshot.members} == {
+            "agarcia": 1,
+            "hmuller": None,
+            "jsmith": None,
+        }
+
+    def test_metadata_type_is_stripped(self, directory_snapshot):
+        """Test metadata types are normalized like the database cache does."""
+        assert directory_snapshot.metadata[7].type == "application_area"
+
+    def test_first_active_membership_wins(self, directory_rows):
+        """Test a user with several active memberships gets the first one."""
+        from hipeac_mcp.directory import build_snapshot
+
+        directory_rows.memberships.append((1, "affiliated_member"))
+
+        snapshot = build_snapshot(directory_rows)
+
+        jane = next(member for member in snapshot.members if member.username == "jsmith")
+        assert jane.membership_type == "member"
+
+
+class TestSnapshotFilter:
+    """Tests for facet filtering on a snapshot."""
+
+    def usernames(self, snapshot, bits):
+        from hipeac_mcp.directory import bitsets
+
+        return [snapshot.members[ordinal].username for ordinal in bitsets.iter_ordinals(bits)]
+
+    def test_no_filters_returns_everyone(self, directory_snapshot):
+        """Test an empty filter set matches all members in order."""
+        from hipeac_mcp.directory import Facet
+
+        bits = directory_snapshot.filter({Facet.TOPIC: []})
+
+        assert self.usernames(directory_snapshot, bits) == ["agarcia", "hmuller", "jsmith"]
+
+    @pytest.mark.parametrize(
+        ("facet", "values", "expected"),
+        [
+            ("topic", [42], ["hmuller", "jsmith"]),
+            ("topic", [42, 43], ["agarcia", "hmuller", "jsmith"]),
+            ("application_area", [7], ["agarcia", "jsmith"]),
+            ("country", ["ES"], ["agarcia"]),
+            ("institution_type", [100], ["hmuller", "jsmith"]),
+            ("membership_type", ["associated_member"], ["hmuller"]),
+            ("topic", [999], []),
+        ],
+    )
+    def test_single_facet(self, directory_snapshot, facet, values, expected):
+        """Test values inside one facet are combined with OR."""
+        from hipeac_mcp.directory import Facet
+
+        bits = directory_snapshot.filter({Facet(facet): values})
+
+        assert self.usernames(directory_snapshot, bits) == expected
+
+    def test_facets_are_combined_with_and(self, directory_snapshot):
+        """Test several facets must all match."""
+        from hipeac_mcp.directory import Facet
+
+        bits = directory_snapshot.filter({Facet.TOPIC: [42], Facet.APPLICATION_AREA: [7]})
+
+        assert self.usernames(directory_snapshot, bits) == ["jsmith"]
+
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            ("jane", ["jsmith"]),
+            ("SMITH", ["jsmith"]),
+            ("muller", ["hmuller"]),
+            ("example.com", ["agarcia", "hmuller", "jsmith"]),
+            (None, ["agarcia", "hmuller", "jsmith"]),
+        ],
+    )
+    def test_search_text(self, directory_snapshot, query, expected):
+        """Test text search covers names, username and email."""
+        ordinals = directory_snapshot.search(query, {}).ordinals
+
+        assert [directory_snapshot.members[ordinal].username for ordinal in ordinals] == expected
+
+    def test_search_text_and_facets(self, directory_snapshot):
+        """Test text matches are restricted by the facet filters."""
+        from hipeac_mcp.directory import Facet
+
+        ordinals = directory_snapshot.search("example", {Facet.COUNTRY: ["BE"]}).ordinals
+
+        assert [directory_snapshot.members[ordinal].username for ordinal in ordinals] == ["hmuller", "jsmith"]
+
+    @pytest.mark.parametrize(
+        ("query", "filters", "expected"),
+        [
+            (None, {}, ["agarcia", "hmuller", "jsmith"]),
+            ("example", {"country": ["BE"]}, ["hmuller", "jsmith"]),
+            ("jane", {"country": ["ES"]}, []),
+            ("zzz", {}, []),
+        ],
+    )
+    def test_matching(self, directory_snapshot, query, filters, expected):
+        """Test every member matching the query and filters is returned, without a page limit."""
+        from hipeac_mcp.directory import Facet
+
+        bits = directory_snapshot.matching(query, {Facet(facet): values for facet, values in filters.items()})
+
+        assert self.usernames(directory_snapshot, bits) == expected
+
+    def test_find(self, directory_snapshot):
+        """Test usernames are looked up ignoring case, unknown and inactive ones giving None."""
+        ordinals = directory_snapshot.find(["JSmith", "former", "agarcia", "nobody"])
+
+        assert [directory_snapshot.members[o].username if o is not None else None for o in ordinals] == [
+            "jsmith",
+            None,
+            "agarcia",
+            None,
+        ]
+
+    def test_institution_aggregates(self, directory_rows):
+        """Test each institution with active members gets its member count and topic histogram."""
+        from hipeac_mcp.directory import build_snapshot
+
+        directory_rows.user_topics.append((2, 43))
+        directory_rows.user_institutions.append((4, 11))
+        snapshot = build_snapshot(directory_rows)
+
+        ghent, bsc = snapshot.institution_aggregates[10], snapshot.institution_aggregates[11]
+
+        assert sorted(snapshot.institution_aggregates) == [10, 11]
+        assert (ghent.member_count, ghent.topic_counts) == (2, ((42, 2), (43, 1)))
+        assert (bsc.member_count, bsc.topic_counts) == (1, ((43, 1),))
+
+    @pytest.mark.parametrize(
+        "query, countries, type_ids, expected",
+        [
+            (None, [], [], ["Ghent University", "BSC"]),
+            ("GHENT", [], [], ["Ghent University"]),
+            (None, ["ES"], [], ["BSC"]),
+            (None, [], [100], ["Ghent University"]),
+            ("ghent", ["ES"], [], []),
+        ],
+    )
+    def test_search_institutions(self, directory_snapshot, query, countries, type_ids, expected):
+        """Test institutions are filtered by name, country and type, largest first."""
+        found = directory_snapshot.search_institutions(query, countries, type_ids)
+
+        assert [aggregate.institution.name for aggregate in found] == expected
+
+    def test_facet_counts(self, directory_snapshot):
+        """Test members are counted once per facet value, and values without members are left out."""
+        from hipeac_mcp.directory import Facet
+
+        counts = directory_snapshot.facet_counts(directory_snapshot.filter({Facet.COUNTRY: ["BE"]}))
+
+        assert counts == {
+            Facet.TOPIC: {42: 2},
+            Facet.APPLICATION_AREA: {7: 1},
+            Facet.COUNTRY: {"BE": 2},
+            Facet.INSTITUTION_TYPE: {100: 2},
+            Facet.MEMBERSHIP_TYPE: {"member": 1, "associated_member": 1},
+        }
+
+
+class TestSnapshotPagination:
+    """Tests for totals and keyset pagination on a snapshot."""
+
+    def walk(self, snapshot, query, limit):
+        pages, after = [], None
+        while True:
+            page = snapshot.search(query, {}, after, limit)
+            pages.append([snapshot.members[ordinal].username for ordinal in page.ordinals])
+            if page.next_after is None:
+                return page.total, pages
+            after = page.next_after
+
+    @pytest.mark.parametrize("query", [None, "example"])
+    def test_pages_cover_all_results_once(self, directory_snapshot, query):
+        """Test following next_after visits every match exactly once, in order."""
+        total, pages = self.walk(directory_snapshot, query, limit=2)
+
+        assert total == 3
+        assert pages == [["agarcia", "hmuller"], ["jsmith"]]
+
+    def test_last_page_has_no_next(self, directory_snapshot):
+        """Test a page holding the remaining matches has no cursor."""
+        page = directory_snapshot.search(None, {}, limit=3)
+
+        assert page.total == 3
+        assert page.next_after is None
+
+    def test_cursor_survives_removed_member(self, directory_rows):
+        """Test a cursor pointing at a member gone from a newer snapshot resumes after it."""
+        from hipeac_mcp.directory import build_snapshot
+
+        first_page = build_snapshot(directory_rows).search(None, {}, limit=2)
+        directory_rows.memberships = [row for row in directory_rows.memberships if row[0] != 2]
+
+        second_page = build_snapshot(directory_rows).search(None, {}, first_page.next_after, limit=2)
+
+        assert first_page.next_after == (0, "Müller", 2)
+        assert second_page.total == 2
+        assert second_page.ordinals == [1]
+
+
+def assert_same_snapshot(snapshot, expected):
+    """Assert two snapshots hold the same members, indexes and documents."""
+    from hipeac_mcp.directory import Facet
+
+    assert list(snapshot.members) == list(expected.members)
+    assert list(snapshot.sort_keys) == list(expected.sort_keys)
+    assert list(snapshot.text_index.documents) == list(expected.text_index.documents)
+    for facet in Facet:
+        assert dict(snapshot._index[facet]) == dict(expected._index[facet])
+    assert {gram: list(ordinals) for gram, ordinals in snapshot.text_index.postings.items()} == {
+        gram: list(ordinals) for gram, ordinals in expected.text_index.postings.items()
+    }
+
+
+class TestSnapshotPatch:
+    """Tests for deriving a snapshot from another one and a few changed members."""
+
+    def changes(self, rows, user_ids):
+        from hipeac_mcp.directory import member_records
+
+        records = {record.id: record for record in member_records(rows)}
+        return {user_id: records.get(user_id) for user_id in user_ids}
+
+    @pytest.mark.parametrize(
+        ("change", "user_ids"),
+        [
+            (lambda rows: rows.users.__setitem__(0, (1, "jsmith", "jane@example.com", "Jane", "Aaron")), [1]),
+            (lambda rows: rows.users.__setitem__(0, (1, "jsmith", "jane@example.com", "Janet", "Smith")), [1]),
+            (lambda rows: rows.memberships.remove((2, "associated_member")), [2]),
+            (lambda rows: rows.memberships.append((4, "member")), [4]),
+            (lambda rows: rows.user_topics.append((3, 42)), [3]),
+            (lambda rows: rows.user_institutions.remove((3, 11)), [3]),
+            (
+                lambda rows: (rows.memberships.remove((1, "member")), rows.memberships.append((4, "affiliated_phd"))),
+                [1, 4],
+            ),
+        ],
+    )
+    def test_patch_matches_rebuild(self, directory_rows, directory_snapshot, change, user_ids):
+        """Test patching the changed members gives the same snapshot as rebuilding everything."""
+        from hipeac_mcp.directory import build_snapshot
+
+        change(directory_rows)
+
+        patched = directory_snapshot.patched(self.changes(directory_rows, user_ids))
+
+        assert_same_snapshot(patched, build_snapshot(directory_rows))
+        assert patched.built_at >= directory_snapshot.built_at
+
+    def test_patch_leaves_original_untouched(self, directory_rows, directory_snapshot):
+        """Test the patched snapshot shares nothing it modifies with the original one."""
+        from hipeac_mcp.directory import build_snapshot
+
+        original = build_snapshot(directory_rows)
+        directory_rows.memberships.append((4, "member"))
+        directory_rows.user_topics.append((4, 43))
+
+        directory_snapshot.patched(self.changes(directory_rows, [4]))
+
+        assert_same_snapshot(directory_snapshot, original)
+
+    def test_no_changes_returns_same_snapshot(self, directory_snapshot):
+        """Test an empty patch keeps the snapshot and its version."""
+        assert directory_snapshot.patched({}) is directory_snapshot
+
+    def test_random_changes_match_rebuild(self):
+        """Test patching many random additions, removals and updates of a larger directory."""
+        import random
+
+        from hipeac_mcp.directory import build_snapshot
+
+        from .test_bitsets_benchmark import synthetic_rows
+
+        rng = random.Random(3)
+        rows = synthetic_rows(500)
+        snapshot = build_snapshot(rows)
+
+        changed = set(rng.sample(range(500), 40))
+        rows.memberships = [row for row in rows.memberships if row[0] not in changed or row[0] % 3]
+        rows.users = [
+            (id, username, email, first_name, f"Renamed{id}" if id in changed and id % 3 == 1 else last_name)
+            for id, username, email, first_name, last_name in rows.users
+        ]
+        for user_id in range(500, 520):
+            rows.users.append((user_id, f"new{user_id}", f"new{user_id}@example.com", "New", f"Last{user_id - 480}"))
+            rows.memberships.append((user_id, "member"))
+            rows.user_topics.append((user_id, 1))
+            changed.add(user_id)
+
+        patched = snapshot.patched(self.changes(rows, changed))
+
+        assert_same_snapshot(patched, build_snapshot(rows))
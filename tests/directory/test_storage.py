@@ -0,0 +1,217 @@
+"""Tests for the shared binary snapshot files."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+
+@pytest.fixture
+def mapped_snapshot(directory_snapshot, tmp_path):
+    """The ``directory_snapshot`` fixture written to a file and mapped back.
+
+    :returns: A DirectorySnapshot instance reading from the file.
+    """
+    from hipeac_mcp.directory import open_snapshot, write_snapshot
+
+    path = tmp_path / "members.snapshot"
+    write_snapshot(directory_snapshot, path)
+    return open_snapshot(path)
+
+
+class TestSnapshotFile:
+    """Tests for writing and mapping snapshot files."""
+
+    def test_members_round_trip(self, directory_snapshot, mapped_snapshot):
+        """Test member records and their order survive the round trip."""
+        assert list(mapped_snapshot.members) == list(directory_snapshot.members)
+        assert mapped_snapshot.members[-1] == directory_snapshot.members[-1]
+        assert list(mapped_snapshot.sort_keys) == list(directory_snapshot.sort_keys)
+        assert mapped_snapshot.built_at == directory_snapshot.built_at
+
+    def test_lookup_tables_round_trip(self, directory_snapshot, mapped_snapshot):
+        """Test institutions and metadata are restored in their original order."""
+        assert mapped_snapshot.institutions == directory_snapshot.institutions
+        assert list(mapped_snapshot.metadata) == list(directory_snapshot.metadata)
+        assert mapped_snapshot.metadata[7].type == "application_area"
+
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            {},
+            {"topic": [42]},
+            {"country": ["ES", "BE"]},
+            {"institution_type": [100], "membership_type": ["member"]},
+            {"topic": [999]},
+        ],
+    )
+    def test_filters_match(self, directory_snapshot, mapped_snapshot, filters):
+        """Test facet filters give the same members on both snapshots."""
+        from hipeac_mcp.directory import Facet
+
+        filters = {Facet(facet): values for facet, values in filters.items()}
+
+        assert mapped_snapshot.filter(filters) == directory_snapshot.filter(filters)
+
+    @pytest.mark.parametrize("query", [None, "jane", "muller", "example.com", "smiht", "zzz"])
+    def test_searches_match(self, directory_snapshot, mapped_snapshot, query):
+        """Test text searches, including similar matches, and their pages are identical."""
+        expected = directory_snapshot.search(query, {}, limit=1)
+        page = mapped_snapshot.search(query, {}, limit=1)
+
+        assert page == expected
+        if expected.next_after is not None:
+            assert mapped_snapshot.search(query, {}, page.next_after, 1) == directory_snapshot.search(
+                query, {}, expected.next_after, 1
+            )
+
+    def test_empty_snapshot(self, tmp_path):
+        """Test a directory without members can be written and mapped."""
+        from hipeac_mcp.directory import DirectorySnapshot, open_snapshot, write_snapshot
+
+        write_snapshot(DirectorySnapshot((), {}, {}), tmp_path / "empty.snapshot")
+        snapshot = open_snapshot(tmp_path / "empty.snapshot")
+
+        assert len(snapshot) == 0
+        assert snapshot.search("jane", {}).total == 0
+
+    def test_file_can_be_rewritten(self, directory_snapshot, directory_rows, tmp_path):
+        """Test a mapped snapshot keeps its data when the file is replaced."""
+        from hipeac_mcp.directory import build_snapshot, open_snapshot, write_snapshot
+
+        path = tmp_path / "members.snapshot"
+        write_snapshot(directory_snapshot, path)
+        mapped = open_snapshot(path)
+        directory_rows.memberships = directory_rows.memberships[:1]
+
+        write_snapshot(build_snapshot(directory_rows), path)
+
+        assert len(mapped) == 3
+        assert len(open_snapshot(path)) == 1
+
+    @pytest.mark.parametrize(
+        ("mutate", "message"),
+        [
+            (lambda data: b"NOTASNAP" + data[8:], "Not a member snapshot"),
+            (lambda data: data[:8] + (99).to_bytes(4, "little") + data[12:], "version 99"),
+            (lambda data: data[:4], "Truncated"),
+        ],
+    )
+    def test_invalid_files_are_rejected(self, directory_snapshot, mutate, message):
+        """Test buffers that are not snapshots in the current format raise ValueError."""
+        from hipeac_mcp.directory import serialize_snapshot, snapshot_from_buffer
+
+        with pytest.raises(ValueError, match=message):
+            snapshot_from_buffer(mutate(serialize_snapshot(directory_snapshot)))
+
+
+class TestSharedSnapshotFile:
+    """Tests for the loader sharing a snapshot file between workers."""
+
+    def test_missing_file_is_built(self, directory_snapshot, tmp_path):
+        """Test the first load builds the file and maps it."""
+        from hipeac_mcp.directory import SharedSnapshotFile
+
+        builder = Mock(return_value=directory_snapshot)
+        loader = SharedSnapshotFile(tmp_path / "members.snapshot", max_age=60, builder=builder)
+
+        snapshot = loader()
+
+        builder.assert_called_once()
+        assert (tmp_path / "members.snapshot").exists()
+        assert list(snapshot.members) == list(directory_snapshot.members)
+
+    def test_fresh_file_is_reused(self, directory_snapshot, tmp_path):
+        """Test a fresh file written by another worker is mapped without building."""
+        from hipeac_mcp.directory import SharedSnapshotFile
+
+        path = tmp_path / "members.snapshot"
+        SharedSnapshotFile(path, max_age=60, builder=lambda: directory_snapshot)()
+        builder = Mock()
+        loader = SharedSnapshotFile(path, max_age=60, builder=builder)
+
+        first = loader()
+        second = loader()
+
+        builder.assert_not_called()
+        assert second is first
+
+    def test_stale_file_is_rebuilt(self, directory_snapshot, tmp_path):
+        """Test a file older than max_age is rebuilt and mapped again."""
+        from hipeac_mcp.directory import SharedSnapshotFile
+
+        builder = Mock(return_value=directory_snapshot)
+        loader = SharedSnapshotFile(tmp_path / "members.snapshot", max_age=0, builder=builder)
+
+        first = loader()
+        second = loader()
+
+        assert builder.call_count == 2
+        assert second is not first
+
+    def test_only_designated_worker_rebuilds(self, directory_snapshot, tmp_path):
+        """Test the worker holding the builder lock rebuilds a stale file and the others only map it."""
+        from hipeac_mcp.directory import SharedSnapshotFile
+
+        path = tmp_path / "members.snapshot"
+        builder, other_builder = Mock(return_value=directory_snapshot), Mock()
+        designated = SharedSnapshotFile(path, max_age=0, builder=builder)
+        other = SharedSnapshotFile(path, max_age=0, builder=other_builder)
+
+        designated()
+        snapshot = other()
+        designated()
+
+        assert builder.call_count == 2
+        other_builder.assert_not_called()
+        assert list(snapshot.members) == list(directory_snapshot.members)
+
+    @patch("hipeac_mcp.directory.storage.load_snapshot")
+    def test_missing_file_is_built_without_builder_state(self, mock_load, directory_snapshot, tmp_path):
+        """Test a worker that is not the designated builder reads the directory itself while the file is missing."""
+        from hipeac_mcp.directory import SharedSnapshotFile
+
+        path = tmp_path / "members.snapshot"
+        SharedSnapshotFile(path, max_age=60, builder=lambda: directory_snapshot)()
+        path.unlink()
+        mock_load.return_value = directory_snapshot
+        other_builder = Mock()
+
+        snapshot = SharedSnapshotFile(path, max_age=60, builder=other_builder)()
+
+        mock_load.assert_called_once()
+        other_builder.assert_not_called()
+        assert list(snapshot.members) == list(directory_snapshot.members)
+
+
+class TestExportedSnapshot:
+    """Tests for compressed snapshot exports."""
+
+    def test_round_trip(self, directory_snapshot, tmp_path):
+        """Test an exported snapshot is compressed and imports to the same directory."""
+        from hipeac_mcp.directory import export_snapshot, import_snapshot, serialize_snapshot
+
+        path = tmp_path / "members.snapshot.z"
+
+        size = export_snapshot(directory_snapshot, path)
+        snapshot = import_snapshot(path)
+
+        assert size == path.stat().st_size < len(serialize_snapshot(directory_snapshot))
+        assert list(snapshot.members) == list(directory_snapshot.members)
+        assert snapshot.search("muller", {}) == directory_snapshot.search("muller", {})
+
+    def test_uncompressed_file_is_imported(self, directory_snapshot, tmp_path):
+        """Test a shared snapshot file can be imported as well."""
+        from hipeac_mcp.directory import import_snapshot, write_snapshot
+
+        write_snapshot(directory_snapshot, tmp_path / "members.snapshot")
+
+        assert len(import_snapshot(tmp_path / "members.snapshot")) == 3
+
+    def test_garbage_is_rejected(self, tmp_path):
+        """Test a file that is neither compressed nor a snapshot raises ValueError."""
+        from hipeac_mcp.directory import import_snapshot
+
+        (tmp_path / "members.snapshot.z").write_bytes(b"not a snapshot")
+
+        with pytest.raises(ValueError, match="Not a member snapshot"):
+            import_snapshot(tmp_path / "members.snapshot.z")
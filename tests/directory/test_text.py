@@ -0,0 +1,111 @@
+"""Tests for the trigram name search index."""
+
+import pytest
+
+
+@pytest.fixture
+def index():
+    """Trigram index over a few members' normalized fields."""
+    from hipeac_mcp.directory.text import TrigramIndex, normalize
+
+    people = [
+        ("Hans", "Müller", "hmuller", "hans.muller@example.com"),
+        ("Ana", "García", "agarcia", "ana@example.com"),
+        ("Jane", "Smith", "jsmith", "jane@example.com"),
+        ("Mario", "Smithson", "msmithson", "mario@example.com"),
+        ("Ed", "Ng", "eng", "ed@example.org"),
+    ]
+    return TrigramIndex(
+        [
+            tuple(normalize(value) for value in (first, last, f"{first} {last}", username, email))
+            for first, last, username, email in people
+        ]
+    )
+
+
+class TestNormalize:
+    """Tests for normalize."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("Müller", "muller"),
+            ("GARCÍA", "garcia"),
+            ("Straße", "strasse"),
+            ("  Jane   Smith ", "jane smith"),
+            ("Ångström", "angstrom"),
+        ],
+    )
+    def test_normalize(self, text, expected):
+        """Test case folding, accent stripping and whitespace collapsing."""
+        from hipeac_mcp.directory.text import normalize
+
+        assert normalize(text) == expected
+
+
+class TestMatchRank:
+    """Tests for match_rank."""
+
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            ("smith", "EXACT"),
+            ("smi", "PREFIX"),
+            ("example", "WORD_PREFIX"),
+            ("mit", "SUBSTRING"),
+        ],
+    )
+    def test_match_rank(self, query, expected):
+        """Test each match quality level."""
+        from hipeac_mcp.directory import text
+
+        fields = ("jane", "smith", "jane smith", "jsmith", "jane@example.com")
+
+        assert text.match_rank(fields, query) == getattr(text, expected)
+
+    def test_no_match(self):
+        """Test fields not containing the query are not ranked."""
+        from hipeac_mcp.directory.text import match_rank
+
+        assert match_rank(("jane", "smith"), "xyz") is None
+
+
+class TestTrigramIndex:
+    """Tests for TrigramIndex.search."""
+
+    def ordinals(self, index, query):
+        return [ordinal for _, ordinal in index.search(query)]
+
+    def test_accent_insensitive(self, index):
+        """Test "Muller" finds "Müller" and vice versa."""
+        assert self.ordinals(index, "Muller") == [0]
+        assert self.ordinals(index, "MÜLLER") == [0]
+
+    def test_ranked_by_match_quality(self, index):
+        """Test exact matches come before prefix and substring matches."""
+        from hipeac_mcp.directory.text import EXACT, PREFIX
+
+        assert index.search("smith") == [(EXACT, 2), (PREFIX, 3)]
+        assert self.ordinals(index, "Smithson") == [3]
+
+    def test_full_name(self, index):
+        """Test a query spanning first and last name matches."""
+        assert self.ordinals(index, "jane smith") == [2]
+
+    def test_short_query_scans(self, index):
+        """Test queries shorter than a trigram still match."""
+        assert self.ordinals(index, "ng") == [4]
+
+    def test_typo_falls_back_to_similarity(self, index):
+        """Test a misspelled name still finds the closest members."""
+        from hipeac_mcp.directory.text import SIMILAR
+
+        rank, ordinal = index.search("smiht")[0]
+
+        assert rank >= SIMILAR
+        assert ordinal in (2, 3)
+
+    def test_no_match(self, index):
+        """Test unrelated or empty queries return nothing."""
+        assert self.ordinals(index, "zzzzzz") == []
+        assert self.ordinals(index, "   ") == []
@@ -0,0 +1,61 @@
+"""Smoke tests for the benchmark suites."""
+
+import json
+import os
+import subprocess
+import sys
+
+
+def test_search_members_benchmark_emits_json(tmp_path):
+    """Test the suite seeds a SQLite stand-in and reports every scenario for both backends."""
+    output = tmp_path / "results.json"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'benchmark.db'}"}
+
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.search_members", "--sizes", "200", "--runs", "2", "--output", str(output)],
+        check=True,
+        capture_output=True,
+        env=env,
+    )
+
+    report = json.loads(output.read_text())
+    results = {(result["backend"], result["scenario"]): result for result in report["results"]}
+    scenarios = {name for _, name in results}
+    assert len(scenarios) > 1
+    assert set(results) == {(backend, name) for backend in ("database", "snapshot") for name in scenarios}
+    for name in scenarios:
+        database, snapshot = results["database", name], results["snapshot", name]
+        assert database["total"] == snapshot["total"]
+        assert database["queries"] > 0
+        assert snapshot["queries"] == 0
+        assert set(database["latency_ms"]) == {"mean", "p50", "p95", "p99", "max"}
+
+
+def test_snapshot_refresh_benchmark_emits_json(tmp_path):
+    """Test the suite reports incremental refreshes matching full rebuilds, with only checksums read when unchanged."""
+    output = tmp_path / "results.json"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'benchmark.db'}"}
+
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.snapshot_refresh",
+            "--sizes",
+            "200",
+            "--churn",
+            "0",
+            "5",
+            "--output",
+            str(output),
+        ],
+        check=True,
+        capture_output=True,
+        env=env,
+    )
+
+    results = {result["churn"]: result for result in json.loads(output.read_text())["results"]}
+    assert set(results) == {0, 5}
+    assert all(result["matches_full_rebuild"] for result in results.values())
+    assert results[0]["incremental_queries"] == 8
+    assert results[5]["incremental_queries"] > 8
@@ -0,0 +1,312 @@
+"""Tests for the shared metadata cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+
+def make_async_iterator(items):
+    """Helper to create an async iterator from a list."""
+
+    async def async_gen():
+        for item in items:
+            yield item
+
+    return async_gen()
+
+
+@pytest.fixture
+def mock_metadata():
+    """Patch the Metadata model with one topic and a probe returning (1, 42).
+
+    :yields: The mocked model.
+    """
+    topic = Mock(id=42, value="Compilers", type="topic ")
+    with patch("hipeac_mcp.cache.Metadata") as mock_metadata:
+        mock_qs = MagicMock()
+        mock_qs.only.return_value = mock_qs
+        mock_qs.__aiter__ = lambda self: make_async_iterator([topic])
+        mock_metadata.objects.all.return_value = mock_qs
+        mock_metadata.objects.order_by.return_value.aaggregate = AsyncMock(return_value={"count": 1, "max_id": 42})
+        yield mock_metadata
+
+
+class TestMetadataCache:
+    """Tests for MetadataCache."""
+
+    @pytest.mark.asyncio
+    async def test_first_get_loads_table(self, mock_metadata):
+        """Test the table is loaded on first use and items are grouped by stripped type."""
+        from hipeac_mcp.cache import MetadataCache
+
+        cache = MetadataCache(ttl=60, max_age=3600)
+
+        table = await cache.get()
+
+        assert table.item("topic", 42).value == "Compilers"
+        assert table.item("application_area", 42) is None
+        assert list(table.items["topic"]) == [42]
+        assert cache.stats.reloads == 1
+
+    @pytest.mark.asyncio
+    async def test_warm_get_makes_no_query(self, mock_metadata):
+        """Test the table is served from memory within the TTL."""
+        from hipeac_mcp.cache import MetadataCache
+
+        cache = MetadataCache(ttl=60, max_age=3600)
+        first = await cache.get()
+        mock_metadata.reset_mock()
+
+        second = await cache.get()
+
+        assert second is first
+        assert mock_metadata.mock_calls == []
+        assert cache.stats.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_unchanged_table_is_only_probed(self, mock_metadata):
+        """Test an unchanged probe keeps the table without reloading it."""
+        from hipeac_mcp.cache import MetadataCache
+
+        cache = MetadataCache(ttl=0, max_age=3600)
+        first = await cache.get()
+
+        second = await cache.get()
+
+        assert second.items is first.items
+        assert cache.stats.probes == 1
+        assert cache.stats.reloads == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_changed_table_is_reloaded(self, mock_metadata):
+        """Test a changed probe reloads the table."""
+        from hipeac_mcp.cache import MetadataCache
+
+        cache = MetadataCache(ttl=0, max_age=3600)
+        await cache.get()
+        mock_metadata.objects.order_by.return_value.aaggregate.return_value = {"count": 2, "max_id": 43}
+
+        table = await cache.get()
+
+        assert table.signature == (2, 43)
+        assert cache.stats.reloads == 2
+
+    @pytest.mark.asyncio
+    async def test_max_age_forces_reload(self, mock_metadata):
+        """Test the table is reloaded after max_age even if the probe is unchanged."""
+        from hipeac_mcp.cache import MetadataCache
+
+        cache = MetadataCache(ttl=0, max_age=0)
+        await cache.get()
+
+        await cache.get()
+
+        assert cache.stats.probes == 0
+        assert cache.stats.reloads == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_gets_share_one_load(self, mock_metadata):
+        """Test concurrent cold gets trigger a single reload."""
+        from hipeac_mcp.cache import MetadataCache
+
+        cache = MetadataCache(ttl=60, max_age=3600)
+
+        tables = await asyncio.gather(*(cache.get() for _ in range(10)))
+
+        assert all(table is tables[0] for table in tables)
+        assert cache.stats.reloads == 1
+        assert mock_metadata.objects.all.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self, mock_metadata):
+        """Test invalidate forces a reload on the next get."""
+        from hipeac_mcp.cache import MetadataCache
+
+        cache = MetadataCache(ttl=60, max_age=3600)
+        await cache.get()
+
+        cache.invalidate()
+        await cache.get()
+
+        assert cache.stats.reloads == 2
+
+    @pytest.mark.asyncio
+    async def test_pinned_table_is_never_revalidated(self, mock_metadata):
+        """Test a pinned table is served without any query until it is unpinned."""
+        from hipeac_mcp.cache import MetadataCache, MetadataTable
+
+        cache = MetadataCache(ttl=0, max_age=0)
+        table = MetadataTable.build({}, (0, None), 0)
+
+        cache.pin(table)
+        assert await cache.get() is table
+        assert mock_metadata.mock_calls == []
+
+        cache.pin(None)
+        assert await cache.get() is not table
+        assert cache.stats.reloads == 1
+
+
+class TestMetadataTable:
+    """Tests for the precomputed metadata response."""
+
+    def build(self, value="Compilers"):
+        from hipeac_mcp.cache import MetadataTable
+        from hipeac_mcp.schemas.metadata import MetadataItem
+
+        return MetadataTable.build({"topic": {42: MetadataItem(id=42, value=value)}}, (1, 42), 0)
+
+    def test_response_is_prebuilt(self):
+        """Test the response is built with the table."""
+        table = self.build()
+
+        assert table.response.topics == list(table.items["topic"].values())
+        assert table.response.application_areas == []
+        assert len(table.response.membership_types or []) == 4
+
+    def test_version_follows_content(self):
+        """Test the version is stable for equal content and changes with it."""
+        assert self.build().version == self.build().version
+        assert self.build().version != self.build("Compilers and runtimes").version
+
+
+class TestContentTypeCache:
+    """Tests for ContentTypeCache."""
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.cache.ContentType")
+    async def test_id_is_looked_up_once(self, mock_ct):
+        """Test the id is queried on first use and memoized."""
+        from hipeac_mcp.cache import ContentTypeCache
+
+        mock_ct.objects.filter.return_value.values_list.return_value.get.return_value = 7
+        cache = ContentTypeCache({})
+
+        assert await cache.get_id("hipeac", "user") == 7
+        assert await cache.get_id("hipeac", "user") == 7
+        assert cache.get_id_sync("hipeac", "user") == 7
+        mock_ct.objects.filter.assert_called_once_with(app_label="hipeac", model="user")
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.cache.ContentType")
+    async def test_pinned_id_is_never_queried(self, mock_ct):
+        """Test a pinned id is returned without touching the database."""
+        from hipeac_mcp.cache import ContentTypeCache
+
+        cache = ContentTypeCache({"hipeac.user": 3})
+
+        assert await cache.get_id("hipeac", "user") == 3
+        assert cache.get_id_sync("hipeac", "user") == 3
+        mock_ct.objects.filter.assert_not_called()
+
+
+class TestResultCache:
+    """Tests for ResultCache."""
+
+    def test_hit_after_set(self):
+        """Test a stored result is returned for the same key and version."""
+        from hipeac_mcp.cache import ResultCache
+
+        cache = ResultCache(max_entries=10, max_bytes=1024, ttl=60)
+        cache.set("key", {"total": 1}, version=1)
+
+        assert cache.get("key", version=1) == {"total": 1}
+        assert cache.get("other", version=1) is None
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_version_change_invalidates(self):
+        """Test a result stored for another data version is dropped."""
+        from hipeac_mcp.cache import ResultCache
+
+        cache = ResultCache(max_entries=10, max_bytes=1024, ttl=60)
+        cache.set("key", {"total": 1}, version=1)
+
+        assert cache.get("key", version=2) is None
+        assert len(cache) == 0
+        assert cache.stats.expirations == 1
+
+    def test_ttl_expires(self):
+        """Test a result older than the TTL is not served."""
+        from hipeac_mcp.cache import ResultCache
+
+        cache = ResultCache(max_entries=10, max_bytes=1024, ttl=0)
+        cache.set("key", {"total": 1})
+
+        assert cache.get("key") is None
+
+    def test_entry_bound_evicts_least_recently_used(self):
+        """Test the least recently used result is evicted beyond max_entries."""
+        from hipeac_mcp.cache import ResultCache
+
+        cache = ResultCache(max_entries=2, max_bytes=1024, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats.evictions == 1
+
+    def test_byte_bound_evicts(self):
+        """Test results are evicted to keep the serialized size under max_bytes."""
+        from hipeac_mcp.cache import ResultCache
+
+        cache = ResultCache(max_entries=10, max_bytes=20, ttl=60)
+        cache.set("a", "x" * 10)
+        cache.set("b", "y" * 10)
+
+        assert cache.get("a") is None
+        assert cache.size == 12
+        cache.set("huge", "z" * 100)
+        assert cache.get("huge") is None
+
+    def test_zero_entries_disables(self):
+        """Test a cache without room stores nothing."""
+        from hipeac_mcp.cache import ResultCache
+
+        cache = ResultCache(max_entries=0, max_bytes=1024, ttl=60)
+        cache.set("key", 1)
+
+        assert cache.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_hits_and_misses_are_recorded_on_the_call(self):
+        """Test lookups are counted on the instrumented tool call and in the registered counters."""
+        from hipeac_mcp.cache import ResultCache
+        from hipeac_mcp.instrumentation import counters, current_call, instrument, register_counters
+
+        cache = ResultCache(max_entries=10, max_bytes=1024, ttl=60)
+        register_counters("test_results", cache.stats)
+
+        @instrument
+        async def tool():
+            if cache.get("key") is None:
+                cache.set("key", 1)
+            cache.get("key")
+            return current_call()
+
+        stats = await tool()
+
+        assert (stats.cache_hits, stats.cache_misses) == (1, 1)
+        assert counters()["test_results"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_evictions_are_recorded_on_the_call(self):
+        """Test results evicted by an instrumented tool call are counted on it."""
+        from hipeac_mcp.cache import ResultCache
+        from hipeac_mcp.instrumentation import current_call, instrument
+
+        cache = ResultCache(max_entries=1, max_bytes=1024, ttl=60)
+        cache.set("a", 1)
+
+        @instrument
+        async def tool():
+            cache.set("b", 2)
+            return current_call()
+
+        stats = await tool()
+
+        assert stats.cache_evictions == 1
+        assert cache.stats.evictions == 1
@@ -0,0 +1,124 @@
+"""Tests for coalescing identical concurrent work."""
+
+import asyncio
+import inspect
+
+import pytest
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_computation(self):
+        """Test callers with the same key await a single computation."""
+        from hipeac_mcp.concurrency import SingleFlight
+
+        flight, runs = SingleFlight(), []
+
+        async def compute():
+            runs.append(1)
+            await asyncio.sleep(0)
+            return object()
+
+        results = await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+
+        assert len(runs) == 1
+        assert all(result is results[0] for result in results)
+        assert (flight.started, flight.shared) == (1, 4)
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_compute_again(self):
+        """Test nothing is cached once the computation has completed."""
+        from hipeac_mcp.concurrency import SingleFlight
+
+        flight, runs = SingleFlight(), []
+
+        async def compute():
+            runs.append(1)
+            return len(runs)
+
+        assert await flight.do("key", compute) == 1
+        assert await flight.do("key", compute) == 2
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        """Test computations with different keys are not shared."""
+        from hipeac_mcp.concurrency import SingleFlight
+
+        flight = SingleFlight()
+
+        async def compute(value):
+            await asyncio.sleep(0)
+            return value
+
+        assert await asyncio.gather(flight.do("a", lambda: compute(1)), flight.do("b", lambda: compute(2))) == [1, 2]
+        assert flight.shared == 0
+
+    @pytest.mark.asyncio
+    async def test_error_is_shared(self):
+        """Test every waiter gets the exception of the shared computation."""
+        from hipeac_mcp.concurrency import SingleFlight
+
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(flight.do("key", compute) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test cancelling one waiter leaves the shared computation running for the others."""
+        from hipeac_mcp.concurrency import SingleFlight
+
+        flight, release = SingleFlight(), asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", compute))
+        second = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        release.set()
+
+        assert await second == "done"
+        assert first.cancelled()
+
+
+class TestSingleFlightDecorator:
+    """Tests for the single_flight decorator."""
+
+    def test_signature_is_preserved(self):
+        """Test wrapped tools keep their signature for FastMCP."""
+        from hipeac_mcp.concurrency import single_flight
+
+        async def tool(query: str | None = None, limit: int = 20) -> int:
+            return limit
+
+        assert inspect.signature(single_flight(tool)) == inspect.signature(tool)
+
+    @pytest.mark.asyncio
+    async def test_equivalent_argument_forms_are_coalesced(self):
+        """Test positional, keyword and default arguments give the same key."""
+        from hipeac_mcp.concurrency import single_flight
+
+        runs = []
+
+        @single_flight
+        async def tool(query=None, limit=20):
+            runs.append((query, limit))
+            await asyncio.sleep(0)
+            return limit
+
+        results = await asyncio.gather(tool("smith"), tool(query="smith"), tool("smith", 20), tool("smith", 10))
+
+        assert results == [20, 20, 20, 10]
+        assert runs == [("smith", 20), ("smith", 10)]
+        assert tool.flight.shared == 2
@@ -0,0 +1,134 @@
+"""Tests for database utilities."""
+
+import inspect
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+class TestReleaseConnections:
+    """Tests for the release_connections decorator."""
+
+    def test_signature_is_preserved(self):
+        """Test wrapped tools keep their signature for FastMCP."""
+        from hipeac_mcp.db import release_connections
+
+        async def tool(query: str, limit: int = 20) -> int:
+            return limit
+
+        assert inspect.signature(release_connections(tool)) == inspect.signature(tool)
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.db.close_old_connections")
+    @patch("hipeac_mcp.db.connections")
+    async def test_open_connections_are_closed(self, mock_connections, mock_close):
+        """Test connections opened by the tool are closed after it returns or raises."""
+        from hipeac_mcp.db import release_connections
+
+        mock_connections.all.return_value = [MagicMock(connection=object())]
+
+        @release_connections
+        async def failing():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await failing()
+
+        mock_close.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.db.close_old_connections")
+    @patch("hipeac_mcp.db.connections")
+    async def test_no_connection_skips_close(self, mock_connections, mock_close):
+        """Test tools served from memory do not pay for a thread hop."""
+        from hipeac_mcp.db import release_connections
+
+        mock_connections.all.return_value = [MagicMock(connection=None)]
+
+        @release_connections
+        async def cached():
+            return 1
+
+        assert await cached() == 1
+        mock_close.assert_not_called()
+
+
+@pytest.fixture
+def query_threads():
+    """Run queries on a fresh executor of 2 threads.
+
+    :yields: None.
+    """
+    from django.test import override_settings
+
+    from hipeac_mcp.db import query_executor
+
+    query_executor.cache_clear()
+    with override_settings(DB_QUERY_CONCURRENCY=2):
+        yield
+    query_executor().shutdown()
+    query_executor.cache_clear()
+
+
+@pytest.mark.usefixtures("query_threads")
+class TestRunQuery:
+    """Tests for running queries concurrently in the query executor."""
+
+    @pytest.mark.asyncio
+    async def test_independent_queries_overlap(self):
+        """Test gathered queries run at the same time, each releasing its connection."""
+        import threading
+
+        from hipeac_mcp.db import gather_queries, run_query
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        def query(value):
+            barrier.wait()
+            return value
+
+        with patch("hipeac_mcp.db.close_old_connections") as mock_close:
+            results = await gather_queries(run_query(query, 1), run_query(query, 2))
+
+        assert results == [1, 2]
+        assert mock_close.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_query_times_out(self):
+        """Test a query taking longer than the timeout raises TimeoutError."""
+        import time
+
+        from django.test import override_settings
+
+        from hipeac_mcp.db import run_query
+
+        with override_settings(DB_QUERY_TIMEOUT_SECONDS=0.01), pytest.raises(TimeoutError):
+            await run_query(time.sleep, 0.5)
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_other_queries(self):
+        """Test queries still waiting for a thread are cancelled when another one fails."""
+        import asyncio
+        import threading
+
+        from hipeac_mcp.db import gather_queries, query_executor, run_query
+
+        release = threading.Event()
+        started = []
+
+        def blocking(name):
+            started.append(name)
+            release.wait(5)
+
+        async def failing():
+            await asyncio.sleep(0.05)
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await gather_queries(
+                run_query(blocking, "first"), run_query(blocking, "second"), run_query(blocking, "queued"), failing()
+            )
+        release.set()
+        query_executor().shutdown(wait=True)
+
+        assert sorted(started) == ["first", "second"]
@@ -0,0 +1,176 @@
+"""Tests for tool call instrumentation."""
+
+import inspect
+import logging
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from django.test import override_settings
+
+
+def run_query(rowcount=3):
+    """Run a fake query through the execute wrapper."""
+    from hipeac_mcp.instrumentation import execute_wrapper
+
+    execute = Mock(return_value="result")
+    context = {"cursor": Mock(rowcount=rowcount)}
+    return execute_wrapper(execute, "SELECT 1", None, False, context), execute
+
+
+class TestExecuteWrapper:
+    """Tests for the query execute wrapper."""
+
+    def test_outside_tool_call_passes_through(self):
+        """Test queries outside an instrumented call are executed untouched."""
+        from hipeac_mcp.instrumentation import current_call
+
+        result, execute = run_query()
+
+        assert result == "result"
+        execute.assert_called_once()
+        assert current_call() is None
+
+    @pytest.mark.asyncio
+    async def test_queries_are_recorded(self):
+        """Test queries inside an instrumented call are counted with their rows and time."""
+        from hipeac_mcp.instrumentation import current_call, instrument
+
+        @instrument
+        async def tool():
+            run_query(rowcount=3)
+            run_query(rowcount=-1)
+            return current_call()
+
+        stats = await tool()
+
+        assert stats.tool == "tool"
+        assert stats.queries == 2
+        assert stats.rows == 3
+        assert stats.db_time > 0
+
+    def test_wrapper_is_installed_on_new_connections(self):
+        """Test the connection_created receiver adds the wrapper once."""
+        from django.db.backends.signals import connection_created
+
+        from hipeac_mcp.instrumentation import execute_wrapper
+
+        connection = MagicMock(execute_wrappers=[])
+
+        connection_created.send(sender=type(connection), connection=connection)
+        connection_created.send(sender=type(connection), connection=connection)
+
+        assert connection.execute_wrappers == [execute_wrapper]
+
+
+class TestInstrument:
+    """Tests for the instrument decorator."""
+
+    def test_signature_is_preserved(self):
+        """Test wrapped tools keep their signature for FastMCP."""
+        from hipeac_mcp.instrumentation import instrument
+
+        async def tool(query: str, limit: int = 20) -> int:
+            return limit
+
+        assert inspect.signature(instrument(tool)) == inspect.signature(tool)
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.instrumentation.sentry_sdk")
+    async def test_stats_are_attached_to_span(self, mock_sentry):
+        """Test a traced call records its measurements, the response and the registered counters as span data."""
+        from hipeac_mcp.cache import CacheStats
+        from hipeac_mcp.instrumentation import instrument, register_counters
+
+        span = mock_sentry.start_span.return_value.__enter__.return_value
+        span.sampled = True
+        register_counters("test_component", CacheStats(reloads=2))
+
+        @instrument
+        async def tool():
+            run_query()
+            return {"members": []}
+
+        await tool()
+
+        data = {call.args[0]: call.args[1] for call in span.set_data.call_args_list}
+        assert data["tool.queries"] == 1
+        assert data["tool.rows"] == 3
+        assert data["tool.response_bytes"] == len(b'{\n  "members": []\n}')
+        assert "tool.serialization_time" in data
+        assert data["counters.test_component.reloads"] == 2
+        mock_sentry.start_span.assert_called_once_with(op="mcp.tool", name="tool")
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.instrumentation.sentry_sdk")
+    async def test_untraced_fast_call_skips_serialization(self, mock_sentry):
+        """Test the response is not serialized again for calls that are neither traced nor slow."""
+        from hipeac_mcp.instrumentation import instrument
+
+        span = mock_sentry.start_span.return_value.__enter__.return_value
+        span.sampled = False
+
+        @instrument
+        async def tool():
+            return {"members": []}
+
+        await tool()
+
+        keys = {call.args[0] for call in span.set_data.call_args_list}
+        assert "tool.response_bytes" not in keys
+        assert not any(key.startswith("counters.") for key in keys)
+
+    @pytest.mark.asyncio
+    @override_settings(SLOW_TOOL_CALL_MS=0)
+    async def test_slow_call_is_logged_with_arguments(self, caplog):
+        """Test calls over the threshold are logged with their arguments, measurements and the registered counters."""
+        from hipeac_mcp.cache import CacheStats
+        from hipeac_mcp.instrumentation import instrument, register_counters
+
+        register_counters("test_slow", CacheStats(hits=4))
+
+        @instrument
+        async def search(query=None):
+            run_query()
+            return {"members": []}
+
+        with caplog.at_level(logging.WARNING, logger="hipeac_mcp.instrumentation"):
+            await search(query="smith")
+
+        assert len(caplog.records) == 1
+        message = caplog.records[0].getMessage()
+        assert "Slow tool call search" in message
+        assert "1 queries" in message
+        assert '{"query": "smith"}' in message
+        assert '"test_slow": {"hits": 4' in message
+
+    @pytest.mark.asyncio
+    @override_settings(SLOW_TOOL_CALL_MS=60_000)
+    async def test_fast_call_is_not_logged(self, caplog):
+        """Test calls under the threshold are not logged as slow."""
+        from hipeac_mcp.instrumentation import instrument
+
+        @instrument
+        async def tool():
+            return None
+
+        with caplog.at_level(logging.WARNING, logger="hipeac_mcp.instrumentation"):
+            await tool()
+
+        assert caplog.records == []
+
+    @pytest.mark.asyncio
+    @override_settings(SLOW_TOOL_CALL_MS=0)
+    async def test_failing_call_is_reported_and_reraised(self, caplog):
+        """Test a tool raising an error is still reported and the error propagates."""
+        from hipeac_mcp.instrumentation import current_call, instrument
+
+        @instrument
+        async def tool():
+            run_query()
+            raise ValueError("boom")
+
+        with caplog.at_level(logging.WARNING, logger="hipeac_mcp.instrumentation"), pytest.raises(ValueError):
+            await tool()
+
+        assert "1 queries" in caplog.records[0].getMessage()
+        assert current_call() is None
@@ -0,0 +1,42 @@
+"""Tests for the command line entry point."""
+
+from unittest.mock import patch
+
+
+class TestMain:
+    """Tests for main."""
+
+    @patch("hipeac_mcp.__main__.load_snapshot")
+    def test_snapshot_export(self, mock_load, directory_snapshot, tmp_path, capsys):
+        """Test the directory is exported to the given file."""
+        from hipeac_mcp.__main__ import main
+        from hipeac_mcp.directory import import_snapshot
+
+        mock_load.return_value = directory_snapshot
+
+        main(["snapshot", "export", str(tmp_path / "members.snapshot.z")])
+
+        assert len(import_snapshot(tmp_path / "members.snapshot.z")) == 3
+        assert "Exported 3 members" in capsys.readouterr().err
+
+    @patch("hipeac_mcp.__main__.serve_offline")
+    @patch("hipeac_mcp.__main__.mcp")
+    def test_serve_snapshot(self, mock_mcp, mock_serve_offline):
+        """Test serve --snapshot loads the file before running over stdio."""
+        from hipeac_mcp.__main__ import main
+
+        main(["serve", "--snapshot", "members.snapshot.z"])
+
+        mock_serve_offline.assert_called_once_with("members.snapshot.z")
+        mock_mcp.run.assert_called_once_with(transport="stdio")
+
+    @patch("hipeac_mcp.__main__.serve_offline")
+    @patch("hipeac_mcp.__main__.mcp")
+    def test_default_uses_database(self, mock_mcp, mock_serve_offline):
+        """Test running without arguments serves from the database over stdio."""
+        from hipeac_mcp.__main__ import main
+
+        main([])
+
+        mock_serve_offline.assert_not_called()
+        mock_mcp.run.assert_called_once_with(transport="stdio")
@@ -0,0 +1,77 @@
+"""Tests for serving the tools from an exported snapshot file."""
+
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def offline(directory_snapshot, tmp_path):
+    """Serve the ``directory_snapshot`` fixture from an exported file for one test.
+
+    :yields: The loaded snapshot.
+    """
+    from hipeac_mcp.cache import metadata_cache
+    from hipeac_mcp.directory import engine, export_snapshot
+    from hipeac_mcp.offline import serve_offline
+
+    path = tmp_path / "members.snapshot.z"
+    export_snapshot(directory_snapshot, path)
+    try:
+        with patch("hipeac_mcp.offline.register_network_tools"):
+            yield serve_offline(path)
+    finally:
+        engine.pin(None)
+        metadata_cache.invalidate()
+
+
+class TestMetadataTable:
+    """Tests for the metadata table built from a snapshot."""
+
+    def test_items_are_grouped_in_snapshot_order(self, directory_snapshot):
+        """Test items are grouped by type, keeping the order they were read in."""
+        from hipeac_mcp.offline import metadata_table
+
+        table = metadata_table(directory_snapshot)
+
+        assert [item.id for item in table.response.topics or []] == [42, 43]
+        assert table.item("application_area", 7).value == "Healthcare"
+        assert table.item("institution_type", 101).value == "Research center"
+        assert table.signature == (5, 101)
+
+
+class TestServeOffline:
+    """Tests for answering the tools without the database."""
+
+    def test_network_tools_are_registered(self, offline):
+        """Test the network tools, which need a snapshot, are served from the file."""
+        from hipeac_mcp.offline import register_network_tools
+
+        register_network_tools.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.cache.Metadata")
+    @patch("hipeac_mcp.tools.members.User")
+    async def test_search_members_uses_no_database(self, mock_user, mock_metadata, offline):
+        """Test searches are answered from the exported snapshot."""
+        from hipeac_mcp.tools.members import search_members
+
+        result = await search_members(query="muller")
+
+        assert [member.username for member in result.members] == ["hmuller"]
+        assert result.members[0].institutions[0].type.value == "University"
+        assert mock_user.mock_calls == []
+        assert mock_metadata.mock_calls == []
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.cache.Metadata")
+    async def test_get_metadata_uses_no_database(self, mock_metadata, offline):
+        """Test metadata is answered from the exported snapshot and never revalidated."""
+        from hipeac_mcp.tools.metadata import get_metadata
+
+        with patch("hipeac_mcp.cache.time.monotonic", return_value=1e12):
+            result = await get_metadata()
+
+        assert [item.value for item in result.topics] == ["Compilers", "Computer architecture"]
+        assert [item.value for item in result.institution_types] == ["University", "Research center"]
+        assert mock_metadata.mock_calls == []
@@ -1,5 +1,7 @@
 """Tests for server initialization and configuration."""
 
+from unittest.mock import patch
+
 
 class TestServerInitialization:
     """Tests for MCP server initialization."""
@@ -18,7 +20,40 @@ class TestServerInitialization:
         tool_names = [tool.name for tool in mcp._tool_manager._tools.values()]
         assert "get_metadata" in tool_names
         assert "search_members" in tool_names
-        assert len(tool_names) == 2
+        assert "member_facets" in tool_names
+        assert "get_members" in tool_names
+        assert "search_institutions" in tool_names
+        assert "find_similar_members" in tool_names
+
+    def test_network_tools_need_the_snapshot(self):
+        """Test the network tools are only registered when the member snapshot is enabled, and only once."""
+        import importlib
+
+        from django.test import override_settings
+        from mcp.server.fastmcp import FastMCP
+
+        from hipeac_mcp.tools import network
+
+        server = FastMCP("test")
+        try:
+            with patch("hipeac_mcp.mcp", server):
+                with override_settings(MEMBER_SNAPSHOT_ENABLED=False):
+                    importlib.reload(network)
+                assert server._tool_manager.list_tools() == []
+
+                with override_settings(MEMBER_SNAPSHOT_ENABLED=True):
+                    importlib.reload(network)
+                with patch.object(server, "tool") as mock_tool:
+                    network.register_network_tools()
+                mock_tool.assert_not_called()
+        finally:
+            importlib.reload(network)
+
+        assert sorted(tool.name for tool in server._tool_manager.list_tools()) == [
+            "connection_path",
+            "member_connections",
+            "network_connectivity",
+        ]
 
     def test_resources_registered(self):
         """Test that no resources are registered (moved to tools)."""
@@ -41,7 +76,7 @@ class TestDatabaseSetup:
         from django.conf import settings
 
         assert settings.configured
-        assert settings.DATABASES["default"]["ENGINE"] == "django.db.backends.mysql"
+        assert settings.DATABASES["default"]["ENGINE"] == "hipeac_mcp.backends.mysql"
 
     def test_read_only_router_exists(self):
         """Test read-only database router is configured."""
@@ -0,0 +1,148 @@
+"""Tests for institution search tools."""
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+
+class TestSearchInstitutions:
+    """Tests for the search_institutions tool."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_search(self, aggregated_snapshot):
+        """Test institutions come with their type, member count and top topics, largest first."""
+        from hipeac_mcp.tools.institutions import search_institutions
+        from hipeac_mcp.tools.members import _snapshot_models
+
+        with patch("hipeac_mcp.tools.institutions.get_snapshot", return_value=aggregated_snapshot):
+            result = await search_institutions()
+
+        assert result.total == 2
+        ghent, bsc = result.institutions
+        assert (ghent.id, ghent.name, ghent.country, ghent.member_count) == (10, "Ghent University", "BE", 2)
+        assert ghent.type is not None and ghent.type.value == "University"
+        # Metadata items are the ones shared with the member profiles of the snapshot
+        assert ghent.type is _snapshot_models(aggregated_snapshot)[0][ghent.type.id]
+        assert [(topic.value, topic.label, topic.count) for topic in ghent.top_topics] == [(42, "Compilers", 2)]
+        assert (bsc.name, bsc.member_count) == ("BSC", 1)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "arguments, expected",
+        [
+            ({"query": "ghent"}, ["Ghent University"]),
+            ({"countries": ["es"]}, ["BSC"]),
+            ({"institution_type_ids": [100, 101], "limit": 1}, ["Ghent University"]),
+            ({"query": "bsc", "countries": ["BE"]}, []),
+            ({"limit": 0}, ["Ghent University"]),
+            ({"limit": -5}, ["Ghent University"]),
+        ],
+    )
+    async def test_snapshot_filters(self, aggregated_snapshot, arguments, expected):
+        """Test name, country and type filters, and the limit."""
+        from hipeac_mcp.tools.institutions import search_institutions
+
+        with patch("hipeac_mcp.tools.institutions.get_snapshot", return_value=aggregated_snapshot):
+            result = await search_institutions(**arguments)
+
+        assert [institution.name for institution in result.institutions] == expected
+
+    @pytest.mark.asyncio
+    async def test_equivalent_filters_share_a_cached_result(self, aggregated_snapshot):
+        """Test filters differing only in order, case or duplicates are searched once."""
+        from hipeac_mcp.tools.institutions import search_institutions
+
+        with (
+            patch("hipeac_mcp.tools.institutions.get_snapshot", return_value=aggregated_snapshot),
+            patch.object(
+                aggregated_snapshot, "search_institutions", wraps=aggregated_snapshot.search_institutions
+            ) as mock_search,
+        ):
+            first = await search_institutions(countries=["be", "ES"])
+            second = await search_institutions(query=" ", countries=["ES", "BE", "BE"])
+
+        assert second is first
+        mock_search.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.metadata_cache", new=AsyncMock())
+    @patch("hipeac_mcp.tools.institutions._search_database", new_callable=AsyncMock)
+    async def test_database_until_aggregates_are_built(self, mock_search, directory_snapshot):
+        """Test the database answers while the institution aggregates of the snapshot are built in the background."""
+        from hipeac_mcp.directory import aggregates_ready
+        from hipeac_mcp.schemas.institutions import InstitutionSearchResponse
+        from hipeac_mcp.tools.institutions import search_institutions
+
+        mock_search.return_value = InstitutionSearchResponse(total=0, limit=20, institutions=[])
+
+        with patch("hipeac_mcp.tools.institutions.get_snapshot", return_value=directory_snapshot):
+            first = await search_institutions()
+            await aggregates_ready(directory_snapshot, "institution_aggregates", wait=True)
+            second = await search_institutions()
+
+        mock_search.assert_awaited_once()
+        assert first.total == 0
+        assert [institution.name for institution in second.institutions] == ["Ghent University", "BSC"]
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.metadata_cache", new=AsyncMock())
+    @patch("hipeac_mcp.tools.institutions.gather_queries", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.institutions.run_query", new=Mock())
+    @patch("hipeac_mcp.tools.institutions.metadata_cache", new=Mock())
+    @patch("hipeac_mcp.tools.institutions.content_types")
+    async def test_database_search(self, mock_ct, mock_gather):
+        """Test topics are counted once per member of each institution of the page."""
+        from hipeac_mcp.cache import MetadataTable
+        from hipeac_mcp.schemas.metadata import MetadataItem
+        from hipeac_mcp.tools.institutions import search_institutions
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+        metadata = MetadataTable.build(
+            {
+                "topic": {42: MetadataItem(id=42, value="Compilers")},
+                "institution_type": {100: MetadataItem(id=100, value="University")},
+            },
+            (2, 100),
+            0,
+        )
+        page = [
+            Mock(id=10, country="BE", type_id=100, member_count=2),
+            Mock(id=11, country="ES", type_id=None, member_count=1),
+        ]
+        page[0].name, page[1].name = "Ghent University", "BSC"
+        mock_gather.side_effect = [
+            [page, 2],
+            [[(10, 1), (10, 2), (10, 2), (11, 3)], [(1, 42), (2, 42), (2, 43), (3, 43)], metadata],
+        ]
+
+        with patch("hipeac_mcp.tools.institutions.get_snapshot", return_value=None):
+            result = await search_institutions(countries=["be", "es"])
+
+        assert result.total == 2
+        ghent, bsc = result.institutions
+        assert ghent.type is not None and ghent.type.value == "University"
+        assert [(topic.value, topic.label, topic.count) for topic in ghent.top_topics] == [
+            (42, "Compilers", 2),
+            (43, None, 1),
+        ]
+        assert bsc.type is None
+        assert [(topic.value, topic.count) for topic in bsc.top_topics] == [(43, 1)]
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.metadata_cache", new=AsyncMock())
+    @patch("hipeac_mcp.tools.institutions.gather_queries", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.institutions.run_query", new=Mock())
+    @patch("hipeac_mcp.tools.institutions.content_types")
+    async def test_database_no_results(self, mock_ct, mock_gather):
+        """Test nothing more is queried when no institution matches, and a negative limit is raised to one."""
+        from hipeac_mcp.tools.institutions import search_institutions
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+        mock_gather.return_value = [[], 0]
+
+        with patch("hipeac_mcp.tools.institutions.get_snapshot", return_value=None):
+            result = await search_institutions(query="nowhere", limit=-5)
+
+        assert (result.total, result.limit) == (0, 1)
+        assert result.institutions == []
+        mock_gather.assert_awaited_once()
@@ -6,16 +6,6 @@ from unittest.mock import AsyncMock, MagicMock, Mock, patch
 import pytest
 
 
-def make_async_iterator(items):
-    """Helper to create an async iterator from a list."""
-
-    async def async_gen():
-        for item in items:
-            yield item
-
-    return async_gen()
-
-
 class TestMemberTools:
     """Tests for member tools."""
 
@@ -26,26 +16,26 @@ class TestMemberTools:
         assert callable(search_members)
 
     @pytest.mark.asyncio
-    @patch("hipeac_mcp.tools.members._ensure_metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
     @patch("hipeac_mcp.tools.members.RelInstitution")
     @patch("hipeac_mcp.tools.members.RelTopic")
     @patch("hipeac_mcp.tools.members.RelApplicationArea")
     @patch("hipeac_mcp.tools.members.User")
-    @patch("hipeac_mcp.tools.members.ContentType")
+    @patch("hipeac_mcp.tools.members.content_types")
     async def test_search_members_no_results(
         self, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_cache
     ):
         """Test search_members returns message when no results found."""
         from hipeac_mcp.tools.members import search_members
 
-        mock_ct.objects.aget = AsyncMock(return_value=MagicMock(id=1))
+        mock_ct.get_id = AsyncMock(return_value=1)
 
         mock_qs = MagicMock()
         mock_qs.distinct.return_value = mock_qs
-        mock_qs.select_related.return_value = mock_qs
-        mock_qs.prefetch_related.return_value = mock_qs
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
         mock_qs.filter.return_value = mock_qs
-        mock_qs.__getitem__.return_value.__aiter__ = lambda self: make_async_iterator([])
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
 
         mock_user.objects.filter.return_value = mock_qs
 
@@ -55,19 +45,20 @@ class TestMemberTools:
         assert result.members == []
 
     @pytest.mark.asyncio
-    @patch("hipeac_mcp.tools.members._ensure_metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
     @patch("hipeac_mcp.tools.members.RelInstitution")
     @patch("hipeac_mcp.tools.members.RelTopic")
     @patch("hipeac_mcp.tools.members.RelApplicationArea")
     @patch("hipeac_mcp.tools.members.User")
-    @patch("hipeac_mcp.tools.members.ContentType")
+    @patch("hipeac_mcp.tools.members.content_types")
+    @patch("hipeac_mcp.tools.members.Membership")
     async def test_search_members_with_results(
-        self, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_cache
+        self, mock_membership, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_cache
     ):
         """Test search_members returns formatted results."""
         from hipeac_mcp.tools.members import search_members
 
-        mock_ct.objects.aget = AsyncMock(return_value=MagicMock(id=1))
+        mock_ct.get_id = AsyncMock(return_value=1)
 
         mock_member = Mock()
         mock_member.id = 1
@@ -77,32 +68,32 @@ class TestMemberTools:
         mock_member.profile.institution.name = "Test University"
         mock_member.profile.institution.country = "BE"
 
-        # Mock memberships.filter() to return async iterator
-        mock_memberships = MagicMock()
-        mock_memberships.__aiter__ = lambda self: make_async_iterator([])
-        mock_member.memberships.filter.return_value = mock_memberships
-
         mock_qs = MagicMock()
         mock_qs.distinct.return_value = mock_qs
-        mock_qs.select_related.return_value = mock_qs
-        mock_qs.prefetch_related.return_value = mock_qs
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
         mock_qs.filter.return_value = mock_qs
-        mock_qs.__getitem__.return_value.__aiter__ = lambda self: make_async_iterator([mock_member])
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([mock_member])
 
         mock_user.objects.filter.return_value = mock_qs
 
-        # Mock the relation queries for profile details
+        # Mock the batched relation queries for profile details
         mock_rel_inst_result = MagicMock()
-        mock_rel_inst_result.__aiter__ = lambda self: make_async_iterator([])
+        mock_rel_inst_result.__iter__ = lambda self: iter([])
         mock_rel_inst.objects.filter.return_value.select_related.return_value = mock_rel_inst_result
 
         mock_rel_topic_result = MagicMock()
-        mock_rel_topic_result.__aiter__ = lambda self: make_async_iterator([])
-        mock_rel_topic.objects.filter.return_value.select_related.return_value = mock_rel_topic_result
+        mock_rel_topic_result.__iter__ = lambda self: iter([])
+        mock_rel_topic.objects.filter.return_value.values_list.return_value = mock_rel_topic_result
 
         mock_rel_area_result = MagicMock()
-        mock_rel_area_result.__aiter__ = lambda self: make_async_iterator([])
-        mock_rel_area.objects.filter.return_value.select_related.return_value = mock_rel_area_result
+        mock_rel_area_result.__iter__ = lambda self: iter([])
+        mock_rel_area.objects.filter.return_value.values_list.return_value = mock_rel_area_result
+
+        mock_membership_result = MagicMock()
+        mock_membership_result.__iter__ = lambda self: iter([(1, "member")])
+        memberships = mock_membership.objects.active.return_value.filter.return_value
+        memberships.order_by.return_value.values_list.return_value = mock_membership_result
 
         result = await search_members(query="Jane")
 
@@ -112,14 +103,15 @@ class TestMemberTools:
         assert result.members[0].last_name == "Smith"
         assert result.members[0].username == "jsmith"
         assert str(result.members[0].profile_url) == "https://www.hipeac.net/~jsmith/"
+        assert result.members[0].membership == "member"
 
     @pytest.mark.asyncio
-    @patch("hipeac_mcp.tools.members._ensure_metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
     @patch("hipeac_mcp.tools.members.RelInstitution")
     @patch("hipeac_mcp.tools.members.RelTopic")
     @patch("hipeac_mcp.tools.members.RelApplicationArea")
     @patch("hipeac_mcp.tools.members.User")
-    @patch("hipeac_mcp.tools.members.ContentType")
+    @patch("hipeac_mcp.tools.members.content_types")
     async def test_search_members_with_topic_filter(
         self, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_cache
     ):
@@ -127,55 +119,86 @@ class TestMemberTools:
         from hipeac_mcp.schemas.members import MemberSearchResponse
         from hipeac_mcp.tools.members import search_members
 
-        mock_ct.objects.aget = AsyncMock(return_value=MagicMock(id=1))
+        mock_ct.get_id = AsyncMock(return_value=1)
 
         mock_topic_qs = MagicMock()
         mock_values_list = MagicMock()
-        mock_values_list.__aiter__ = lambda self: make_async_iterator([1, 2])
+        mock_values_list.__iter__ = lambda self: iter([1, 2])
         mock_topic_qs.values_list.return_value = mock_values_list
         mock_rel_topic.objects.filter.return_value = mock_topic_qs
 
         mock_qs = MagicMock()
         mock_qs.distinct.return_value = mock_qs
         mock_qs.filter.return_value = mock_qs
-        mock_qs.select_related.return_value = mock_qs
-        mock_qs.prefetch_related.return_value = mock_qs
-        mock_qs.__getitem__.return_value.__aiter__ = lambda self: make_async_iterator([])
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
 
         mock_user.objects.filter.return_value = mock_qs
 
         result = await search_members(topic_ids=[42])
 
         mock_rel_topic.objects.filter.assert_called()
+        assert mock_rel_topic.objects.filter.call_args.kwargs["topic_id__in"] == [42]
         assert isinstance(result, MemberSearchResponse)
         assert result.total == 0
 
     @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.RelInstitution")
+    @patch("hipeac_mcp.tools.members.RelTopic")
+    @patch("hipeac_mcp.tools.members.RelApplicationArea")
+    @patch("hipeac_mcp.tools.members.User")
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_search_members_filter_matching_nobody_is_applied(
+        self, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_cache
+    ):
+        """Test a relation filter is pushed into the query even if no relation row matches."""
+        from hipeac_mcp.tools.members import search_members
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+
+        mock_qs = MagicMock()
+        mock_qs.filter.return_value = mock_qs
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
+
+        mock_user.objects.filter.return_value = mock_qs
+
+        result = await search_members(topic_ids=[999])
+
+        mock_qs.filter.assert_called_once()
+        mock_rel_topic.objects.filter.return_value.values_list.assert_not_called()
+        assert result.total == 0
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.metadata_cache", new=AsyncMock())
     @patch("hipeac_mcp.tools.members.RelInstitution")
     @patch("hipeac_mcp.tools.members.RelTopic")
     @patch("hipeac_mcp.tools.members.RelApplicationArea")
     @patch("hipeac_mcp.tools.members.User")
-    @patch("hipeac_mcp.tools.members.ContentType")
+    @patch("hipeac_mcp.tools.members.content_types")
     async def test_search_members_with_country_filter(
         self, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst
     ):
         """Test search_members with country filter."""
         from hipeac_mcp.tools.members import search_members
 
-        mock_ct.objects.aget = AsyncMock(return_value=MagicMock(id=1))
+        mock_ct.get_id = AsyncMock(return_value=1)
 
         mock_inst_qs = MagicMock()
         mock_values_list = MagicMock()
-        mock_values_list.__aiter__ = lambda self: make_async_iterator([1, 2, 3])
+        mock_values_list.__iter__ = lambda self: iter([1, 2, 3])
         mock_inst_qs.values_list.return_value = mock_values_list
         mock_rel_inst.objects.filter.return_value = mock_inst_qs
 
         mock_qs = MagicMock()
         mock_qs.distinct.return_value = mock_qs
         mock_qs.filter.return_value = mock_qs
-        mock_qs.select_related.return_value = mock_qs
-        mock_qs.prefetch_related.return_value = mock_qs
-        mock_qs.__getitem__.return_value.__aiter__ = lambda self: make_async_iterator([])
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
 
         mock_user.objects.filter.return_value = mock_qs
 
@@ -185,42 +208,66 @@ class TestMemberTools:
         mock_qs.filter.assert_called()
 
     @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.metadata_cache", new=AsyncMock())
     @patch("hipeac_mcp.tools.members.RelInstitution")
     @patch("hipeac_mcp.tools.members.RelTopic")
     @patch("hipeac_mcp.tools.members.RelApplicationArea")
     @patch("hipeac_mcp.tools.members.User")
-    @patch("hipeac_mcp.tools.members.ContentType")
+    @patch("hipeac_mcp.tools.members.content_types")
     async def test_search_members_limit_enforced(
         self, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst
     ):
         """Test search_members enforces max limit of 100."""
         from hipeac_mcp.tools.members import search_members
 
-        mock_ct.objects.aget = AsyncMock(return_value=MagicMock(id=1))
+        mock_ct.get_id = AsyncMock(return_value=1)
 
         # Mock user queryset
         mock_qs = MagicMock()
         mock_qs.distinct.return_value = mock_qs
         mock_qs.filter.return_value = mock_qs
-        mock_qs.select_related.return_value = mock_qs
-        mock_qs.prefetch_related.return_value = mock_qs
-        mock_qs.__getitem__.return_value.__aiter__ = lambda self: make_async_iterator([])
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
 
         mock_user.objects.filter.return_value = mock_qs
 
-        await search_members(limit=200)
+        result = await search_members(limit=200)
 
         mock_qs.__getitem__.assert_called()
         call_args = mock_qs.__getitem__.call_args
-        assert call_args[0][0].stop == 100
+        assert call_args[0][0].stop == 101  # one extra row tells whether there is a next page
+        assert result.limit == 100
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("limit", [0, -5])
+    @patch("hipeac_mcp.tools.members.metadata_cache", new=AsyncMock())
+    @patch("hipeac_mcp.tools.members.User")
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_search_members_limit_at_least_one(self, mock_ct, mock_user, limit):
+        """Test search_members raises a zero or negative limit to one."""
+        from hipeac_mcp.tools.members import search_members
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+        mock_qs = MagicMock()
+        mock_qs.filter.return_value = mock_qs
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
+        mock_user.objects.filter.return_value = mock_qs
+
+        result = await search_members(limit=limit)
+
+        assert mock_qs.__getitem__.call_args[0][0].stop == 2
+        assert (result.total, result.limit, result.members) == (0, 1, [])
 
     @pytest.mark.asyncio
-    @patch("hipeac_mcp.tools.members._ensure_metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
     @patch("hipeac_mcp.tools.members.RelInstitution")
     @patch("hipeac_mcp.tools.members.RelTopic")
     @patch("hipeac_mcp.tools.members.RelApplicationArea")
     @patch("hipeac_mcp.tools.members.User")
-    @patch("hipeac_mcp.tools.members.ContentType")
+    @patch("hipeac_mcp.tools.members.content_types")
     async def test_search_members_with_application_area_filter(
         self, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_cache
     ):
@@ -228,20 +275,20 @@ class TestMemberTools:
         from hipeac_mcp.schemas.members import MemberSearchResponse
         from hipeac_mcp.tools.members import search_members
 
-        mock_ct.objects.aget = AsyncMock(return_value=MagicMock(id=1))
+        mock_ct.get_id = AsyncMock(return_value=1)
 
         mock_area_qs = MagicMock()
         mock_area_values = MagicMock()
-        mock_area_values.__aiter__ = lambda self: make_async_iterator([5, 6])
+        mock_area_values.__iter__ = lambda self: iter([5, 6])
         mock_area_qs.values_list.return_value = mock_area_values
         mock_rel_area.objects.filter.return_value = mock_area_qs
 
         mock_qs = MagicMock()
         mock_qs.distinct.return_value = mock_qs
         mock_qs.filter.return_value = mock_qs
-        mock_qs.select_related.return_value = mock_qs
-        mock_qs.prefetch_related.return_value = mock_qs
-        mock_qs.__getitem__.return_value.__aiter__ = lambda self: make_async_iterator([])
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
 
         mock_user.objects.filter.return_value = mock_qs
 
@@ -252,12 +299,12 @@ class TestMemberTools:
         assert result.total == 0
 
     @pytest.mark.asyncio
-    @patch("hipeac_mcp.tools.members._ensure_metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
     @patch("hipeac_mcp.tools.members.RelInstitution")
     @patch("hipeac_mcp.tools.members.RelTopic")
     @patch("hipeac_mcp.tools.members.RelApplicationArea")
     @patch("hipeac_mcp.tools.members.User")
-    @patch("hipeac_mcp.tools.members.ContentType")
+    @patch("hipeac_mcp.tools.members.content_types")
     async def test_search_members_with_institution_type_filter(
         self, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_cache
     ):
@@ -265,20 +312,20 @@ class TestMemberTools:
         from hipeac_mcp.schemas.members import MemberSearchResponse
         from hipeac_mcp.tools.members import search_members
 
-        mock_ct.objects.aget = AsyncMock(return_value=MagicMock(id=1))
+        mock_ct.get_id = AsyncMock(return_value=1)
 
         mock_inst_qs = MagicMock()
         mock_inst_values = MagicMock()
-        mock_inst_values.__aiter__ = lambda self: make_async_iterator([10, 11])
+        mock_inst_values.__iter__ = lambda self: iter([10, 11])
         mock_inst_qs.values_list.return_value = mock_inst_values
         mock_rel_inst.objects.filter.return_value = mock_inst_qs
 
         mock_qs = MagicMock()
         mock_qs.distinct.return_value = mock_qs
         mock_qs.filter.return_value = mock_qs
-        mock_qs.select_related.return_value = mock_qs
-        mock_qs.prefetch_related.return_value = mock_qs
-        mock_qs.__getitem__.return_value.__aiter__ = lambda self: make_async_iterator([])
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
 
         mock_user.objects.filter.return_value = mock_qs
 
@@ -289,46 +336,49 @@ class TestMemberTools:
         assert result.total == 0
 
     @pytest.mark.asyncio
-    @patch("hipeac_mcp.tools.members._ensure_metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
     @patch("hipeac_mcp.tools.members.RelInstitution")
     @patch("hipeac_mcp.tools.members.RelTopic")
     @patch("hipeac_mcp.tools.members.RelApplicationArea")
     @patch("hipeac_mcp.tools.members.User")
-    @patch("hipeac_mcp.tools.members.ContentType")
+    @patch("hipeac_mcp.tools.members.content_types")
+    @patch("hipeac_mcp.tools.members.Membership")
     async def test_search_members_with_membership_type_filter(
-        self, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_cache
+        self, mock_membership, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_cache
     ):
         """Test search_members with membership type filter."""
         from hipeac_mcp.schemas.members import MemberSearchResponse
         from hipeac_mcp.tools.members import search_members
 
-        mock_ct.objects.aget = AsyncMock(return_value=MagicMock(id=1))
+        mock_ct.get_id = AsyncMock(return_value=1)
 
         # Mock user queryset
         mock_qs = MagicMock()
         mock_qs.distinct.return_value = mock_qs
         mock_qs.filter.return_value = mock_qs
-        mock_qs.select_related.return_value = mock_qs
-        mock_qs.prefetch_related.return_value = mock_qs
-        mock_qs.__getitem__.return_value.__aiter__ = lambda self: make_async_iterator([])
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.alias.return_value = mock_qs
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
 
         mock_user.objects.filter.return_value = mock_qs
 
         result = await search_members(membership_types=["member", "associated_member"])
 
-        assert mock_qs.filter.call_count == 1
-        call_args = mock_qs.filter.call_args
-        assert "memberships__type__in" in str(call_args)
+        # Only the first active membership of a user by id counts, as in the snapshot
+        mock_qs.filter.assert_called_once_with(membership_type__in=["associated_member", "member"])
+        memberships = mock_membership.objects.active.return_value.filter.return_value
+        memberships.order_by.assert_called_once_with("id")
         assert isinstance(result, MemberSearchResponse)
         assert result.total == 0
 
     @pytest.mark.asyncio
-    @patch("hipeac_mcp.tools.members._ensure_metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
     @patch("hipeac_mcp.tools.members.RelInstitution")
     @patch("hipeac_mcp.tools.members.RelTopic")
     @patch("hipeac_mcp.tools.members.RelApplicationArea")
     @patch("hipeac_mcp.tools.members.User")
-    @patch("hipeac_mcp.tools.members.ContentType")
+    @patch("hipeac_mcp.tools.members.content_types")
     async def test_search_members_with_numeric_topic_id(
         self, mock_ct, mock_user, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_cache
     ):
@@ -336,20 +386,20 @@ class TestMemberTools:
         from hipeac_mcp.schemas.members import MemberSearchResponse
         from hipeac_mcp.tools.members import search_members
 
-        mock_ct.objects.aget = AsyncMock(return_value=MagicMock(id=1))
+        mock_ct.get_id = AsyncMock(return_value=1)
 
         mock_topic_qs = MagicMock()
         mock_topic_values = MagicMock()
-        mock_topic_values.__aiter__ = lambda self: make_async_iterator([1])
+        mock_topic_values.__iter__ = lambda self: iter([1])
         mock_topic_qs.values_list.return_value = mock_topic_values
         mock_rel_topic.objects.filter.return_value = mock_topic_qs
 
         mock_qs = MagicMock()
         mock_qs.distinct.return_value = mock_qs
         mock_qs.filter.return_value = mock_qs
-        mock_qs.select_related.return_value = mock_qs
-        mock_qs.prefetch_related.return_value = mock_qs
-        mock_qs.__getitem__.return_value.__aiter__ = lambda self: make_async_iterator([])
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
 
         mock_user.objects.filter.return_value = mock_qs
 
@@ -374,6 +424,374 @@ class TestMemberTools:
         assert "limit" in sig.parameters
 
 
+class TestMemberPagination:
+    """Tests for totals and cursors in search_members."""
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members._hydrate_members", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.User")
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_full_page_counts_and_returns_cursor(self, mock_ct, mock_user, mock_cache, mock_hydrate):
+        """Test a full page reports the real total and a cursor on the last member."""
+        from hipeac_mcp.tools.members import _decode_cursor, search_members
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+        users = [Mock(id=i, last_name=f"Last{i}") for i in range(3)]
+
+        mock_qs = MagicMock()
+        mock_qs.filter.return_value = mock_qs
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.count.return_value = 57
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter(users)
+        mock_user.objects.filter.return_value = mock_qs
+        mock_hydrate.return_value = []
+
+        result = await search_members(limit=2)
+
+        mock_qs.order_by.assert_called_once_with("last_name", "id")
+        assert mock_hydrate.call_args.args[0] == users[:2]
+        assert result.total == 57
+        assert _decode_cursor(result.next_cursor, False) == (0, "Last1", 1)
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.metadata_cache", new=AsyncMock())
+    @patch("hipeac_mcp.tools.members.User")
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_cursor_is_applied_as_keyset(self, mock_ct, mock_user):
+        """Test a cursor becomes a (last_name, id) keyset condition."""
+        from hipeac_mcp.tools.members import _encode_cursor, search_members
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+
+        mock_qs = MagicMock()
+        mock_qs.filter.return_value = mock_qs
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.count.return_value = 21
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
+        mock_user.objects.filter.return_value = mock_qs
+
+        result = await search_members(cursor=_encode_cursor((0, "Smith", 12), False))
+
+        keyset = mock_qs.filter.call_args.args[0]
+        assert "('last_name__gt', 'Smith')" in str(keyset)
+        assert "('id__gt', 12)" in str(keyset)
+        assert result.total == 21
+        assert result.next_cursor is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "W10=", "eyJhIjoxfQ=="])
+    async def test_invalid_cursor(self, cursor):
+        """Test malformed cursors are rejected with a clear error."""
+        from hipeac_mcp.tools.members import search_members
+
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            await search_members(cursor=cursor)
+
+    @pytest.mark.asyncio
+    async def test_snapshot_pages(self, directory_snapshot):
+        """Test cursors walk through snapshot results page by page."""
+        from hipeac_mcp.tools.members import search_members
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot):
+            first = await search_members(limit=2)
+            second = await search_members(limit=2, cursor=first.next_cursor)
+
+        assert first.total == second.total == 3
+        assert [member.username for member in first.members] == ["agarcia", "hmuller"]
+        assert [member.username for member in second.members] == ["jsmith"]
+        assert second.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_cursor_of_other_source_is_rejected(self, directory_snapshot):
+        """Test a database cursor does not resume a snapshot search, which ranks text matches first."""
+        from hipeac_mcp.tools.members import _encode_cursor, search_members
+
+        with (
+            patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot),
+            pytest.raises(ValueError, match="search again without a cursor"),
+        ):
+            await search_members(query="smith", cursor=_encode_cursor((0, "Garcia", 1), False))
+
+
+class TestMemberCoalescing:
+    """Tests for coalescing identical concurrent search_members calls."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("calls", [2, 10])
+    @patch("hipeac_mcp.tools.members._hydrate_members", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.User")
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_concurrent_identical_calls_query_once(self, mock_ct, mock_user, mock_cache, mock_hydrate, calls):
+        """Test N concurrent identical searches run the database pipeline once and share its response."""
+        import asyncio
+
+        from hipeac_mcp.tools.members import search_members
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+        mock_qs = MagicMock()
+        mock_qs.filter.return_value = mock_qs
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([Mock(id=1, last_name="Smith")])
+        mock_user.objects.filter.return_value = mock_qs
+        mock_hydrate.return_value = []
+
+        results = await asyncio.gather(
+            *(search_members(topic_ids=[42]) for _ in range(calls - 1)), search_members(None, [42])
+        )
+
+        assert mock_user.objects.filter.call_count == 1
+        assert mock_hydrate.call_count == 1
+        assert all(result is results[0] for result in results)
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members._hydrate_members", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.User")
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_different_calls_are_not_coalesced(self, mock_ct, mock_user, mock_cache, mock_hydrate):
+        """Test concurrent searches with different arguments each run their own query."""
+        import asyncio
+
+        from hipeac_mcp.tools.members import search_members
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+        mock_qs = MagicMock()
+        mock_qs.filter.return_value = mock_qs
+        mock_qs.only.return_value = mock_qs
+        mock_qs.order_by.return_value = mock_qs
+        mock_qs.__getitem__.return_value.__iter__ = lambda self: iter([])
+        mock_user.objects.filter.return_value = mock_qs
+        mock_hydrate.return_value = []
+
+        await asyncio.gather(search_members(topic_ids=[42]), search_members(topic_ids=[43]))
+
+        assert mock_user.objects.filter.call_count == 2
+
+
+class TestMemberResultCache:
+    """Tests for the search_members result cache."""
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members._search_snapshot")
+    async def test_equivalent_arguments_share_a_cached_result(self, mock_search, directory_snapshot):
+        """Test argument forms differing only in order, case or emptiness hit the same entry."""
+        from hipeac_mcp.directory import Facet
+        from hipeac_mcp.schemas.members import MemberSearchResponse
+        from hipeac_mcp.tools.members import search_members
+
+        mock_search.side_effect = lambda *args: MemberSearchResponse(total=0, limit=args[4], members=[])
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot):
+            first = await search_members(topic_ids=[43, 42], countries=["be", "ES"], application_area_ids=[])
+            second = await search_members(query=" ", topic_ids=[42, 43, 42], countries=["ES", "BE"], limit=500)
+            third = await search_members(topic_ids=[42, 43], countries=["ES", "BE"], limit=100)
+
+        assert mock_search.call_count == 2
+        assert second is third
+        assert first is not second
+        assert mock_search.call_args.args[2][Facet.COUNTRY] == ["BE", "ES"]
+
+    @pytest.mark.asyncio
+    async def test_new_snapshot_invalidates(self, directory_rows):
+        """Test results cached for an older snapshot are not served from a newer one."""
+        from hipeac_mcp.directory import build_snapshot
+        from hipeac_mcp.tools.members import search_members
+
+        old, new = build_snapshot(directory_rows), build_snapshot(directory_rows)
+        new.built_at = old.built_at + 1
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=old):
+            first = await search_members()
+            assert await search_members() is first
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=new):
+            assert await search_members() is not first
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members._search_database", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.get_snapshot", return_value=None)
+    async def test_first_database_result_is_cached(self, mock_snapshot, mock_search):
+        """Test the first database result is cached under the metadata version, even on a cold metadata cache."""
+        from hipeac_mcp.cache import MetadataCache, MetadataTable
+        from hipeac_mcp.schemas.members import MemberSearchResponse
+        from hipeac_mcp.tools.members import search_members
+
+        cache = MetadataCache(ttl=60, max_age=3600)
+        cache._load = AsyncMock(side_effect=lambda now: MetadataTable.build({}, (0, None), now))
+
+        async def search(*args):
+            await cache.get()
+            return MemberSearchResponse(total=0, limit=20, members=[])
+
+        mock_search.side_effect = search
+
+        with patch("hipeac_mcp.tools.members.metadata_cache", cache):
+            first = await search_members()
+            second = await search_members()
+
+        assert second is first
+        mock_search.assert_called_once()
+
+
+class CountingQuerySet:
+    """Queryset stand-in that records every evaluation as one database query."""
+
+    def __init__(self, rows, counter):
+        self.rows = rows
+        self.counter = counter
+
+    def active(self):
+        return self
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    def select_related(self, *fields):
+        return self
+
+    def order_by(self, *fields):
+        return self
+
+    def values_list(self, *fields):
+        return self
+
+    def __iter__(self):
+        self.counter["queries"] += 1
+        return iter(self.rows)
+
+
+class TestMemberHydration:
+    """Tests for batched member profile hydration."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("page_size", [1, 20, 100])
+    @patch("hipeac_mcp.tools.members.Membership")
+    @patch("hipeac_mcp.tools.members.RelInstitution")
+    @patch("hipeac_mcp.tools.members.RelTopic")
+    @patch("hipeac_mcp.tools.members.RelApplicationArea")
+    async def test_hydrate_members_query_count_is_constant(
+        self, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_membership, page_size
+    ):
+        """Test hydration issues one query per relation regardless of page size."""
+        from hipeac_mcp.cache import MetadataTable
+        from hipeac_mcp.schemas.metadata import MetadataItem
+        from hipeac_mcp.tools import members as members_module
+
+        counter = {"queries": 0}
+        users = [Mock(id=i, username=f"user{i}", first_name="First", last_name=f"Last{i}") for i in range(page_size)]
+        institution = Mock(country="BE", type_id=None)
+        institution.name = "Test University"
+
+        mock_rel_inst.objects = CountingQuerySet(
+            [Mock(object_id=u.id, institution=institution) for u in users], counter
+        )
+        mock_rel_topic.objects = CountingQuerySet([(u.id, 42) for u in users], counter)
+        mock_rel_area.objects = CountingQuerySet([(u.id, 7) for u in users], counter)
+        mock_membership.objects = CountingQuerySet([(u.id, "member") for u in users], counter)
+
+        metadata = MetadataTable.build({"topic": {42: MetadataItem(id=42, value="Compilers")}}, (1, 42), 0)
+
+        profiles = await members_module._hydrate_members(users, 1, metadata)
+
+        assert counter["queries"] == 4
+        assert [p.username for p in profiles] == [u.username for u in users]
+        assert all(p.topics and p.topics[0].value == "Compilers" for p in profiles)
+        assert all(p.application_areas is None for p in profiles)
+        assert all(p.institutions and p.institutions[0].country == "BE" for p in profiles)
+        assert all(p.membership == "member" for p in profiles)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("detail", "queries"), [("summary", 0), ("standard", 2), ("full", 4)])
+    @patch("hipeac_mcp.tools.members.Membership")
+    @patch("hipeac_mcp.tools.members.RelInstitution")
+    @patch("hipeac_mcp.tools.members.RelTopic")
+    @patch("hipeac_mcp.tools.members.RelApplicationArea")
+    async def test_hydrate_members_queries_requested_relations(
+        self, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_membership, detail, queries
+    ):
+        """Test lower detail levels skip the queries of the relations they leave out."""
+        from hipeac_mcp.cache import MetadataTable
+        from hipeac_mcp.schemas.members import DetailLevel
+        from hipeac_mcp.tools import members as members_module
+
+        counter = {"queries": 0}
+        user = Mock(id=1, username="jsmith", first_name="Jane", last_name="Smith")
+        institution = Mock(country="BE", type_id=None)
+        institution.name = "Ghent University"
+        mock_rel_inst.objects = CountingQuerySet([Mock(object_id=1, institution=institution)], counter)
+        mock_rel_topic.objects = CountingQuerySet([], counter)
+        mock_rel_area.objects = CountingQuerySet([], counter)
+        mock_membership.objects = CountingQuerySet([(1, "member")], counter)
+        metadata = MetadataTable.build({}, (0, None), 0)
+
+        [profile] = await members_module._hydrate_members([user], 1, metadata, DetailLevel(detail))
+
+        assert counter["queries"] == queries
+        assert profile.username == "jsmith"
+        assert (profile.membership is None) == (detail == "summary")
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.Membership")
+    @patch("hipeac_mcp.tools.members.RelInstitution")
+    async def test_first_active_membership_by_id(self, mock_rel_inst, mock_membership):
+        """Test the membership of a profile is the first active one by id, like in the snapshot."""
+        from hipeac_mcp.cache import MetadataTable
+        from hipeac_mcp.schemas.members import DetailLevel
+        from hipeac_mcp.tools import members as members_module
+
+        mock_rel_inst.objects = CountingQuerySet([], {"queries": 0})
+        memberships = mock_membership.objects.active.return_value.filter.return_value
+        memberships.order_by.return_value.values_list.return_value = [(1, "associated_member"), (1, "member")]
+        user = Mock(id=1, username="jsmith", first_name="Jane", last_name="Smith")
+
+        [profile] = await members_module._hydrate_members(
+            [user], 1, MetadataTable.build({}, (0, None), 0), DetailLevel.STANDARD
+        )
+
+        memberships.order_by.assert_called_once_with("id")
+        assert profile.membership == "associated_member"
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.Membership")
+    @patch("hipeac_mcp.tools.members.RelInstitution")
+    @patch("hipeac_mcp.tools.members.RelTopic")
+    @patch("hipeac_mcp.tools.members.RelApplicationArea")
+    async def test_profiles_match_validated_models(self, mock_rel_area, mock_rel_topic, mock_rel_inst, mock_membership):
+        """Test profiles built without validation are equal to, and serialize like, validated ones."""
+        from hipeac_mcp.cache import MetadataTable
+        from hipeac_mcp.schemas.members import Member
+        from hipeac_mcp.schemas.metadata import MetadataItem
+        from hipeac_mcp.tools import members as members_module
+
+        counter = {"queries": 0}
+        user = Mock(id=1, username="jsmith", first_name="Jane", last_name="Smith")
+        institution = Mock(country="BE", type_id=100)
+        institution.name = "Ghent University"
+        mock_rel_inst.objects = CountingQuerySet([Mock(object_id=1, institution=institution)], counter)
+        mock_rel_topic.objects = CountingQuerySet([(1, 42)], counter)
+        mock_rel_area.objects = CountingQuerySet([], counter)
+        mock_membership.objects = CountingQuerySet([(1, "member")], counter)
+        metadata = MetadataTable.build(
+            {
+                "topic": {42: MetadataItem(id=42, value="Compilers")},
+                "institution_type": {100: MetadataItem(id=100, value="University")},
+            },
+            (2, 100),
+            0,
+        )
+
+        [profile] = await members_module._hydrate_members([user], 1, metadata)
+        validated = Member.model_validate(profile.model_dump())
+
+        assert profile == validated
+        assert profile.model_dump_json() == validated.model_dump_json()
+        assert profile.topics[0] is metadata.item("topic", 42)
+
+
 class TestMemberModels:
     """Tests for member-related Django models."""
 
@@ -412,3 +830,424 @@ class TestMemberModels:
         from hipeac_mcp.models import RelInstitution
 
         assert RelInstitution is not None
+
+
+class TestSnapshotSearch:
+    """Tests for search_members answered from the directory snapshot."""
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.User")
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_search_members_uses_snapshot(self, mock_ct, mock_user, directory_snapshot):
+        """Test the database is not queried when a snapshot is available."""
+        from hipeac_mcp.tools.members import search_members
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot):
+            result = await search_members(topic_ids=[42], countries=["be"])
+
+        mock_ct.get_id.assert_not_called()
+        mock_user.objects.filter.assert_not_called()
+        assert [member.username for member in result.members] == ["hmuller", "jsmith"]
+
+    @pytest.mark.asyncio
+    async def test_search_members_snapshot_profile(self, directory_snapshot):
+        """Test snapshot profiles carry the same details as database profiles."""
+        from hipeac_mcp.tools.members import search_members
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot):
+            result = await search_members(query="jane")
+
+        assert result.total == 1
+        jane = result.members[0]
+        assert str(jane.profile_url) == "https://www.hipeac.net/~jsmith/"
+        assert jane.membership == "member"
+        assert jane.institutions is not None
+        assert jane.institutions[0].name == "Ghent University"
+        assert jane.institutions[0].type is not None
+        assert jane.institutions[0].type.value == "University"
+        assert [topic.value for topic in jane.topics or []] == ["Compilers"]
+        assert [area.value for area in jane.application_areas or []] == ["Healthcare"]
+
+    @pytest.mark.asyncio
+    async def test_search_members_snapshot_membership_filter_and_limit(self, directory_snapshot):
+        """Test membership type filtering and the limit on the snapshot path."""
+        from hipeac_mcp.tools.members import search_members
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot):
+            filtered = await search_members(membership_types=["affiliated_phd", "member"])
+            limited = await search_members(limit=1)
+
+        assert [member.username for member in filtered.members] == ["agarcia", "jsmith"]
+        assert [member.username for member in limited.members] == ["agarcia"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("limit", [0, -5])
+    async def test_search_members_snapshot_limit_at_least_one(self, directory_snapshot, limit):
+        """Test a zero or negative limit returns a page of one member on the snapshot path."""
+        from hipeac_mcp.tools.members import search_members
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot):
+            result = await search_members(limit=limit)
+
+        assert [member.username for member in result.members] == ["agarcia"]
+        assert (result.total, result.limit) == (3, 1)
+        assert result.next_cursor is not None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("detail", "fields"),
+        [
+            ("summary", set()),
+            ("standard", {"membership", "institutions"}),
+            ("full", {"membership", "institutions", "topics", "application_areas"}),
+        ],
+    )
+    async def test_search_members_snapshot_detail(self, directory_snapshot, detail, fields):
+        """Test each detail level returns its profile fields, and is cached apart from the others."""
+        from hipeac_mcp.tools.members import search_members
+
+        optional = {"membership", "institutions", "topics", "application_areas"}
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot):
+            await search_members(query="jane", detail="summary" if detail != "summary" else "full")
+            result = await search_members(query="jane", detail=detail)
+
+        jane = result.members[0]
+        assert {field for field in optional if getattr(jane, field) is not None} == fields
+        assert str(jane.profile_url) == "https://www.hipeac.net/~jsmith/"
+
+
+class TestMemberFacets:
+    """Tests for the member_facets tool."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_counts(self, directory_snapshot):
+        """Test counts are labelled and ordered by decreasing count, then value."""
+        from hipeac_mcp.tools.members import member_facets
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot):
+            result = await member_facets()
+
+        assert result.total == 3
+        assert [(facet.value, facet.label, facet.count) for facet in result.topics] == [
+            (42, "Compilers", 2),
+            (43, "Computer architecture", 1),
+        ]
+        assert [(facet.value, facet.label, facet.count) for facet in result.countries] == [
+            ("BE", None, 2),
+            ("ES", None, 1),
+        ]
+        assert result.membership_types[0].label == "Affiliated PhD student"
+        assert [facet.count for facet in result.membership_types] == [1, 1, 1]
+
+    @pytest.mark.asyncio
+    async def test_filters_and_query(self, directory_snapshot):
+        """Test only members matching the query and filters are counted."""
+        from hipeac_mcp.tools.members import member_facets
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot):
+            result = await member_facets(query="example", topic_ids=[42], countries=["be"])
+
+        assert result.total == 2
+        assert [facet.value for facet in result.institution_types] == [100]
+        assert result.application_areas[0].count == 1
+
+    @pytest.mark.asyncio
+    async def test_equivalent_filters_share_a_cached_result(self, directory_snapshot):
+        """Test filters differing only in order, case or duplicates are counted once."""
+        from hipeac_mcp.tools.members import member_facets
+
+        with (
+            patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot),
+            patch.object(directory_snapshot, "facet_counts", wraps=directory_snapshot.facet_counts) as mock_counts,
+        ):
+            first = await member_facets(countries=["be", "ES"], topic_ids=[43, 42])
+            second = await member_facets(query=" ", countries=["ES", "BE", "BE"], topic_ids=[42, 43])
+
+        assert second is first
+        mock_counts.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.gather_queries", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.run_query", new=Mock())
+    @patch("hipeac_mcp.tools.members._matching_users")
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_database_counts(self, mock_ct, mock_cache, mock_matching, mock_gather):
+        """Test the grouped counts of each facet are gathered into one response."""
+        from hipeac_mcp.cache import MetadataTable
+        from hipeac_mcp.schemas.metadata import MetadataItem
+        from hipeac_mcp.tools.members import member_facets
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+        mock_cache.get.return_value = MetadataTable.build(
+            {"topic": {42: MetadataItem(id=42, value="Compilers")}}, (1, 42), 0
+        )
+        mock_gather.return_value = [5, [(42, 3), (43, 4)], [], [("BE", 5)], [(100, 1)], [("member", 5)]]
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=None):
+            result = await member_facets(topic_ids=[42, 43])
+
+        assert mock_gather.await_args is not None and len(mock_gather.await_args.args) == 6
+        assert result.total == 5
+        assert [(facet.value, facet.label) for facet in result.topics] == [(43, None), (42, "Compilers")]
+        assert result.countries[0].count == 5
+        assert result.membership_types[0].label == "Full member (from EU)"
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.gather_queries", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.run_query", new=Mock())
+    @patch("hipeac_mcp.tools.members._first_membership_type")
+    @patch("hipeac_mcp.tools.members.User")
+    @patch("hipeac_mcp.tools.members._matching_users")
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_database_counts_first_membership(
+        self, mock_ct, mock_cache, mock_matching, mock_user, mock_first, mock_gather
+    ):
+        """Test a member holding two active memberships is counted under the first one only, as in the snapshot."""
+        from hipeac_mcp.tools.members import member_facets
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+        mock_gather.return_value = [1, [], [], [], [], [("associated_member", 1)]]
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=None):
+            result = await member_facets()
+
+        users = mock_matching.return_value.values.return_value
+        mock_user.objects.filter.assert_called_once_with(pk__in=users)
+        mock_user.objects.filter.return_value.annotate.assert_called_once_with(membership_type=mock_first.return_value)
+        assert [(facet.value, facet.count) for facet in result.membership_types] == [("associated_member", 1)]
+
+
+class TestGetMembers:
+    """Tests for the get_members tool."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_lookup(self, aggregated_snapshot):
+        """Test profiles come back in the requested order, once each, with unknown usernames reported."""
+        from hipeac_mcp.tools.members import get_members
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=aggregated_snapshot):
+            result = await get_members(["jsmith", "nobody", "AGARCIA", "jsmith", " ", "former"])
+
+        assert [member.username for member in result.members] == ["jsmith", "agarcia"]
+        assert result.not_found == ["nobody", "former"]
+        assert [topic.value for topic in result.members[0].topics or []] == ["Compilers"]
+
+    @pytest.mark.asyncio
+    async def test_usernames_differing_in_case_are_looked_up_once(self, aggregated_snapshot):
+        """Test usernames differing only in case return one profile, and are reported once when unknown."""
+        from hipeac_mcp.tools.members import get_members
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=aggregated_snapshot):
+            result = await get_members(["JSmith", "jsmith", "Nobody", "NOBODY"])
+
+        assert [member.username for member in result.members] == ["jsmith"]
+        assert result.not_found == ["Nobody"]
+
+    @pytest.mark.asyncio
+    async def test_snapshot_detail(self, aggregated_snapshot):
+        """Test the detail level applies to the profiles."""
+        from hipeac_mcp.tools.members import get_members
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=aggregated_snapshot):
+            result = await get_members(["jsmith"], detail="summary")
+
+        assert result.members[0].institutions is None
+        assert result.members[0].membership is None
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.metadata_cache", new=AsyncMock())
+    @patch("hipeac_mcp.tools.members._lookup_database", new_callable=AsyncMock)
+    async def test_database_until_username_index_is_built(self, mock_lookup, directory_snapshot):
+        """Test the database answers while the username index of the snapshot is built in the background."""
+        from hipeac_mcp.directory import aggregates_ready
+        from hipeac_mcp.tools.members import get_members
+
+        mock_lookup.return_value = {}
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=directory_snapshot):
+            first = await get_members(["jsmith"])
+            await aggregates_ready(directory_snapshot, "ordinals_by_username", wait=True)
+            second = await get_members(["jsmith"])
+
+        mock_lookup.assert_awaited_once_with(["jsmith"], "full")
+        assert first.not_found == ["jsmith"]
+        assert [member.username for member in second.members] == ["jsmith"]
+
+    @pytest.mark.asyncio
+    async def test_too_many_usernames(self):
+        """Test lookups beyond the limit are rejected with a clear error."""
+        from hipeac_mcp.tools.members import MAX_USERNAMES, get_members
+
+        with pytest.raises(ValueError, match="Too many usernames"):
+            await get_members([f"user{i}" for i in range(MAX_USERNAMES + 1)])
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members._hydrate_members", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.metadata_cache", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.User")
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_database_lookup(self, mock_ct, mock_user, mock_cache, mock_hydrate):
+        """Test usernames are resolved with one username__in query and one batched hydration."""
+        from pydantic import HttpUrl
+
+        from hipeac_mcp.schemas.members import Member
+        from hipeac_mcp.tools.members import get_members
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+        users = [Mock(id=2, username="hmuller"), Mock(id=1, username="jsmith")]
+        mock_qs = MagicMock()
+        mock_qs.only.return_value.__iter__ = lambda self: iter(users)
+        mock_user.objects.filter.return_value = mock_qs
+        mock_hydrate.return_value = [
+            Member(username=user.username, first_name="", last_name="", profile_url=HttpUrl("https://hipeac.net/"))
+            for user in users
+        ]
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=None):
+            result = await get_members(["jsmith", "hmuller", "nobody"])
+
+        assert mock_user.objects.filter.call_args.kwargs == {"username__in": ["jsmith", "hmuller", "nobody"]}
+        assert mock_hydrate.call_args.args[0] == users
+        assert [member.username for member in result.members] == ["jsmith", "hmuller"]
+        assert result.not_found == ["nobody"]
+
+
+class TestFindSimilarMembers:
+    """Tests for the find_similar_members tool."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_similar(self, aggregated_snapshot):
+        """Test similar members are ranked by score with what they share with the member."""
+        from hipeac_mcp.tools.members import find_similar_members
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=aggregated_snapshot):
+            result = await find_similar_members("JSmith", detail="summary")
+
+        assert result.member.username == "jsmith"
+        assert [(similar.member.username, similar.score) for similar in result.similar] == [
+            ("hmuller", 0.7071),
+            ("agarcia", 0.428),
+        ]
+        hmuller, agarcia = result.similar
+        assert ([topic.value for topic in hmuller.shared_topics], hmuller.shared_application_areas) == (
+            ["Compilers"],
+            [],
+        )
+        assert (agarcia.shared_topics, [area.value for area in agarcia.shared_application_areas]) == (
+            [],
+            ["Healthcare"],
+        )
+        assert hmuller.member.topics is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("limit", [1, 0, -5])
+    async def test_limit(self, aggregated_snapshot, limit):
+        """Test only the most similar members are returned, and always at least one."""
+        from hipeac_mcp.tools.members import find_similar_members
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=aggregated_snapshot):
+            result = await find_similar_members("jsmith", limit=limit)
+
+        assert [similar.member.username for similar in result.similar] == ["hmuller"]
+        assert [topic.value for topic in result.similar[0].member.topics or []] == ["Compilers"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_member(self, aggregated_snapshot):
+        """Test a username of no active member is rejected with a clear error."""
+        from hipeac_mcp.tools.members import find_similar_members
+
+        with (
+            patch("hipeac_mcp.tools.members.get_snapshot", return_value=aggregated_snapshot),
+            pytest.raises(ValueError, match="No active member with username 'former'"),
+        ):
+            await find_similar_members("former")
+
+    @pytest.mark.asyncio
+    async def test_cached_result(self, aggregated_snapshot):
+        """Test the same member in another case is scored once."""
+        from hipeac_mcp.tools.members import find_similar_members
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=aggregated_snapshot):
+            first = await find_similar_members("jsmith")
+            with patch("hipeac_mcp.tools.members._similar_snapshot") as mock_similar:
+                second = await find_similar_members(" JSMITH ")
+
+        assert second is first
+        mock_similar.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.metadata_cache", new=AsyncMock())
+    @patch("hipeac_mcp.tools.members._hydrate_members", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.gather_queries", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.run_query", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_database_similar(self, mock_ct, mock_run, mock_gather, mock_hydrate, directory_snapshot):
+        """Test the candidates read from the database are scored like the snapshot members."""
+        from hipeac_mcp.cache import MetadataTable
+        from hipeac_mcp.models import User
+        from hipeac_mcp.schemas.metadata import MetadataItem
+        from hipeac_mcp.tools.members import _member, _similar_snapshot, find_similar_members
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+        mock_run.return_value = User(id=1, username="jsmith", first_name="Jane", last_name="Smith")
+        metadata = MetadataTable.build(
+            {
+                "topic": {42: MetadataItem(id=42, value="Compilers")},
+                "application_area": {7: MetadataItem(id=7, value="Healthcare")},
+            },
+            (2, 42),
+            0,
+        )
+        results = iter(
+            [
+                [[42], [7]],
+                [
+                    3,
+                    [(42, 2), (43, 1)],
+                    [(7, 2)],
+                    [(1, 42), (2, 42), (3, 43)],
+                    [(1, 7), (3, 7)],
+                    [(1, "jsmith", "Jane", "Smith"), (2, "hmuller", "Hans", "Müller"), (3, "agarcia", "Ana", "García")],
+                    metadata,
+                ],
+            ]
+        )
+
+        def gather(*aws):
+            for aw in aws:
+                aw.close()
+            return next(results)
+
+        mock_gather.side_effect = gather
+        mock_hydrate.side_effect = lambda users, *args: [
+            _member(user.username, user.first_name, user.last_name, [], [], [], None) for user in users
+        ]
+
+        with patch("hipeac_mcp.tools.members.get_snapshot", return_value=None):
+            result = await find_similar_members("jsmith", detail="summary")
+
+        expected = _similar_snapshot(directory_snapshot, "jsmith", 10, "summary")  # type: ignore
+        assert result.model_dump() == expected.model_dump()
+        assert [user.username for user in mock_hydrate.call_args.args[0]] == ["jsmith", "hmuller", "agarcia"]
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.tools.members.metadata_cache", new=AsyncMock())
+    @patch("hipeac_mcp.tools.members.run_query", new_callable=AsyncMock)
+    @patch("hipeac_mcp.tools.members.content_types")
+    async def test_database_unknown_member(self, mock_ct, mock_run):
+        """Test a username of no active member is rejected before reading any relation."""
+        from hipeac_mcp.tools.members import find_similar_members
+
+        mock_ct.get_id = AsyncMock(return_value=1)
+        mock_run.return_value = None
+
+        with (
+            patch("hipeac_mcp.tools.members.get_snapshot", return_value=None),
+            pytest.raises(ValueError, match="No active member"),
+        ):
+            await find_similar_members("nobody")
+
+        mock_run.assert_awaited_once()
@@ -0,0 +1,82 @@
+"""Benchmark for building member profiles without validation."""
+
+import time
+
+import pytest
+
+
+MEMBER_COUNT = 5_000
+PAGE_SIZE = 100
+RUNS = 50
+
+
+def validated_member(snapshot, record):
+    """Reference implementation validating every model of a profile."""
+    from pydantic import HttpUrl
+
+    from hipeac_mcp.schemas.members import Institution, Member
+    from hipeac_mcp.schemas.metadata import MembershipType, MetadataItem
+
+    def metadata_item(item_id):
+        item = snapshot.metadata.get(item_id) if item_id is not None else None
+        return MetadataItem(id=item.id, value=item.value) if item else None
+
+    def metadata_items(item_ids):
+        return [item for item_id in item_ids if (item := metadata_item(item_id))] or None
+
+    institutions = [
+        Institution(name=institution.name, country=institution.country, type=metadata_item(institution.type_id))
+        for institution_id in record.institution_ids
+        if (institution := snapshot.institutions.get(institution_id))
+    ]
+    return Member(
+        username=record.username,
+        first_name=record.first_name,
+        last_name=record.last_name,
+        profile_url=HttpUrl(f"https://www.hipeac.net/~{record.username}/"),
+        institutions=institutions or None,
+        topics=metadata_items(record.topic_ids),
+        application_areas=metadata_items(record.application_area_ids),
+        membership=MembershipType(record.membership_type),
+    )
+
+
+def timed(function, runs=RUNS):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return sum(times) / len(times)
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    from directory.test_bitsets_benchmark import synthetic_rows
+
+    from hipeac_mcp.directory import build_snapshot
+
+    return build_snapshot(synthetic_rows(MEMBER_COUNT))
+
+
+def test_benchmark_profile_construction(snapshot):
+    """Compare validated and constructed profiles for a page of members."""
+    import pydantic_core
+
+    from hipeac_mcp.tools.members import _member_from_record
+
+    records = [snapshot.members[ordinal] for ordinal in range(PAGE_SIZE)]
+
+    expected = [validated_member(snapshot, record) for record in records]
+    profiles = [_member_from_record(snapshot, record) for record in records]
+    assert pydantic_core.to_json(profiles) == pydantic_core.to_json(expected)
+
+    validated_time = timed(lambda: [validated_member(snapshot, record) for record in records])
+    constructed_time = timed(lambda: [_member_from_record(snapshot, record) for record in records])
+
+    print(f"\n\nProfile construction, page of {PAGE_SIZE} members:")
+    print(f"Validated:   {validated_time * 1000:.3f}ms")
+    print(f"Constructed: {constructed_time * 1000:.3f}ms")
+
+    # This is informational, not a hard assertion
+    assert constructed_time > 0
@@ -1,7 +1,7 @@
 """Tests for metadata tool."""
 
 import inspect
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
@@ -26,18 +26,42 @@ class TestMetadataTool:
         assert callable(get_metadata)
 
     def test_get_metadata_no_parameters(self):
-        """Test get_metadata accepts no parameters (always returns all)."""
+        """Test get_metadata has no required parameters (always returns all)."""
         from hipeac_mcp.tools.metadata import get_metadata
 
         sig = inspect.signature(get_metadata)
 
         # Should have no required parameters
-        assert len(sig.parameters) == 0
+        assert all(param.default is not inspect.Parameter.empty for param in sig.parameters.values())
 
     @pytest.mark.asyncio
-    @patch("hipeac_mcp.tools.metadata.Metadata")
+    @patch("hipeac_mcp.cache.Metadata")
+    async def test_get_metadata_known_version(self, mock_metadata):
+        """Test a client holding the current version only gets the version back."""
+        from hipeac_mcp.cache import MetadataCache
+        from hipeac_mcp.tools.metadata import get_metadata
+
+        mock_qs = MagicMock()
+        mock_qs.only.return_value = mock_qs
+        mock_qs.__aiter__ = lambda self: make_async_iterator([Mock(id=1, value="Compilers", type="topic")])
+        mock_metadata.objects.all.return_value = mock_qs
+        mock_metadata.objects.order_by.return_value.aaggregate = AsyncMock(return_value={"count": 1, "max_id": 1})
+
+        with patch("hipeac_mcp.tools.metadata.metadata_cache", MetadataCache(ttl=60, max_age=3600)):
+            full = await get_metadata()
+            unchanged = await get_metadata(known_version=full.version)
+            stale = await get_metadata(known_version="outdated")
+
+        assert full.version
+        assert unchanged.version == full.version
+        assert unchanged.topics is None and unchanged.membership_types is None
+        assert stale == full
+
+    @pytest.mark.asyncio
+    @patch("hipeac_mcp.cache.Metadata")
     async def test_get_metadata_returns_all_types(self, mock_metadata):
         """Test get_metadata always returns all metadata types."""
+        from hipeac_mcp.cache import MetadataCache
         from hipeac_mcp.schemas.metadata import MetadataType
         from hipeac_mcp.tools.metadata import get_metadata
 
@@ -56,15 +80,16 @@ class TestMetadataTool:
         mock_inst.value = "University"
         mock_inst.type = MetadataType.INSTITUTION_TYPE.value
 
-        # Mock the queryset for the single query with type__in
+        # Mock the queryset loading the whole metadata table
         mock_qs = MagicMock()
-        mock_qs.order_by.return_value = mock_qs
         mock_qs.only.return_value = mock_qs
         mock_qs.__aiter__ = lambda self: make_async_iterator([mock_topic, mock_area, mock_inst])
 
-        mock_metadata.objects.filter.return_value = mock_qs
+        mock_metadata.objects.all.return_value = mock_qs
+        mock_metadata.objects.order_by.return_value.aaggregate = AsyncMock(return_value={"count": 3, "max_id": 3})
 
-        result = await get_metadata()
+        with patch("hipeac_mcp.tools.metadata.metadata_cache", MetadataCache(ttl=60, max_age=3600)):
+            result = await get_metadata()
 
         # Should contain all metadata types
         assert result.topics is not None
@@ -1,44 +1,88 @@
-"""Benchmark for optimized single-query metadata retrieval."""
+"""Benchmark for the precomputed metadata response."""
 
 import os
 import time
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
 
-@pytest.mark.asyncio
-async def test_benchmark_metadata_retrieval():
-    """Benchmark the optimized get_metadata function with single query."""
-    if not os.environ.get("DATABASE_URL"):
-        pytest.skip("DATABASE_URL not set")
+def make_async_iterator(items):
+    """Helper to create an async iterator from a list."""
+
+    async def async_gen():
+        for item in items:
+            yield item
+
+    return async_gen()
 
-    from hipeac_mcp.tools.metadata import get_metadata
 
+async def benchmark(get_metadata, runs=1000):
+    """Time warm get_metadata calls."""
     # Warm up
     await get_metadata()
 
-    # Benchmark metadata retrieval
     times = []
-    for _ in range(10):
+    for _ in range(runs):
         start = time.perf_counter()
         result = await get_metadata()
         times.append(time.perf_counter() - start)
 
-        # Verify we got all data
-        assert result.topics is not None and len(result.topics) > 0
-        assert result.application_areas is not None and len(result.application_areas) > 0
-        assert result.institution_types is not None and len(result.institution_types) > 0
-        assert result.membership_types is not None and len(result.membership_types) == 4
+    # Verify we got all data
+    assert result.topics is not None and len(result.topics) > 0
+    assert result.application_areas is not None and len(result.application_areas) > 0
+    assert result.institution_types is not None and len(result.institution_types) > 0
+    assert result.membership_types is not None and len(result.membership_types) == 4
+
+    return times
+
+
+def report(title, times):
+    print(f"\n\n{title} ({len(times)} runs):")
+    print(f"Average: {sum(times) / len(times) * 1e6:.2f}µs")
+    print(f"Min:     {min(times) * 1e6:.2f}µs")
+    print(f"Max:     {max(times) * 1e6:.2f}µs")
+
+
+@pytest.mark.asyncio
+@patch("hipeac_mcp.cache.Metadata")
+async def test_benchmark_metadata_warm_path(mock_metadata):
+    """Benchmark warm get_metadata calls against a table of several hundred items."""
+    from hipeac_mcp.cache import MetadataCache
+    from hipeac_mcp.tools.metadata import get_metadata
+
+    types = ["topic"] * 300 + ["application_area"] * 100 + ["institution_type"] * 20
+    items = [Mock(id=id, value=f"Item {id}", type=type) for id, type in enumerate(types)]
+
+    mock_qs = MagicMock()
+    mock_qs.only.return_value = mock_qs
+    mock_qs.__aiter__ = lambda self: make_async_iterator(items)
+    mock_metadata.objects.all.return_value = mock_qs
+    mock_metadata.objects.order_by.return_value.aaggregate = AsyncMock(
+        return_value={"count": len(items), "max_id": len(items) - 1}
+    )
+
+    with patch("hipeac_mcp.tools.metadata.metadata_cache", MetadataCache(ttl=3600, max_age=3600)):
+        times = await benchmark(get_metadata)
+
+    report(f"Warm get_metadata, {len(items)} items", times)
+    print("\nOptimization: response built once per metadata version, serialized by FastMCP on each call")
+
+    # This is informational, not a hard assertion
+    assert sum(times) > 0
+
+
+@pytest.mark.asyncio
+async def test_benchmark_metadata_retrieval():
+    """Benchmark warm get_metadata calls against the real database."""
+    if not os.environ.get("DATABASE_URL"):
+        pytest.skip("DATABASE_URL not set")
+
+    from hipeac_mcp.tools.metadata import get_metadata
 
-    avg_time = sum(times) / len(times)
-    min_time = min(times)
-    max_time = max(times)
+    times = await benchmark(get_metadata)
 
-    print("\n\nBenchmark Results (10 runs):")
-    print(f"Average: {avg_time * 1000:.2f}ms")
-    print(f"Min:     {min_time * 1000:.2f}ms")
-    print(f"Max:     {max_time * 1000:.2f}ms")
-    print("\nOptimization: Single query with type__in filter + async for iteration")
+    report("Warm get_metadata, database", times)
 
     # This is informational, not a hard assertion
-    assert avg_time > 0
+    assert sum(times) > 0
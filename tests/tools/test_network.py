@@ -0,0 +1,192 @@
+"""Tests for collaboration network tools."""
+
+from unittest.mock import patch
+
+import pytest
+
+
+class TestMemberConnections:
+    """Tests for the member_connections tool."""
+
+    @pytest.mark.asyncio
+    async def test_connections(self, directory_snapshot):
+        """Test advisees come first, then members sharing institutions, with every link."""
+        from hipeac_mcp.tools.network import member_connections
+
+        with patch("hipeac_mcp.tools.network.get_snapshot", return_value=directory_snapshot):
+            result = await member_connections("JSMITH")
+
+        assert (result.member.username, result.total) == ("jsmith", 2)
+        agarcia, hmuller = result.connections
+        assert (agarcia.member.username, agarcia.advisor, agarcia.advisee, agarcia.shared_institutions) == (
+            "agarcia",
+            False,
+            True,
+            [],
+        )
+        assert [institution.name for institution in hmuller.shared_institutions] == ["Ghent University"]
+        assert hmuller.member.institutions is None
+
+    @pytest.mark.asyncio
+    async def test_limit_and_detail(self, directory_snapshot):
+        """Test the limit applies to the connections but not to their total, and the detail to the profiles."""
+        from hipeac_mcp.tools.network import member_connections
+
+        with patch("hipeac_mcp.tools.network.get_snapshot", return_value=directory_snapshot):
+            result = await member_connections("agarcia", limit=1, detail="standard")
+
+        assert result.total == 1
+        assert [connection.member.username for connection in result.connections] == ["jsmith"]
+        assert result.connections[0].advisor
+        assert result.connections[0].member.institutions is not None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("limit", [0, -5])
+    async def test_limit_at_least_one(self, directory_snapshot, limit):
+        """Test a limit below one still returns the first connection."""
+        from hipeac_mcp.tools.network import member_connections
+
+        with patch("hipeac_mcp.tools.network.get_snapshot", return_value=directory_snapshot):
+            result = await member_connections("jsmith", limit=limit)
+
+        assert result.total == 2
+        assert [connection.member.username for connection in result.connections] == ["agarcia"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_member(self, directory_snapshot):
+        """Test a username of no active member is rejected with a clear error."""
+        from hipeac_mcp.tools.network import member_connections
+
+        with (
+            patch("hipeac_mcp.tools.network.get_snapshot", return_value=directory_snapshot),
+            pytest.raises(ValueError, match="No active member with username 'former'"),
+        ):
+            await member_connections("former")
+
+    @pytest.mark.asyncio
+    async def test_snapshot_required(self):
+        """Test the network tools explain that they need the snapshot."""
+        from hipeac_mcp.tools.network import member_connections
+
+        with (
+            patch("hipeac_mcp.tools.network.get_snapshot", return_value=None),
+            pytest.raises(ValueError, match="needs the member snapshot"),
+        ):
+            await member_connections("jsmith")
+
+
+class TestConnectionPath:
+    """Tests for the connection_path tool."""
+
+    @pytest.mark.asyncio
+    async def test_path(self, directory_snapshot):
+        """Test the path lists the members in order with the link followed to each."""
+        from hipeac_mcp.tools.network import connection_path
+
+        with patch("hipeac_mcp.tools.network.get_snapshot", return_value=directory_snapshot):
+            result = await connection_path("hmuller", "agarcia")
+
+        assert (result.found, result.degrees, result.truncated) == (True, 2, False)
+        assert [(step.member.username, step.link) for step in result.path] == [
+            ("hmuller", None),
+            ("jsmith", "institution"),
+            ("agarcia", "advisee"),
+        ]
+        assert result.path[1].institution is not None and result.path[1].institution.name == "Ghent University"
+        assert result.path[2].institution is None
+
+    @pytest.mark.asyncio
+    async def test_depth_bound(self, directory_snapshot):
+        """Test no path is reported beyond the maximum depth."""
+        from hipeac_mcp.tools.network import connection_path
+
+        with patch("hipeac_mcp.tools.network.get_snapshot", return_value=directory_snapshot):
+            result = await connection_path("hmuller", "agarcia", max_depth=1)
+
+        assert (result.found, result.degrees, result.path, result.truncated) == (False, None, [], False)
+
+    @pytest.mark.asyncio
+    async def test_node_budget(self, directory_snapshot):
+        """Test an exhausted node budget is reported as a truncated search."""
+        from hipeac_mcp.tools.network import connection_path
+
+        with (
+            patch("hipeac_mcp.tools.network.get_snapshot", return_value=directory_snapshot),
+            patch("hipeac_mcp.tools.network.PATH_NODE_BUDGET", 2),
+        ):
+            result = await connection_path("hmuller", "agarcia")
+
+        assert (result.found, result.truncated) == (False, True)
+
+    @pytest.mark.asyncio
+    async def test_cached_result(self, directory_snapshot):
+        """Test the same search in another case is run once."""
+        from hipeac_mcp.tools.network import connection_path
+
+        graph = directory_snapshot.collaboration_graph
+        with (
+            patch("hipeac_mcp.tools.network.get_snapshot", return_value=directory_snapshot),
+            patch.object(graph, "shortest_path", wraps=graph.shortest_path) as mock_path,
+        ):
+            first = await connection_path("hmuller", "agarcia")
+            second = await connection_path("HMuller ", "AGarcia")
+
+        assert second is first
+        mock_path.assert_called_once()
+
+
+class TestNetworkConnectivity:
+    """Tests for the network_connectivity tool."""
+
+    @pytest.mark.asyncio
+    async def test_every_country(self, directory_snapshot):
+        """Test every country is described when nothing is asked, largest first."""
+        from hipeac_mcp.tools.network import network_connectivity
+
+        with patch("hipeac_mcp.tools.network.get_snapshot", return_value=directory_snapshot):
+            result = await network_connectivity()
+
+        assert [(stats.country, stats.members, stats.institutions) for stats in result.countries] == [
+            ("BE", 2, 1),
+            ("ES", 1, 1),
+        ]
+        assert (result.countries[0].components, result.countries[0].external_advisor_links) == (1, 1)
+        assert result.institutions == []
+
+    @pytest.mark.asyncio
+    async def test_institutions(self, directory_rows):
+        """Test institutions are described in the order given, with the institutions and countries they link to."""
+        from hipeac_mcp.directory import build_snapshot
+        from hipeac_mcp.tools.network import network_connectivity
+
+        directory_rows.user_institutions.append((1, 11))
+        snapshot = build_snapshot(directory_rows)
+
+        with patch("hipeac_mcp.tools.network.get_snapshot", return_value=snapshot):
+            result = await network_connectivity(institution_ids=[11, 99, 10])
+
+        assert [(stats.id, stats.name, stats.members) for stats in result.institutions] == [
+            (11, "BSC", 2),
+            (10, "Ghent University", 2),
+        ]
+        bsc = result.institutions[0]
+        assert (bsc.advisor_links, bsc.linked_institutions, bsc.linked_countries) == (1, 1, 1)
+        assert result.countries == []
+
+    @pytest.mark.asyncio
+    async def test_unknown_country(self, directory_snapshot):
+        """Test a country without members is described as empty."""
+        from hipeac_mcp.tools.network import network_connectivity
+
+        with patch("hipeac_mcp.tools.network.get_snapshot", return_value=directory_snapshot):
+            result = await network_connectivity(countries=["fr"])
+
+        assert [(stats.country, stats.members, stats.components) for stats in result.countries] == [("FR", 0, 0)]
+
+    @pytest.mark.asyncio
+    async def test_too_many_groups(self):
+        """Test requests beyond the limit are rejected with a clear error."""
+        from hipeac_mcp.tools.network import MAX_GROUPS, network_connectivity
+
+        with pytest.raises(ValueError, match="Too many countries or institutions"):
+            await network_connectivity(institution_ids=list(range(MAX_GROUPS + 1)))